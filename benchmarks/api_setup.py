@@ -0,0 +1,92 @@
+"""
+API setup benchmark - pooled keep-alive connections vs a connection per call
+
+Starts a local stand-in HTTP server and sends the same POSTs, from the same
+number of threads, through lumenqa.api.ApiClient and through plain
+``requests.post`` (a new connection per call). Reports calls per second and
+the connections the server accepted for each.
+
+    python benchmarks/api_setup.py --calls 2000 --threads 8 --latency-ms 2
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from lumenqa.api import ApiClient
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers every POST with 201 and the posted JSON plus an id"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; don't let Nagle hold the body back on a kept-alive socket
+    disable_nagle_algorithm = True
+    latency = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandIn.lock:
+            StandIn.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        time.sleep(self.latency)
+        data = json.dumps(dict(body, id=1)).encode()
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def measure(send, calls, threads):
+    """(calls per second, connections accepted) for `calls` sends over `threads` threads"""
+    StandIn.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(send, range(calls)))
+    return calls / (time.perf_counter() - start), StandIn.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000, help='POSTs per client')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent callers')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='Server time per request')
+    args = parser.parse_args()
+
+    StandIn.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    client = ApiClient(base_url, pool_size=args.threads)
+    pooled = measure(
+        lambda i: client.send('POST', '/api/users', {'name': f"user {i}"}), args.calls, args.threads
+    )
+    client.close()
+    fresh = measure(
+        lambda i: requests.post(f"{base_url}/api/users", json={'name': f"user {i}"}),
+        args.calls, args.threads,
+    )
+    server.shutdown()
+
+    print(f"{'client':>8} {'calls':>7} {'calls/s':>9} {'connections':>12}")
+    for name, (rate, connections) in (('pooled', pooled), ('fresh', fresh)):
+        print(f"{name:>8} {args.calls:>7} {rate:>9.0f} {connections:>12}")
+
+
+if __name__ == '__main__':
+    main()
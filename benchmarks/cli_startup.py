@@ -0,0 +1,97 @@
+"""
+CLI startup regression check for `lumen version`
+
+Runs `lumen version` in fresh interpreters and fails (exit code 1) when
+the median wall time or the `-X importtime` cost goes over budget, or when a
+command pulls in modules that should only load for other commands. Import
+time is measured over a bare `python -c pass`, so interpreter startup, `site`
+and `.pth` hooks of the environment don't count against LumenQA.
+
+    python benchmarks/cli_startup.py --runs 10 --budget-ms 250
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules that must stay out of `lumen version`
+FORBIDDEN = [
+    'lumenqa.runner',
+    'lumenqa.live_runner',
+    'rich.table',
+    'rich.progress',
+    'rich.live',
+    'rich.tree',
+]
+
+SCRIPT = """
+import sys
+from lumenqa.cli import main
+try:
+    main(['version'])
+except SystemExit:
+    pass
+sys.stderr.write('MODULES ' + ' '.join(sorted(sys.modules)) + '\\n')
+"""
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|')
+
+
+def run_once(script=SCRIPT):
+    """Return (wall seconds, self import time in us, loaded modules)"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    import_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            import_us += int(match.group(1))
+        elif line.startswith('MODULES '):
+            modules = set(line.split()[1:])
+    return elapsed, import_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=250.0, help='Median wall time budget')
+    parser.add_argument('--import-budget-ms', type=float, default=120.0,
+                        help='Import time budget, over a bare interpreter')
+    args = parser.parse_args()
+
+    bare = statistics.median(run_once('pass')[1] for _ in range(args.runs))
+    samples = [run_once() for _ in range(args.runs)]
+    wall_ms = statistics.median(s[0] for s in samples) * 1000
+    import_ms = (statistics.median(s[1] for s in samples) - bare) / 1000
+    leaked = sorted(set(FORBIDDEN) & samples[0][2])
+
+    print(f"lumen version: median wall {wall_ms:.1f}ms (budget {args.budget_ms:.0f}ms)")
+    print(f"               median imports {import_ms:.1f}ms over bare python "
+          f"({bare / 1000:.1f}ms; budget {args.import_budget_ms:.0f}ms)")
+
+    failures = []
+    if wall_ms > args.budget_ms:
+        failures.append(f"wall time {wall_ms:.1f}ms over budget")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import time {import_ms:.1f}ms over budget")
+    if leaked:
+        failures.append(f"heavy modules imported: {', '.join(leaked)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+DOM snapshot benchmark - indexed queries and incremental updates vs rescans
+
+Builds synthetic pages of 10k-100k elements, then replays a step stream
+(id, class, data-testid, text and descendant selectors, with a small
+mutation batch every few steps) against a DomSnapshot. Reports the cost per
+query with the indexes and with a full scan of the page, and the cost of
+applying a mutation batch next to that of parsing the page from scratch.
+
+    python benchmarks/dom_queries.py --nodes 10000 50000 100000 --steps 100 1000 10000
+"""
+
+import argparse
+import random
+import time
+
+from lumenqa.dom import DomSnapshot, parse_selector
+
+# Every MUTATE_EVERY steps the page changes a little, as it would after a click
+MUTATE_EVERY = 10
+
+
+def make_page(target):
+    """HTML for a product listing page with roughly `target` elements"""
+    parts = ['<html><body><header id="top"><nav class="menu">']
+    parts.extend(f'<a class="nav-link" href="/c/{i}">Category {i}</a>' for i in range(20))
+    parts.append('</nav></header><main id="content">')
+    count, section = 25, 0
+    while count < target:
+        parts.append(f'<section class="grid" id="section-{section}">')
+        for card in range(50):
+            n = section * 50 + card
+            parts.append(
+                f'<div class="card product-card" data-testid="product-{n}">'
+                f'<img src="/p/{n}.png"><h3 class="title">Product {n}</h3>'
+                f'<span class="price">${n % 97}.99</span>'
+                f'<button class="btn add-to-cart" type="button">Add to Cart</button></div>'
+            )
+        parts.append('</section>')
+        count += 1 + 50 * 5
+        section += 1
+    parts.append('<footer id="bottom"><button id="checkout" class="btn primary">Checkout</button>'
+                 '</footer></main></body></html>')
+    return ''.join(parts), section
+
+
+def make_steps(count, sections, rng):
+    """Selectors as a test would use them"""
+    steps = []
+    for _ in range(count):
+        n = rng.randrange(sections * 50)
+        steps.append(rng.choice((
+            '#checkout',
+            f"[data-testid='product-{n}']",
+            f"#section-{n // 50} .add-to-cart",
+            '.nav-link:first',
+            'footer > button.primary',
+            'Checkout',
+            f'Product {n}',
+        )))
+    return steps
+
+
+def scan(snapshot, selector):
+    """The same match as DomSnapshot.query, without indexes"""
+    if not any(c in selector for c in '#.[>:'):
+        return [node for node in range(1, len(snapshot.alive))
+                if snapshot.alive[node] and snapshot.texts[node].casefold() == selector.casefold()]
+    found = []
+    for compounds, combinators in parse_selector(selector):
+        found.extend(node for node in range(1, len(snapshot.alive))
+                     if snapshot.alive[node]
+                     and snapshot._matches(node, compounds, combinators, len(compounds) - 1))
+    return found
+
+
+def mutation_batch(snapshot, rng):
+    """Add a card, drop one, and update a price and a badge"""
+    grids = snapshot.query('section.grid')
+    grid = rng.choice(grids)
+    cards = snapshot.query(f"#{snapshot.attr(grid, 'id')} > .card")
+    price = snapshot.query_one(f"#{snapshot.attr(grid, 'id')} .price")
+    return [
+        ('text', price, f"${rng.randrange(100)}.49"),
+        ('attr', grid, 'data-updated', str(rng.randrange(1000))),
+        ('append', grid, '<div class="card product-card new"><h3 class="title">New</h3>'
+                         '<button class="btn add-to-cart">Add to Cart</button></div>'),
+        ('remove', rng.choice(cards)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[10_000, 50_000, 100_000],
+                        help='Page sizes in elements')
+    parser.add_argument('--steps', type=int, nargs='+', default=[100, 1_000, 10_000],
+                        help='Steps replayed per page')
+    parser.add_argument('--scan-steps', type=int, default=50,
+                        help='Steps timed with full scans (they are slow)')
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(f"{'elements':>9} {'parse ms':>9} {'steps':>7} {'indexed us':>11} {'scan us':>10} "
+          f"{'batch us':>9}")
+    for target in args.nodes:
+        html, sections = make_page(target)
+        start = time.perf_counter()
+        snapshot = DomSnapshot.from_html(html)
+        parse_ms = (time.perf_counter() - start) * 1000
+
+        steps = make_steps(args.scan_steps, sections, rng)
+        start = time.perf_counter()
+        for selector in steps:
+            scan(snapshot, selector)
+        scan_us = (time.perf_counter() - start) / len(steps) * 1e6
+
+        for count in args.steps:
+            steps = make_steps(count, sections, rng)
+            query_ns = mutate_ns = batches = 0
+            for i, selector in enumerate(steps):
+                if i % MUTATE_EVERY == MUTATE_EVERY - 1:
+                    batch = mutation_batch(snapshot, rng)
+                    start = time.perf_counter_ns()
+                    snapshot.apply(batch)
+                    mutate_ns += time.perf_counter_ns() - start
+                    batches += 1
+                start = time.perf_counter_ns()
+                snapshot.resolve(selector)
+                query_ns += time.perf_counter_ns() - start
+
+            print(
+                f"{len(snapshot):>9} {parse_ms:>9.0f} {count:>7} {query_ns / count / 1000:>11.1f} "
+                f"{scan_us:>10.0f} {mutate_ns / max(batches, 1) / 1000:>9.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Parser throughput benchmark - streaming parser vs the old regex parser
+
+Generates synthetic .lux suites of a few MB and reports MB/s and peak
+traced memory for both implementations.
+
+    python benchmarks/parser_throughput.py --sizes 1 4 16
+"""
+
+import argparse
+import re
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from lumenqa.parser import iter_lux_file
+
+STEPS = [
+    '    navigate "https://app.example.com/login"',
+    '    input #email => "user{n}@example.com"',
+    '    input #password => secret("TEST_PASSWORD")',
+    '    click "Login"',
+    '',
+    '    # Verify successful login',
+    '    expect url contains "/dashboard"',
+    '    expect element ".user-menu" visible',
+]
+
+ASYNC_STEPS = [
+    '    await navigate "https://app.example.com"',
+    '    await all:',
+    '        - expect element ".header" visible',
+    '        - expect element ".footer" visible',
+    '        - screenshot "full-page-{n}"',
+]
+
+
+def legacy_parse_lux_file(file_path):
+    """The regex-based parser this module replaced, kept for comparison"""
+    content = Path(file_path).read_text()
+    tests = []
+    test_pattern = r'test\s+"([^"]+)":\s*\n((?:    .+\n?)*)'
+    for match in re.finditer(test_pattern, content, re.MULTILINE):
+        steps = []
+        for line in match.group(2).split('\n'):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                steps.append(line)
+        tests.append({'name': match.group(1), 'steps': steps})
+    return tests
+
+
+def write_suite(path, megabytes):
+    """Write a synthetic suite of roughly the given size"""
+    target = megabytes * 1024 * 1024
+    written = 0
+    n = 0
+    with open(path, 'w') as handle:
+        while written < target:
+            if n % 5 == 4:
+                lines = [f'async test "Generated async test {n}":'] + ASYNC_STEPS
+            else:
+                lines = [f'test "Generated test {n}":'] + STEPS
+            chunk = '\n'.join(lines).replace('{n}', str(n)) + '\n\n'
+            handle.write(chunk)
+            written += len(chunk)
+            n += 1
+    return n
+
+
+def measure(parse, path):
+    """Return (seconds, peak_bytes, test_count) for one parse of the file
+
+    Timing and memory are taken in separate passes since tracemalloc slows
+    down allocation-heavy code.
+    """
+    start = time.perf_counter()
+    count = sum(1 for _ in parse(path))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in parse(path):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 4, 16], help='Suite sizes in MB')
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'parser':>10} {'tests':>8} {'MB/s':>8} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"suite_{size}mb.lux"
+            write_suite(path, size)
+            for label, parse in (('regex', legacy_parse_lux_file), ('streaming', iter_lux_file)):
+                elapsed, peak, count = measure(parse, path)
+                print(
+                    f"{size:>4}MB {label:>10} {count:>8} "
+                    f"{size / elapsed:>8.1f} {peak / 1024 / 1024:>9.2f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
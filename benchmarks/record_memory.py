@@ -0,0 +1,117 @@
+"""
+Record memory benchmark - slotted, interned tests and columnar results vs dicts
+
+Generates a suite of about --steps steps with lumenqa.bench.write_suite and
+parses it twice under tracemalloc: once keeping the Test/Step records the
+parser returns, once converted to the dicts it used to return (with their own
+string objects, as the old parser's regex matches were). Then holds one
+result per test both in a TestReporter's columns and as the old result
+dicts. Reports the memory each form retains, and the size of the suite as
+the parse cache and plan files store it: parser.dump_tests' positional JSON
+rows, against the same tests written as JSON objects.
+
+    python benchmarks/record_memory.py --steps 1000000
+"""
+
+import argparse
+import gc
+import json
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from lumenqa.bench import write_suite
+from lumenqa.parser import dump_tests, iter_lux_file
+from lumenqa.reporter import TestReporter
+
+# Steps per test in write_suite's mix: four 6-step tests, then an async one with 5
+STEPS_PER_TEST = 29 / 5
+
+
+def _fresh(text):
+    """A new string object equal to text"""
+    return text if text is None else text.encode().decode()
+
+
+def step_dict(step):
+    return {
+        'text': _fresh(step.text),
+        'verb': _fresh(step.verb),
+        'target': _fresh(step.target),
+        'value': _fresh(step.value),
+        'await': step.is_await,
+        'line': step.line,
+        'children': [step_dict(child) for child in step.children],
+    }
+
+
+def test_dict(test):
+    return {
+        'name': _fresh(test.name),
+        'file': test.file,
+        'line': test.line,
+        'async': test.is_async,
+        'steps': [step_dict(step) for step in test.steps],
+    }
+
+
+def retained(build):
+    """(bytes still allocated once build() returns, its result)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+
+def count_steps(steps):
+    return sum(1 + count_steps(step.children) for step in steps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=1_000_000, help='Approximate steps in the suite')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='lumen-records-') as workdir:
+        files = write_suite(Path(workdir) / 'suite', round(args.steps / STEPS_PER_TEST))
+        parse = lambda: [test for path in files for test in iter_lux_file(path)]
+        records_size, records = retained(parse)
+        tests, steps = len(records), sum(count_steps(test.steps) for test in records)
+        records_stored = len(dump_tests(records))
+        del records
+        dicts_size, dicts = retained(lambda: [test_dict(test) for test in parse()])
+        dicts_stored = len(json.dumps(dicts, separators=(',', ':')).encode('utf-8'))
+        del dicts
+
+        def columns():
+            reporter = TestReporter(Path(workdir) / 'report')
+            for n in range(tests):
+                reporter.add_result(f"Generated test {n}", 'passed', 120.5, group=f"suite_{n // 50:04d}.lux")
+            return reporter
+        columns_size, _ = retained(columns)
+
+        def result_dicts():
+            return [{
+                'test': f"Generated test {n}", 'status': 'passed', 'duration': 120.5, 'error': None,
+                'timestamp': datetime.now().isoformat(), 'group': f"suite_{n // 50:04d}.lux",
+            } for n in range(tests)]
+        result_dicts_size, _ = retained(result_dicts)
+
+    print(f"{tests} tests, {steps} steps\n")
+    print(f"{'':>18} {'dicts MB':>10} {'records MB':>11} {'saved':>7}")
+    for name, before, after in (
+        ('parsed suite', dicts_size, records_size),
+        ('stored suite', dicts_stored, records_stored),
+        ('results', result_dicts_size, columns_size),
+    ):
+        print(f"{name:>18} {before / 2**20:>10.1f} {after / 2**20:>11.1f} {1 - after / before:>7.0%}")
+    print(f"{'per step (bytes)':>18} {dicts_size / steps:>10.0f} {records_size / steps:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
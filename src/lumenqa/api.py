@@ -0,0 +1,322 @@
+"""
+LumenQA API Steps - HTTP and GraphQL steps over pooled keep-alive connections
+
+When lumen.yml sets ``api.base_url``, ``api`` and ``gql`` steps are sent for
+real instead of going to the browser driver:
+
+    api POST "/api/users" {name: "John"} => user
+    api DELETE f"/api/users/{user.body.id}"
+    gql query { user(id: "123") { name } } => result
+
+One ApiClient serves every test in a runner. Its connection pools
+(``pool_size`` keep-alive connections for each of up to ``hosts`` hosts)
+are shared by all worker threads, so thousands of setup calls pay for a handful of TCP and TLS
+handshakes. Requests block, so they run on the client's own thread pool
+and the step executor's event loop stays free.
+
+A step binds its response to the name after ``=>`` (``response`` if there
+is none). The binding is the response itself: the body is decoded from the
+received bytes the first time a step reads it, and ``set`` and ``expect``
+follow paths into it without copying:
+
+    expect user.status = 201
+    expect user.body.id exists
+    set user_id = user.body.id
+    expect result.data.user.name = "John Doe"    # gql: fields fall through to the body
+
+Consecutive API steps that don't use each other's bindings run
+concurrently (see ``independent_steps``). An HTTP error status is a
+response like any other; only transport errors fail the step.
+"""
+
+import asyncio
+import functools
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_VERBS = ('api', 'gql')
+DEFAULT_BINDING = 'response'
+
+API_STEP = re.compile(
+    r'api\s+(?P<method>[A-Za-z]+)\s+f?"(?P<url>[^"]*)"\s*(?P<body>[{\[].*?)?'
+    r'\s*(?:=>\s*(?P<bind>\w+))?$'
+)
+GQL_STEP = re.compile(r'gql\s+(?P<query>(?:query|mutation)?\s*\{.*\})\s*(?:=>\s*(?P<bind>\w+))?$')
+SET_STEP = re.compile(r'set\s+(?P<name>\w+)\s*=\s*(?P<expr>.+)$')
+EXPECT_STEP = re.compile(
+    r'expect\s+(?P<path>[A-Za-z_][\w.]*)\s+'
+    r'(?:(?P<check>exists|not_exists)|(?P<op>!=|>=|<=|=|>|<|contains)\s+(?P<expected>.+))$'
+)
+# Bare object keys ({name: "x"}) outside strings, so PyLux literals can be read as JSON
+BARE_KEY = re.compile(r'"(?:[^"\\]|\\.)*"|([A-Za-z_]\w*)(?=\s*:)')
+PLACEHOLDER = re.compile(r'\{([^{}]+)\}')
+MISSING = object()
+
+COMPARE = {
+    '=': lambda actual, expected: actual == expected,
+    '!=': lambda actual, expected: actual != expected,
+    '>': lambda actual, expected: actual > expected,
+    '<': lambda actual, expected: actual < expected,
+    '>=': lambda actual, expected: actual >= expected,
+    '<=': lambda actual, expected: actual <= expected,
+    'contains': lambda actual, expected: expected in actual,
+}
+
+
+class ApiResponse:
+    """A received response, decoded lazily"""
+
+    __slots__ = ('status', 'headers', '_response', '_body')
+
+    def __init__(self, response):
+        self.status = response.status_code
+        self.headers = response.headers
+        self._response = response
+        self._body = MISSING
+
+    @property
+    def body(self):
+        """The JSON body (or text, if it isn't JSON), decoded on first use"""
+        if self._body is MISSING:
+            content = self._response.content
+            try:
+                self._body = json.loads(content) if content else None
+            except ValueError:
+                self._body = self._response.text
+        return self._body
+
+    def field(self, name):
+        if name in ('status', 'headers', 'body'):
+            return getattr(self, name)
+        # result.data.user → result.body['data']['user'], as GraphQL responses are read
+        return _child(self.body, name)
+
+
+class ApiClient:
+    """Pooled HTTP client shared by every test in a runner"""
+
+    def __init__(self, base_url, timeout=30, pool_size=16, headers=None, graphql='/graphql', hosts=4):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.graphql = graphql
+        self.requests = 0
+        self.failures = 0
+        self._adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._io = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='lumen-api')
+        self._opened = None
+
+    def handles(self, step, scope):
+        """Whether a leaf step is this client's to run, rather than the browser's"""
+        verb = step.verb
+        if verb in API_VERBS:
+            return True
+        if verb == 'set':
+            match = SET_STEP.match(step.text)
+            return bool(match) and _root(match['expr']) in scope
+        if verb == 'expect':
+            match = EXPECT_STEP.match(step.text)
+            return bool(match) and _root(match['path']) in scope
+        return False
+
+    async def perform(self, step, scope):
+        """Run an api/gql/set/expect step against the test's bindings; an error message or None"""
+        verb = step.verb
+        if verb == 'set':
+            match = SET_STEP.match(step.text)
+            value = resolve(scope, match['expr'])
+            if value is MISSING:
+                return f"{match['expr'].strip()} does not exist"
+            scope[match['name']] = value
+            return None
+        if verb == 'expect':
+            return check(EXPECT_STEP.match(step.text), scope)
+
+        try:
+            method, url, body, bind = parse_request(step.text, self.graphql)
+            url = interpolate(url, scope)
+        except ValueError as e:
+            return str(e)
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                self._io, functools.partial(self.send, method, url, body)
+            )
+        except requests.RequestException as e:
+            return f"{method} {url} failed: {e}"
+        scope[bind] = response
+        if verb == 'gql' and (response.status >= 400 or _child(response.body, 'errors') is not MISSING):
+            return f"GraphQL query failed ({response.status}): {_child(response.body, 'errors')}"
+        return None
+
+    def send(self, method, path, body=None):
+        """Blocking request on this thread's session; raises requests.RequestException"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+            # Every thread's session draws on the same connection pool
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            with self._lock:
+                self._sessions.append(session)
+        url = path if '://' in path else self.base_url + '/' + path.lstrip('/')
+        try:
+            response = session.request(method, url, json=body, timeout=self.timeout)
+        except requests.RequestException:
+            self._count('failures')
+            raise
+        self._count('requests')
+        return ApiResponse(response)
+
+    def connections(self):
+        """Connections opened so far, across hosts"""
+        if self._opened is not None:
+            return self._opened
+        pools = self._adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def close(self):
+        self._io.shutdown(wait=True)
+        self._opened = self.connections()
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        self._adapter.close()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_request(text, graphql='/graphql'):
+    """(method, url, body, binding) for an api or gql step; raises ValueError"""
+    match = GQL_STEP.match(text)
+    if match:
+        return 'POST', graphql, {'query': match['query']}, match['bind'] or DEFAULT_BINDING
+    match = API_STEP.match(text)
+    if not match:
+        raise ValueError(f"Can't read API step: {text}")
+    body = None
+    if match['body']:
+        source = BARE_KEY.sub(lambda m: f'"{m[1]}"' if m[1] else m[0], match['body'])
+        try:
+            body = json.loads(source)
+        except ValueError:
+            raise ValueError(f"Can't read request body: {match['body']}") from None
+    return match['method'].upper(), match['url'], body, match['bind'] or DEFAULT_BINDING
+
+
+def binding(step):
+    """The name an api/gql step binds its response to"""
+    if step.value and step.value.isidentifier():
+        return step.value
+    return DEFAULT_BINDING
+
+
+def independent_steps(steps, start):
+    """End of the run of API steps from `start` that can run concurrently
+
+    A step joins the run if it is an api/gql leaf, doesn't mention a name an
+    earlier step in the run binds, and doesn't bind one of those names itself.
+    """
+    bound = set()
+    end = start
+    while end < len(steps):
+        step = steps[end]
+        if step.verb not in API_VERBS or step.children:
+            break
+        name = binding(step)
+        if name in bound or any(_mentions(step.text, other) for other in bound):
+            break
+        bound.add(name)
+        end += 1
+    return end
+
+
+def resolve(scope, expr):
+    """Value of a literal or a dotted path into the test's bindings"""
+    expr = expr.strip()
+    if _root(expr) in scope:
+        parts = expr.split('.')
+        value = scope[parts[0]]
+        for part in parts[1:]:
+            value = _child(value, part)
+            if value is MISSING:
+                break
+        return value
+    try:
+        return json.loads(expr)
+    except ValueError:
+        return expr.strip('"\'')
+
+
+def check(match, scope):
+    """Error message for a failed ``expect`` on a binding, or None"""
+    actual = resolve(scope, match['path'])
+    if match['check']:
+        if (actual is not MISSING) == (match['check'] == 'exists'):
+            return None
+        return f"Expected {match['path']} {match['check'].replace('_', ' ')}"
+    if actual is MISSING:
+        return f"{match['path']} does not exist"
+    expected = resolve(scope, match['expected'])
+    try:
+        if COMPARE[match['op']](actual, expected):
+            return None
+    except TypeError:
+        pass
+    return f"Expected {match['path']} {match['op']} {expected!r}, got {actual!r}"
+
+
+def interpolate(template, scope):
+    """Fill f-string placeholders ({user_id}, {user.body.id}) from the bindings
+
+    Raises ValueError for a placeholder that names no binding or a path that
+    doesn't exist, rather than sending the request to the wrong URL.
+    """
+    if '{' not in template:
+        return template
+    return PLACEHOLDER.sub(lambda m: str(_placeholder(scope, m[1])), template)
+
+
+def _placeholder(scope, expr):
+    expr = expr.strip()
+    if _root(expr) not in scope:
+        raise ValueError(f"`{_root(expr)}` is not bound")
+    value = resolve(scope, expr)
+    if value is MISSING:
+        raise ValueError(f"`{expr}` does not exist")
+    return value
+
+
+def _child(value, name):
+    if isinstance(value, ApiResponse):
+        return value.field(name)
+    if isinstance(value, dict):
+        if name in value:
+            return value[name]
+    elif isinstance(value, (list, str)):
+        if name.isdigit() and int(name) < len(value):
+            return value[int(name)]
+    if name == 'length' and isinstance(value, (dict, list, str)):
+        return len(value)
+    return MISSING
+
+
+def _root(expr):
+    return expr.strip().split('.', 1)[0]
+
+
+def _mentions(text, name):
+    return re.search(rf'\b{re.escape(name)}\b', text) is not None
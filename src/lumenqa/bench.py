@@ -0,0 +1,220 @@
+"""
+LumenQA Bench - Reproducible benchmarks of the framework's own hot paths
+
+Each benchmark generates its input (a synthetic suite of ``tests`` tests),
+runs once untimed to warm up, then ``repeat`` timed times:
+
+    parse      iter_lux_file over the generated suite          MB/s
+    schedule   longest-first ordering, the worker pool and the
+               step executor, with a browser that takes no time   us per test
+    report     TestReporter streaming results.jsonl, then
+               writing results.json                             results/s
+    startup    `lumen version` in a fresh interpreter           ms
+
+Results carry every sample plus the median, p90 and p99, and are saved as
+JSON. compare() checks a run against a saved baseline: a median that is
+worse by more than the threshold is a regression.
+"""
+
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from .drivers import Context
+from .executor import StepExecutor
+from .history import longest_first
+from .parser import iter_lux_file
+from .reporter import TestReporter
+from .runner import imap_ordered, resolve_workers
+from .version import __version__
+
+FORMAT = 1
+
+# Tests per generated file
+TESTS_PER_FILE = 50
+
+STEPS = [
+    '    navigate "https://app.example.com/login"',
+    '    input #email => "user{n}@example.com"',
+    '    input #password => secret("TEST_PASSWORD")',
+    '    click "Login"',
+    '',
+    '    # Verify successful login',
+    '    expect url contains "/dashboard"',
+    '    expect element ".user-menu" visible',
+]
+
+ASYNC_STEPS = [
+    '    await navigate "https://app.example.com"',
+    '    await all:',
+    '        - expect element ".header" visible',
+    '        - expect element ".footer" visible',
+    '        - screenshot "full-page-{n}"',
+]
+
+
+def write_suite(directory, tests):
+    """Write `tests` synthetic tests as .lux files; returns the files"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for first in range(0, tests, TESTS_PER_FILE):
+        chunks = []
+        for n in range(first, min(first + TESTS_PER_FILE, tests)):
+            if n % 5 == 4:
+                lines = [f'async test "Generated async test {n}":'] + ASYNC_STEPS
+            else:
+                lines = [f'test "Generated test {n}":'] + STEPS
+            chunks.append('\n'.join(lines).replace('{n}', str(n)))
+        path = directory / f"suite_{first // TESTS_PER_FILE:04d}.lux"
+        path.write_text('\n\n'.join(chunks) + '\n', encoding='utf-8')
+        files.append(path)
+    return files
+
+
+def bench_parse(workdir, tests):
+    files = write_suite(Path(workdir) / 'suite', tests)
+    megabytes = sum(path.stat().st_size for path in files) / (1024 * 1024)
+
+    def run():
+        start = time.perf_counter()
+        for path in files:
+            for _ in iter_lux_file(path):
+                pass
+        return megabytes / (time.perf_counter() - start)
+    return run
+
+
+class _InstantContext(Context):
+    """A browser that does every step in no time, leaving only LumenQA's own overhead"""
+
+    async def perform(self, step):
+        return None
+
+    def reset(self):
+        pass
+
+
+def bench_schedule(workdir, tests):
+    suite = [test for path in write_suite(Path(workdir) / 'suite', tests) for test in iter_lux_file(path)]
+    workers = resolve_workers('auto')
+    context = _InstantContext()
+
+    def run():
+        executor = StepExecutor()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                start = time.perf_counter_ns()
+                ordered = longest_first(suite, None)[0]
+                for _ in imap_ordered(pool, lambda test: executor.run(test, context), ordered, workers * 4):
+                    pass
+                elapsed = time.perf_counter_ns() - start
+        finally:
+            executor.close()
+        return elapsed / 1000 / len(suite)
+    return run
+
+
+def bench_report(workdir, tests):
+    output = Path(workdir) / 'report'
+
+    def run():
+        start = time.perf_counter()
+        reporter = TestReporter(output, stream=True)
+        try:
+            for n in range(tests):
+                failed = n % 20 == 19
+                reporter.add_result(
+                    f"Generated test {n}", 'failed' if failed else 'passed', 120.5,
+                    error="Element not found: #checkout" if failed else None,
+                    group=f"suite_{n // TESTS_PER_FILE:04d}.lux",
+                )
+        finally:
+            reporter.close()
+        reporter.generate_json()
+        return tests / (time.perf_counter() - start)
+    return run
+
+
+def bench_startup(workdir, tests):
+    command = [sys.executable, '-m', 'lumenqa', 'version']
+
+    def run():
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return (time.perf_counter() - start) * 1000
+    return run
+
+
+# name -> (setup(workdir, tests) returning a run() that measures one sample, unit, better)
+BENCHMARKS = {
+    'parse': (bench_parse, 'MB/s', 'higher'),
+    'schedule': (bench_schedule, 'us/test', 'lower'),
+    'report': (bench_report, 'results/s', 'higher'),
+    'startup': (bench_startup, 'ms', 'lower'),
+}
+
+
+def summarize(samples):
+    """Median, p90 and p99 of a list of samples"""
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        p90, p99 = cuts[89], cuts[98]
+    else:
+        p90 = p99 = samples[0]
+    return {'median': statistics.median(samples), 'p90': p90, 'p99': p99}
+
+
+def run_benchmarks(names=None, tests=5000, repeat=7, on_sample=None):
+    """Run the named benchmarks (all by default) and return the results document
+
+    `on_sample(name, index, value)` is called after each timed sample.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='lumen-bench-') as workdir:
+        for name in names or BENCHMARKS:
+            setup, unit, better = BENCHMARKS[name]
+            run = setup(os.path.join(workdir, name), tests)
+            run()
+            samples = []
+            for index in range(repeat):
+                samples.append(run())
+                if on_sample:
+                    on_sample(name, index, samples[-1])
+            results[name] = {'unit': unit, 'better': better, 'samples': samples, **summarize(samples)}
+
+    return {
+        'format': FORMAT,
+        'lumenqa': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'settings': {'tests': tests, 'repeat': repeat},
+        'benchmarks': results,
+    }
+
+
+def compare(current, baseline, threshold=0.10):
+    """Rows of (name, baseline median, current median, change, regressed) for shared benchmarks
+
+    `change` is the relative change in the median, signed so that positive
+    is worse whichever way the benchmark's unit improves.
+    """
+    rows = []
+    for name, result in current['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before or not before.get('median'):
+            continue
+        change = (result['median'] - before['median']) / before['median']
+        if result['better'] == 'higher':
+            change = -change
+        rows.append((name, before['median'], result['median'], change, change > threshold))
+    return rows
@@ -0,0 +1,166 @@
+"""
+LumenQA Parse Cache - Reuses parsed .lux files between runs
+
+Each source file gets one entry file under ``.lumen-cache/parse/`` holding a
+small fixed header (mtime, size, content hash) followed by the test list as
+JSON rows (see parser.dump_tests), so entries are data only. A matching
+mtime and size is a hit without reading the source; if only the mtime moved,
+the content hash decides. Entries are written to a temp file and renamed
+into place, so concurrent runners never see a half-written entry.
+"""
+
+import gc
+import hashlib
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+from .parser import dump_tests, load_tests, parse_lux_file, parse_lux_text
+from .version import __version__
+
+CACHE_DIR = '.lumen-cache'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+FORMAT_VERSION = 3
+MAGIC = b'LXPC'
+# magic, schema tag, source mtime_ns, source size, blake2b content digest
+HEADER = struct.Struct('<4s8sqq32s')
+SCHEMA = hashlib.blake2b(
+    f"{FORMAT_VERSION}:{__version__}".encode(), digest_size=8
+).digest()
+
+
+def content_digest(data):
+    """Hash file contents the way cache entries are keyed"""
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+class ParseCache:
+    """Persistent, size-capped cache of parsed .lux files"""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.dir = Path(root) / 'parse'
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, file_path):
+        """Return the parsed tests for file_path, parsing and storing on a miss"""
+        path = Path(file_path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return parse_lux_file(path)
+
+        entry = self._entry_path(path)
+        header, payload = self._read(entry)
+
+        if header and header[2] == stat.st_mtime_ns and header[3] == stat.st_size:
+            tests = self._decode(payload)
+            if tests is not None:
+                self.hits += 1
+                self._touch(entry)
+                return tests
+
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return parse_lux_file(path)
+        digest = content_digest(data)
+
+        if header and header[4] == digest:
+            tests = self._decode(payload)
+            if tests is not None:
+                # Same content with a new mtime (fresh checkout): refresh the header
+                self.hits += 1
+                self._write(entry, stat, digest, payload)
+                return tests
+
+        self.misses += 1
+        try:
+            tests = parse_lux_text(data.decode('utf-8'), path)
+        except UnicodeDecodeError:
+            return parse_lux_file(path)
+        self._write(entry, stat, digest, dump_tests(tests))
+        return tests
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits max_bytes"""
+        try:
+            entries = []
+            with os.scandir(self.dir) as scan:
+                for item in scan:
+                    if item.name.endswith('.bin'):
+                        stat = item.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+        except OSError:
+            return 0
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(entry)
+            except OSError:
+                # Another runner got there first
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def _entry_path(self, path):
+        key = hashlib.blake2b(str(path.resolve()).encode(), digest_size=16).hexdigest()
+        return self.dir / f"{key}.bin"
+
+    def _read(self, entry):
+        try:
+            with open(entry, 'rb') as handle:
+                blob = handle.read()
+        except OSError:
+            return None, None
+        if len(blob) < HEADER.size:
+            return None, None
+        header = HEADER.unpack_from(blob)
+        if header[0] != MAGIC or header[1] != SCHEMA:
+            return None, None
+        return header, blob[HEADER.size:]
+
+    def _decode(self, payload):
+        # Loading allocates thousands of records at once; cyclic GC passes
+        # triggered along the way would cost more than the load itself
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return load_tests(payload)
+        except ValueError:
+            # Truncated or foreign entry; treat it as a miss and overwrite it
+            return None
+        finally:
+            if was_enabled:
+                gc.enable()
+
+    def _write(self, entry, stat, digest, payload):
+        header = HEADER.pack(MAGIC, SCHEMA, stat.st_mtime_ns, stat.st_size, digest)
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as handle:
+                    handle.write(header)
+                    handle.write(payload)
+                os.replace(tmp, entry)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            # A read-only or full cache directory should never fail a run
+            pass
+
+    def _touch(self, entry):
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
@@ -0,0 +1,108 @@
+"""
+LumenQA Operation Classifier - Maps test names to TEST_OPERATIONS categories
+
+Each category has a list of keywords; a test belongs to the first category,
+in rule order, with a keyword anywhere in its (lowercased) name. All keywords
+are compiled into one trie-shaped regex, so classifying a name is a single
+scan whatever the number of categories:
+
+- the regex is a lookahead, so it reports a match at every position where
+  some keyword starts, overlapping ones included
+- at a position it takes the longest keyword; every other keyword that
+  starts there is a prefix of that one, so each keyword carries the best
+  priority among its own prefixes
+
+Results are memoized per name, for the most recent MEMO_SIZE names.
+"""
+
+import functools
+import re
+
+# Names whose category is remembered; generated suites can have millions
+MEMO_SIZE = 4096
+
+# The built-in rules, highest priority first
+DEFAULT_KEYWORDS = {
+    'pagination': ['pagination'],
+    'create': ['create', 'new'],
+    'edit': ['edit', 'change'],
+    'delete': ['delete'],
+    'search': ['search'],
+    'login': ['login'],
+    'assign': ['assign', 'unassign'],
+    'toggle': ['toggle'],
+    'upload': ['upload'],
+}
+
+
+def build_rules(categories, keywords=None):
+    """
+    Keyword rules for the given categories, in priority order
+
+    Built-in rules come first, then `keywords` (category -> list of words,
+    from the test data or lumen.yml), which also override built-ins for the
+    same category. A category with no rule matches its own name, with
+    underscores read as spaces too. Rules for missing categories are dropped.
+    """
+    categories = list(categories)
+    merged = {name: words for name, words in DEFAULT_KEYWORDS.items()}
+    merged.update(keywords or {})
+
+    rules = {name: words for name, words in merged.items() if name in categories}
+    for name in categories:
+        if name not in rules:
+            rules[name] = [name, name.replace('_', ' ')]
+    return rules
+
+
+def _trie_pattern(node):
+    """Regex matching the words in a trie node, longest match first"""
+    terminal = '' in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        return '(?:' + body + ')?'
+    return body
+
+
+class OperationClassifier:
+    """Single-pass, memoized keyword classifier"""
+
+    def __init__(self, rules):
+        # keyword -> (priority, category); the first rule to claim a keyword keeps it
+        owners = {}
+        for priority, (category, words) in enumerate(rules.items()):
+            for word in words:
+                word = str(word).lower()
+                if word and word not in owners:
+                    owners[word] = (priority, category)
+
+        trie = {}
+        for word in owners:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        # A match at some position means every keyword that is a prefix of it matched too
+        self._best = {}
+        for word in owners:
+            self._best[word] = min(owners[word[:end]] for end in range(1, len(word) + 1)
+                                   if word[:end] in owners)
+
+        self._pattern = re.compile(f"(?=({_trie_pattern(trie)}))") if owners else None
+        self.classify = functools.lru_cache(maxsize=MEMO_SIZE)(self.classify)
+
+    def classify(self, name):
+        """The category for a test name, or None if no keyword matches"""
+        best = None
+        if self._pattern is not None:
+            for match in self._pattern.finditer(name.lower()):
+                found = self._best[match.group(1)]
+                if best is None or found < best:
+                    best = found
+                    if found[0] == 0:
+                        break
+        return best[1] if best else None
@@ -0,0 +1,6 @@
+"""
+LumenQA CLI commands
+
+Each module is imported only when one of its commands is invoked; see
+LazyGroup in lumenqa.cli.
+"""
@@ -0,0 +1,89 @@
+"""
+LumenQA CLI - `lumen bench` for benchmarking LumenQA itself
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from ..bench import BENCHMARKS, compare, run_benchmarks
+
+console = Console()
+
+
+@click.command()
+@click.option('--only', multiple=True, type=click.Choice(list(BENCHMARKS)),
+              help='Run just this benchmark (repeatable)')
+@click.option('--tests', type=click.IntRange(min=1), default=5000, show_default=True,
+              help='Size of the generated suite')
+@click.option('--repeat', type=click.IntRange(min=1), default=7, show_default=True,
+              help='Timed runs per benchmark')
+@click.option('--quick', is_flag=True, help='Small suite and 3 runs, for a fast smoke check')
+@click.option('--output', '-o', default='lumen-results/bench.json', show_default=True,
+              type=click.Path(dir_okay=False), help='Where to save the results as JSON')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False),
+              help='Compare against results saved by an earlier run')
+@click.option('--threshold', type=click.FloatRange(min=0), default=10.0, show_default=True,
+              help='Percent a median may get worse before it counts as a regression')
+def bench(only, tests, repeat, quick, output, baseline, threshold):
+    """Benchmark LumenQA's own hot paths on a generated suite
+
+    Measures parsing, scheduling, report writing and CLI startup; no browser
+    is involved. With --baseline, exits 1 if any median regressed by more
+    than --threshold percent.
+    """
+    if quick:
+        tests, repeat = min(tests, 500), min(repeat, 3)
+
+    # Read before anything is written: --baseline may well be the --output file
+    previous = None
+    if baseline:
+        try:
+            previous = json.loads(Path(baseline).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Can't read baseline {baseline}: {e}[/red]")
+            sys.exit(1)
+
+    with console.status("[cyan]Benchmarking...[/cyan]") as status:
+        def on_sample(name, index, value):
+            status.update(f"[cyan]Benchmarking {name} ({index + 1}/{repeat})...[/cyan]")
+        results = run_benchmarks(only or None, tests, repeat, on_sample)
+
+    table = Table(title=f"lumen bench ({tests} tests, {repeat} runs)")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Median", justify="right", style="bold")
+    table.add_column("p90", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("Unit", style="dim")
+    for name, result in results['benchmarks'].items():
+        table.add_row(
+            name, f"{result['median']:,.1f}", f"{result['p90']:,.1f}", f"{result['p99']:,.1f}",
+            f"{result['unit']} ({result['better']} is better)",
+        )
+    console.print(table)
+
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+    console.print(f"[dim]Results: {path}[/dim]")
+
+    if previous is None:
+        return
+
+    regressions = 0
+    console.print(f"\n[bold]Against {baseline}[/bold] (lumenqa {previous.get('lumenqa', '?')})")
+    for name, before, after, change, regressed in compare(results, previous, threshold / 100):
+        regressions += regressed
+        delta = f"{change:.1%} worse" if change > 0 else f"{-change:.1%} better"
+        style = 'red' if regressed else 'green' if change < 0 else 'dim'
+        console.print(
+            f"  {name:<10} {before:>12,.1f} → {after:>12,.1f}  "
+            f"[{style}]{delta}{' (regression)' if regressed else ''}[/{style}]"
+        )
+    if regressions:
+        console.print(f"\n[red]{regressions} benchmark(s) regressed by more than {threshold:g}%[/red]")
+        sys.exit(1)
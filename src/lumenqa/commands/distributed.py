@@ -0,0 +1,105 @@
+"""
+LumenQA CLI - `lumen serve` and `lumen worker` for coordinator/worker runs
+"""
+
+import sys
+
+import click
+
+from ..distributed import DEFAULT_ADDRESS, HEARTBEAT_TIMEOUT, Coordinator, Worker, parse_address
+
+
+def _check_address(ctx, param, value):
+    try:
+        parse_address(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+    return value
+
+
+@click.command()
+@click.argument('test_paths', nargs=-1, required=True, metavar='PATHS...')
+@click.option('--listen', '-l', default=DEFAULT_ADDRESS, show_default=True, callback=_check_address,
+              help='HOST:PORT or unix:PATH to accept workers on')
+@click.option('--cache/--no-cache', default=True, help='Reuse parsed tests from .lumen-cache/')
+@click.option('--output-dir', '-o', default='lumen-results', type=click.Path(), help='Directory for reports')
+@click.option('--html', is_flag=True, help='Also write a paginated HTML report')
+@click.option('--history/--no-history', default=True,
+              help='Hand out tests longest-first using durations in .lumen-cache/history.db')
+@click.option('--incremental', is_flag=True,
+              help='Skip tests that passed last time and have not changed since')
+@click.option('--force', is_flag=True, help='With --incremental, run every test anyway')
+@click.option('--retries', type=click.IntRange(min=0),
+              help="Retry failed tests up to N times (default: lumen.yml's retries, else 0)")
+@click.option('--rerun-failed', is_flag=True,
+              help='Only run the tests that failed in the last run in --output-dir')
+@click.option('--heartbeat-timeout', default=HEARTBEAT_TIMEOUT, show_default=True,
+              type=click.FloatRange(min=1),
+              help='Seconds of silence before a worker is dropped and its tests requeued')
+@click.option('--quiet', '-q', is_flag=True, help='Only print failures and the summary')
+@click.option('--trace', type=click.Path(dir_okay=False),
+              help='Write a Chrome trace of the run, one track per worker, to this file')
+def serve(test_paths, listen, cache, output_dir, html, history, incremental, force, retries,
+          rerun_failed, heartbeat_timeout, quiet, trace):
+    """Coordinate a run across `lumen worker` processes
+
+    Parses PATHS once and hands tests out to workers as they ask for them,
+    until every test has a result. Reports are written here, as with
+    `lumen run`.
+    """
+    coordinator = Coordinator(
+        test_paths,
+        listen=listen,
+        heartbeat_timeout=heartbeat_timeout,
+        cache=cache,
+        output_dir=output_dir,
+        html=html,
+        history=history,
+        incremental=incremental,
+        force=force,
+        retries=retries,
+        rerun_failed=rerun_failed,
+        quiet=quiet,
+        trace=trace,
+    )
+    success = coordinator.run()
+    sys.exit(0 if success else 1)
+
+
+@click.command()
+@click.option('--connect', '-c', default=DEFAULT_ADDRESS, show_default=True, callback=_check_address,
+              help='Address of the `lumen serve` coordinator')
+@click.option('--parallel', '-p', type=int, help='Number of parallel workers (default: one per CPU)')
+@click.option('--batch', type=click.IntRange(min=1),
+              help='Tests to lease at a time (default: twice --parallel)')
+@click.option('--name', help='Name shown by the coordinator (default: host and process id)')
+@click.option('--browser', '-b', default='chrome', help='Browser to use')
+@click.option('--headless/--headed', default=True, help='Run in headless mode')
+@click.option('--step-concurrency', default=8, show_default=True,
+              help='Max concurrent steps within one test (await all / parallel)')
+@click.option('--max-concurrent-steps', default=64, show_default=True,
+              help='Max concurrent steps across all workers')
+@click.option('--sessions', type=click.IntRange(min=0),
+              help="Browser contexts to pre-warm per worker (default: lumen.yml's sessions.prewarm, else 1)")
+@click.option('--quiet', '-q', is_flag=True, help='Only print failures')
+def worker(connect, parallel, batch, name, browser, headless, step_concurrency,
+           max_concurrent_steps, sessions, quiet):
+    """Run tests handed out by a `lumen serve` coordinator
+
+    Exits once the coordinator has no tests left; start as many as you like,
+    on this machine or others.
+    """
+    runner = Worker(
+        connect,
+        parallel=parallel,
+        batch=batch,
+        name=name,
+        browser=browser,
+        headless=headless,
+        step_concurrency=step_concurrency,
+        max_concurrent_steps=max_concurrent_steps,
+        sessions=sessions,
+        quiet=quiet,
+    )
+    success = runner.run()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,39 @@
+"""
+LumenQA CLI - `lumen test` with live output
+"""
+
+import sys
+
+import click
+
+from ..live_runner import run_live_tests
+from .options import shard_option
+
+
+@click.command()
+@click.option('--suite', '-s', default='default', help='Test suite to run')
+@click.option('--parallel', '-p', type=int, help='Number of parallel workers')
+@click.option('--browser', '-b', default='chrome', help='Browser to use')
+@click.option('--tests-file', '-t', type=click.Path(exists=True), help='Test suite file (.jsonl, .yml/.yaml, or a Python test data module)')
+@click.option('--output-dir', '-o', default='lumen-results', type=click.Path(), help='Directory for reports')
+@click.option('--html', is_flag=True, help='Also write a paginated HTML report')
+@click.option('--retries', type=click.IntRange(min=0),
+              help="Retry failed tests up to N times (default: lumen.yml's retries, else 0)")
+@click.option('--rerun-failed', is_flag=True,
+              help='Only run the tests that failed in the last run in --output-dir')
+@shard_option('Run only shard K of N, split by a stable hash of class and test name')
+@click.option('--quiet', '-q', is_flag=True, help='Only print failures and the summary')
+@click.option('--trace', type=click.Path(dir_okay=False),
+              help='Write a Chrome trace (chrome://tracing, Perfetto) of the run to this file')
+@click.option('--profile', is_flag=True,
+              help='Profile the run (cProfile and tracemalloc) and write hotspots to --output-dir')
+def test(suite, parallel, browser, tests_file, output_dir, html, retries, rerun_failed, shard, quiet,
+         trace, profile):
+    """Run test suite with live output"""
+    if shard and shard[1] is None:
+        raise click.UsageError("--shard needs K/N")
+    success = run_live_tests(
+        tests_file=tests_file, output_dir=output_dir, html=html, trace=trace,
+        retries=retries, rerun_failed=rerun_failed, quiet=quiet, shard=shard, profile=profile,
+    )
+    sys.exit(0 if success else 1)
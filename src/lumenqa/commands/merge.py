@@ -0,0 +1,50 @@
+"""
+LumenQA CLI - `lumen merge` for combining per-shard reports
+"""
+
+import sys
+from pathlib import Path
+
+import click
+from rich.console import Console
+
+from ..reporter import TestReporter, iter_report_results
+
+console = Console()
+
+
+@click.command()
+@click.argument('reports', nargs=-1, required=True, type=click.Path(exists=True), metavar='REPORTS...')
+@click.option('--output-dir', '-o', default='lumen-results', type=click.Path(), help='Directory for the merged report')
+@click.option('--html', is_flag=True, help='Also write a paginated HTML report')
+def merge(reports, output_dir, html):
+    """Merge shard reports into one
+
+    REPORTS are result directories or results.json / results.jsonl files.
+    Results are streamed through, so any number of shards can be merged.
+    """
+    output = Path(output_dir).resolve()
+    for report in reports:
+        path = Path(report).resolve()
+        if path == output or (path.parent == output and path.name.startswith('results.')):
+            raise click.UsageError(f"{report} is inside --output-dir; merge into another directory")
+
+    reporter = TestReporter(output_dir, stream=True)
+    try:
+        for report in reports:
+            before = reporter.total
+            for result in iter_report_results(report):
+                reporter.add_record(result)
+            console.print(f"[dim]{report}: {reporter.total - before} results[/dim]")
+    finally:
+        reporter.close()
+
+    summary = reporter.summary()
+    console.print(
+        f"\n{summary['total']} tests: [green]{summary['passed']} passed[/green], "
+        f"[red]{summary['failed']} failed[/red]"
+    )
+    console.print(f"[dim]Report: {reporter.generate_json()}[/dim]")
+    if html:
+        console.print(f"[dim]HTML report: {reporter.generate_html()}[/dim]")
+    sys.exit(0 if summary['failed'] == 0 else 1)
@@ -0,0 +1,20 @@
+"""
+LumenQA CLI - Option helpers shared by several commands
+"""
+
+import click
+
+from ..shard import parse_shard
+
+
+def shard_option(value_help):
+    """--shard option parsed into a (K, N) tuple; N is None for a bare K"""
+    def convert(ctx, param, value):
+        if value is None:
+            return None
+        try:
+            return parse_shard(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e)) from None
+
+    return click.option('--shard', metavar='K/N', callback=convert, help=value_help)
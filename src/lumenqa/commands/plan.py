@@ -0,0 +1,58 @@
+"""
+LumenQA CLI - `lumen plan` for precompiled, sharded run plans
+"""
+
+import sys
+
+import click
+from rich.console import Console
+
+from ..config import load_config
+from ..fingerprint import environment, fingerprint_test
+from ..history import DurationHistory
+from ..plan import assign_shards, write_plan
+from ..runner import TestRunner
+from ..timing import format_ns
+
+console = Console()
+
+
+@click.command()
+@click.argument('test_paths', nargs=-1, required=True, metavar='PATHS...')
+@click.option('--output', '-o', default='plan.bin', show_default=True, type=click.Path(dir_okay=False),
+              help='Plan file to write')
+@click.option('--shards', '-n', default=1, show_default=True, type=click.IntRange(min=1),
+              help='Number of shards (CI nodes) to split the suite into')
+@click.option('--browser', '-b', default='chrome', help='Browser the plan will run on')
+@click.option('--headless/--headed', default=True, help='Headless mode the plan will run in')
+@click.option('--cache/--no-cache', default=True, help='Reuse parsed tests from .lumen-cache/')
+@click.option('--history/--no-history', default=True,
+              help='Balance shards using durations recorded in .lumen-cache/history.db')
+def plan(test_paths, output, shards, browser, headless, cache, history):
+    """Discover, parse and shard tests once, for `lumen run --plan`
+
+    Each CI node then runs `lumen run --plan FILE --shard K` without
+    touching the source tree.
+    """
+    runner = TestRunner(test_paths, cache=cache, history=False)
+    tests = runner.collect_tests()
+    if not tests:
+        console.print(f"[yellow]No .lux files found in: {' '.join(test_paths)}[/yellow]")
+        sys.exit(1)
+
+    env = environment(load_config(), browser, headless)
+    for test in tests:
+        test.fingerprint = fingerprint_test(test, env)
+
+    durations = DurationHistory() if history else None
+    try:
+        shard_tests, predicted = assign_shards(tests, shards, durations)
+    finally:
+        if durations:
+            durations.close()
+    path = write_plan(output, shard_tests, predicted)
+
+    console.print(f"[green]✓[/green] {len(tests)} tests from {runner.files} files → {path}")
+    for number, (assigned, duration) in enumerate(zip(shard_tests, predicted), 1):
+        console.print(f"  [dim]shard {number}: {len(assigned)} tests, ~{format_ns(duration * 1_000_000)}[/dim]")
+
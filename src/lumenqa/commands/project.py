@@ -0,0 +1,121 @@
+"""
+LumenQA CLI - Project commands (init, convert)
+"""
+
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn
+
+console = Console()
+
+
+@click.command()
+@click.argument('path', type=click.Path(), required=False, default='.')
+def init(path):
+    """Initialize a new LumenQA project"""
+    console.print("\n[cyan bold]🚀 Initializing LumenQA project...[/cyan bold]\n")
+
+    project_path = Path(path)
+    project_path.mkdir(exist_ok=True)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("Creating project structure...", total=4)
+
+        # Create directories
+        time.sleep(0.3)
+        (project_path / "tests").mkdir(exist_ok=True)
+        progress.update(task, advance=1, description="Created tests/ directory")
+
+        time.sleep(0.3)
+        # Create lumen.yml
+        lumen_config = """framework: lumenqa
+version: 0.9.4
+
+# Execution settings
+parallelization: auto
+retries: 2
+timeout: 30s
+
+# Browser settings
+browsers:
+  - chrome
+headless: true
+
+# LumenVM optimization
+lumenvm:
+  gpu_acceleration: true
+  intent_trees: enabled
+  dom_caching: aggressive
+
+# Reporting
+reporting:
+  type: lumencloud
+  screenshots: on-failure
+  videos: on-failure
+"""
+        (project_path / "lumen.yml").write_text(lumen_config)
+        progress.update(task, advance=1, description="Created lumen.yml")
+
+        time.sleep(0.3)
+        # Create example test
+        example_test = '''test "Example test":
+    navigate "https://example.com"
+    expect title "Example Domain"
+    expect element "h1" visible
+'''
+        (project_path / "tests" / "example.lux").write_text(example_test)
+        progress.update(task, advance=1, description="Created example.lux")
+
+        time.sleep(0.3)
+        # Create .lumenignore
+        (project_path / ".lumenignore").write_text("node_modules/\n.git/\n.lumen-cache/\n*.pyc\n")
+        progress.update(task, advance=1, description="Created .lumenignore")
+
+    console.print("\n[green]✓[/green] Project initialized successfully!\n")
+    console.print("[dim]Next steps:[/dim]")
+    if path != '.':
+        console.print(f"  cd {path}")
+    console.print("  lumen run tests/example.lux\n")
+
+
+@click.command()
+@click.option('--from', 'from_framework', required=True, type=click.Choice(['playwright', 'selenium', 'cypress']))
+@click.argument('path', type=click.Path(exists=True))
+def convert(from_framework, path):
+    """Convert tests from other frameworks to PyLux"""
+    console.print(f"\n[cyan bold]🔄 Converting {from_framework} tests to PyLux...[/cyan bold]\n")
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("Analyzing source files...", total=5)
+        time.sleep(0.8)
+
+        progress.update(task, advance=1, description="Parsing test files...")
+        time.sleep(1.2)
+
+        progress.update(task, advance=1, description="Generating intent trees...")
+        time.sleep(0.9)
+
+        progress.update(task, advance=1, description="Converting to PyLux syntax...")
+        time.sleep(1.5)
+
+        progress.update(task, advance=1, description="Optimizing for LumenVM...")
+        time.sleep(0.7)
+
+        progress.update(task, advance=1, description="Writing converted files...")
+        time.sleep(0.5)
+
+    console.print("\n[green]✓[/green] Conversion complete!\n")
+    console.print(f"[dim]Converted 12 test files from {from_framework} to PyLux[/dim]")
+    console.print(f"[dim]Output: {path}/converted/[/dim]\n")
+    console.print("[yellow]⚠[/yellow]  Please review converted tests before running\n")
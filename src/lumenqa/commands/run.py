@@ -0,0 +1,88 @@
+"""
+LumenQA CLI - `lumen run` for PyLux test files
+"""
+
+import sys
+
+import click
+
+from ..runner import TestRunner
+from ..shard import SHARD_MODES
+from .options import shard_option
+
+
+@click.command()
+@click.argument('test_paths', nargs=-1, metavar='PATHS...')
+@click.option('--parallel', '-p', type=int, help='Number of parallel workers (default: one per CPU)')
+@click.option('--browser', '-b', default='chrome', help='Browser to use')
+@click.option('--headless/--headed', default=True, help='Run in headless mode')
+@click.option('--cache/--no-cache', default=True, help='Reuse parsed tests from .lumen-cache/')
+@click.option('--output-dir', '-o', default='lumen-results', type=click.Path(), help='Directory for reports')
+@click.option('--html', is_flag=True, help='Also write a paginated HTML report')
+@click.option('--step-concurrency', default=8, show_default=True,
+              help='Max concurrent steps within one test (await all / parallel)')
+@click.option('--max-concurrent-steps', default=64, show_default=True,
+              help='Max concurrent steps across all workers')
+@click.option('--history/--no-history', default=True,
+              help='Schedule longest-first using durations recorded in .lumen-cache/history.db')
+@click.option('--incremental', is_flag=True,
+              help='Skip tests that passed last time and have not changed since')
+@click.option('--force', is_flag=True, help='With --incremental, run every test anyway')
+@click.option('--retries', type=click.IntRange(min=0),
+              help="Retry failed tests up to N times (default: lumen.yml's retries, else 0)")
+@click.option('--rerun-failed', is_flag=True,
+              help='Only run the tests that failed in the last run in --output-dir')
+@click.option('--plan', 'plan_file', type=click.Path(exists=True, dir_okay=False),
+              help='Run tests from a plan written by `lumen plan` instead of PATHS')
+@shard_option("Run only shard K of N (with --plan, just K picks the plan's shard)")
+@click.option('--shard-by', type=click.Choice(SHARD_MODES), default='hash', show_default=True,
+              help='Split by a stable hash of file and name, or balance by recorded durations')
+@click.option('--quiet', '-q', is_flag=True, help='Only print failures and the summary')
+@click.option('--sessions', type=click.IntRange(min=0),
+              help="Browser contexts to pre-warm per worker (default: lumen.yml's sessions.prewarm, else 1)")
+@click.option('--healing-cache/--no-healing-cache', default=True,
+              help='Try selectors learned in .lumen-cache/healing.db before the fallback chain')
+@click.option('--trace', type=click.Path(dir_okay=False),
+              help='Write a Chrome trace (chrome://tracing, Perfetto) of the run to this file')
+@click.option('--profile', is_flag=True,
+              help='Profile the run (cProfile and tracemalloc) and write hotspots to --output-dir')
+def run(test_paths, parallel, browser, headless, cache, output_dir, html, step_concurrency,
+        max_concurrent_steps, history, incremental, force, retries, rerun_failed, plan_file, shard,
+        shard_by, quiet, sessions, healing_cache, trace, profile):
+    """Run LumenQA tests
+
+    PATHS can be .lux files, directories (searched recursively) or glob
+    patterns such as 'tests/**/login_*.lux'. Entries in .lumenignore are
+    skipped. With --plan, PATHS are not needed.
+    """
+    if not test_paths and not plan_file:
+        raise click.UsageError("Give PATHS to run, or --plan FILE")
+    if shard and shard[1] is None and not plan_file:
+        raise click.UsageError("--shard needs K/N unless running a --plan")
+
+    runner = TestRunner(
+        test_paths,
+        parallel=parallel,
+        browser=browser,
+        headless=headless,
+        cache=cache,
+        output_dir=output_dir,
+        html=html,
+        step_concurrency=step_concurrency,
+        max_concurrent_steps=max_concurrent_steps,
+        trace=trace,
+        history=history,
+        incremental=incremental,
+        force=force,
+        retries=retries,
+        rerun_failed=rerun_failed,
+        plan=plan_file,
+        shard=shard,
+        shard_by=shard_by,
+        quiet=quiet,
+        sessions=sessions,
+        healing=healing_cache,
+        profile=profile,
+    )
+    success = runner.run()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,100 @@
+"""
+LumenQA Config - Reads lumen.yml
+
+Only the settings the runners act on are interpreted here; everything else
+in the file is passed through untouched. A missing file is an empty config.
+"""
+
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+from rich.console import Console
+
+console = Console()
+
+CONFIG_FILE = 'lumen.yml'
+
+
+def load_config(path=None):
+    """Load lumen.yml (or `path`) as a dict; problems are reported and ignored"""
+    path = Path(path or CONFIG_FILE)
+    try:
+        config = yaml.safe_load(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        console.print(f"[red]Error loading {path}: {e}[/red]")
+        return {}
+
+    if config is None:
+        return {}
+    if not isinstance(config, dict):
+        console.print(f"[red]Error loading {path}: expected a mapping of settings[/red]")
+        return {}
+    return config
+
+
+def resolve_retries(value):
+    """Retry count from --retries or lumen.yml's `retries:` (bad values mean no retries)"""
+    if isinstance(value, dict):
+        value = value.get('retries', 0)
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+SESSION_DEFAULTS = {
+    'driver': 'fake',
+    'prewarm': 1,
+    'max_uses': 50,
+    'max_memory_growth': 256,
+}
+
+
+def resolve_sessions(config, prewarm=None):
+    """Session pool settings from lumen.yml's `sessions:` (bad values fall back to defaults)"""
+    section = config.get('sessions') if isinstance(config, dict) else None
+    settings = dict(SESSION_DEFAULTS)
+    if isinstance(section, dict):
+        settings['driver'] = str(section.get('driver') or settings['driver'])
+        for key in ('prewarm', 'max_uses', 'max_memory_growth'):
+            try:
+                settings[key] = max(0, int(section.get(key, settings[key])))
+            except (TypeError, ValueError):
+                pass
+    if prewarm is not None:
+        settings['prewarm'] = max(0, int(prewarm))
+    return settings
+
+
+API_DEFAULTS: Dict[str, Any] = {
+    'base_url': None,
+    'timeout': 30,
+    # None: sized from the run's workers and step concurrency
+    'pool_size': None,
+    'hosts': 4,
+    'headers': {},
+    'graphql': '/graphql',
+}
+
+
+def resolve_api(config):
+    """HTTP client settings from lumen.yml's `api:`; base_url is None unless one is set"""
+    section = config.get('api') if isinstance(config, dict) else None
+    settings = dict(API_DEFAULTS)
+    if not isinstance(section, dict):
+        return settings
+    if section.get('base_url'):
+        settings['base_url'] = str(section['base_url'])
+    if section.get('graphql'):
+        settings['graphql'] = str(section['graphql'])
+    if isinstance(section.get('headers'), dict):
+        settings['headers'] = {str(k): str(v) for k, v in section['headers'].items()}
+    for key, cast in (('timeout', float), ('pool_size', int), ('hosts', int)):
+        try:
+            settings[key] = max(1, cast(section.get(key, settings[key])))
+        except (TypeError, ValueError):
+            pass
+    return settings
@@ -0,0 +1,220 @@
+"""
+LumenQA Test Discovery - Finds .lux files for `lumen run`
+
+Paths can be files, directories (walked recursively) or glob patterns such as
+``tests/**/login_*.lux``. Directories are scanned concurrently and files are
+yielded as soon as their directory has been listed, so parsing can start
+before the walk finishes. ``.lumenignore`` patterns are compiled once and
+checked against each directory before it is entered, which prunes whole
+subtrees instead of filtering their files afterwards.
+"""
+
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+IGNORE_FILE = '.lumenignore'
+DEFAULT_IGNORES = ['.git/', '.lumen-cache/']
+GLOB_CHARS = re.compile(r'[*?\[]')
+_DONE = object()
+
+
+def _translate(pattern):
+    """Translate a gitignore-style glob into a regex ('*' never crosses '/')"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                parts.append('[' + pattern[i + 1:end].replace('\\', '\\\\') + ']')
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return ''.join(parts)
+
+
+def _compile(patterns):
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{p})' for p in patterns))
+
+
+class IgnoreRules:
+    """
+    Compiled .lumenignore patterns
+
+    Supports the common gitignore subset: ``name`` matches at any depth,
+    patterns containing ``/`` are anchored to the project root, a trailing
+    ``/`` matches directories only, and ``**`` spans directories. All
+    patterns of one kind are folded into a single regex.
+    """
+
+    def __init__(self, patterns=()):
+        names, paths, dir_names, dir_paths = [], [], [], []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            anchored = '/' in pattern
+            regex = _translate(pattern.lstrip('/'))
+            if anchored:
+                (dir_paths if dir_only else paths).append(regex)
+            else:
+                (dir_names if dir_only else names).append(regex)
+
+        self._names = _compile(names)
+        self._paths = _compile(paths)
+        self._dir_names = _compile(names + dir_names)
+        self._dir_paths = _compile(paths + dir_paths)
+
+    @classmethod
+    def load(cls, root='.'):
+        """Read <root>/.lumenignore (if any) on top of the built-in ignores"""
+        patterns = list(DEFAULT_IGNORES)
+        try:
+            patterns.extend(Path(root, IGNORE_FILE).read_text().splitlines())
+        except OSError:
+            pass
+        return cls(patterns)
+
+    def ignores(self, rel_path, name, is_dir):
+        """Whether a path (relative to the project root, '/'-separated) is ignored"""
+        if is_dir:
+            names, paths = self._dir_names, self._dir_paths
+        else:
+            names, paths = self._names, self._paths
+        if names is not None and names.fullmatch(name):
+            return True
+        return paths is not None and paths.fullmatch(rel_path) is not None
+
+
+def split_glob(pattern):
+    """Split a glob into (base directory, compiled matcher for full paths)"""
+    parts = Path(pattern).parts
+    for i, part in enumerate(parts):
+        if GLOB_CHARS.search(part):
+            base = Path(*parts[:i]) if i else Path('.')
+            rest = '/'.join(parts[i:])
+            prefix = '' if base == Path('.') else re.escape(base.as_posix().rstrip('/')) + '/'
+            return base, re.compile(prefix + _translate(rest))
+    return Path(pattern), None
+
+
+def discover(paths, ignore=None, workers=8, root='.'):
+    """
+    Yield .lux files under paths, as they are found
+
+    Files named explicitly are yielded as-is (never ignored). With more than
+    one worker, files from different directories arrive in scan-completion
+    order; each directory's own files stay sorted by name.
+    """
+    ignore = ignore if ignore is not None else IgnoreRules.load(root)
+    root = os.path.abspath(root)
+    walks = []
+
+    for raw in paths:
+        path = Path(raw)
+        if GLOB_CHARS.search(str(raw)):
+            base, matcher = split_glob(str(raw))
+            if base.is_dir():
+                walks.append((base, matcher))
+        elif path.is_dir():
+            walks.append((path, None))
+        elif path.is_file():
+            yield path
+
+    if walks:
+        yield from _ParallelWalk(ignore, workers, root).run(walks)
+
+
+class _ParallelWalk:
+    """Concurrent directory walk that feeds files back through a queue"""
+
+    def __init__(self, ignore, workers, root):
+        self.ignore = ignore
+        self.workers = max(1, workers)
+        self.root = root
+        self.out = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.cancelled = False
+
+    def run(self, walks):
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='lumen-scan')
+        try:
+            for base, matcher in walks:
+                self._submit(pool, str(base), self._relative(base), matcher)
+
+            while True:
+                batch = self.out.get()
+                if batch is _DONE:
+                    break
+                for item in batch:
+                    yield Path(item)
+        finally:
+            # Also reached when the consumer stops early
+            self.cancelled = True
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _relative(self, base):
+        rel = os.path.relpath(os.path.abspath(base), self.root)
+        return '' if rel == '.' else rel.replace(os.sep, '/')
+
+    def _submit(self, pool, directory, rel, matcher):
+        with self.lock:
+            self.pending += 1
+        pool.submit(self._scan, pool, directory, rel, matcher)
+
+    def _scan(self, pool, directory, rel, matcher):
+        files = []
+        try:
+            if not self.cancelled:
+                with os.scandir(directory) as scan:
+                    entries = sorted(scan, key=lambda entry: entry.name)
+                for entry in entries:
+                    child = f"{rel}/{entry.name}" if rel else entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if not self.ignore.ignores(child, entry.name, True):
+                            self._submit(pool, entry.path, child, matcher)
+                    elif entry.name.endswith('.lux'):
+                        if self.ignore.ignores(child, entry.name, False):
+                            continue
+                        if matcher is None or matcher.fullmatch(Path(entry.path).as_posix()):
+                            files.append(entry.path)
+        except (OSError, RuntimeError):
+            # Unreadable directory, or the pool was shut down mid-walk
+            pass
+        finally:
+            if files:
+                self.out.put(files)
+            with self.lock:
+                self.pending -= 1
+                finished = self.pending == 0
+            if finished:
+                self.out.put(_DONE)
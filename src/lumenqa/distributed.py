@@ -0,0 +1,493 @@
+"""
+LumenQA Distributed Runs - A coordinator feeding workers over a socket
+
+``lumen serve`` parses the suite once, orders it longest-first and holds it
+as a queue; any number of ``lumen worker --connect ADDR`` processes, on this
+machine or others, pull tests from it and stream results back. Unlike static
+shards, a fast worker simply takes more tests, so nobody sits idle while a
+slow shard finishes.
+
+Coordinator and workers exchange newline-delimited JSON over one Unix or TCP
+connection per worker. Every request from a worker gets exactly one reply,
+``error {error}`` if it's malformed:
+
+    hello      {name, threads}       -> welcome {worker, heartbeat, retries}
+    lease      {max}                 -> tests {tests: [{id, test}]} | wait | done
+    start      {id}                  -> ok | revoked
+    result     {id, result}          -> ok
+    heartbeat  {}                    -> ok
+
+- Leases are batches, sized so the queue is shared out evenly: large early
+  on, single tests near the end.
+- A worker whose queue is empty while others still hold unstarted tests
+  steals half of the fullest worker's batch. The victim learns about it when
+  it asks to start one of those tests and gets ``revoked``.
+- Workers send a heartbeat every second. A worker that disconnects, or stays
+  silent for longer than the heartbeat timeout, has its unfinished tests put
+  back at the front of the queue.
+- The first result for a test wins, so a test run twice after a requeue is
+  only reported once.
+
+The coordinator writes the reports, history and result store exactly like
+``lumen run``; workers only execute.
+"""
+
+import json
+import math
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.markup import escape
+
+from .history import longest_first
+from .parser import Test
+from .render import Renderer
+from .runner import PARSE_WORKERS, TestRunner, console, resolve_workers
+
+DEFAULT_ADDRESS = '127.0.0.1:7341'
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 10.0
+# How long a worker keeps retrying to reach a coordinator that isn't up yet
+CONNECT_TIMEOUT = 30.0
+# How long a worker waits before asking again when there is nothing to lease
+POLL_INTERVAL = 0.2
+# How long the coordinator waits, once everything is done, for workers to hear so
+DRAIN_TIMEOUT = 5.0
+# What a worker's result must carry for the coordinator to report it
+RESULT_FIELDS = ('name', 'file', 'passed', 'steps', 'duration', 'attempts', 'error', 'error_step')
+
+
+def parse_address(text):
+    """Turn 'HOST:PORT', ':PORT', 'unix:PATH' or a socket path into (family, address)
+
+    Raises ValueError for anything else.
+    """
+    if text.startswith('unix:'):
+        return socket.AF_UNIX, text[len('unix:'):]
+    if '/' in text or text.endswith('.sock'):
+        return socket.AF_UNIX, text
+    host, sep, port = text.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT or unix:PATH, got {text!r}")
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def _encode(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+def _malformed(message):
+    """Why a decoded request can't be acted on, or None if it can"""
+    if not isinstance(message, dict):
+        return "request is not an object"
+    kind = message.get('type')
+    if kind == 'hello' and not isinstance(message.get('threads', 1), (int, type(None))):
+        return "hello with a non-integer thread count"
+    if kind == 'lease' and not isinstance(message.get('max', 1), (int, type(None))):
+        return "lease with a non-integer max"
+    if kind in ('start', 'result') and not isinstance(message.get('id'), int):
+        return f"{kind} without a test id"
+    if kind == 'result':
+        result = message.get('result')
+        if not isinstance(result, dict) or any(field not in result for field in RESULT_FIELDS):
+            return "result without the fields of a test result"
+    return None
+
+
+class _WorkerState:
+    """What the coordinator knows about one connected worker"""
+
+    def __init__(self, name, threads, connection):
+        self.name = name
+        self.threads = threads
+        self.connection = connection
+        self.leased = {}  # test id -> None, in lease order
+        self.last_seen = time.monotonic()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One worker connection; requests are answered in order"""
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        state = None
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                problem = _malformed(message)
+                if problem:
+                    # Answer it, so one bad request doesn't cost the worker its connection
+                    self.wfile.write(_encode({'type': 'error', 'error': problem}))
+                    continue
+                if state is None:
+                    if message.get('type') != 'hello':
+                        return
+                    state = coordinator._join(message, self.connection)
+                    reply = coordinator._welcome(state)
+                else:
+                    reply = coordinator._dispatch(state, message)
+                self.wfile.write(_encode(reply))
+        except (OSError, ValueError):
+            # A broken connection is handled like a dead worker
+            pass
+        finally:
+            if state is not None:
+                coordinator._leave(state)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator(TestRunner):
+    """Owns the parsed suite and hands it out to workers"""
+
+    def __init__(self, test_paths, listen=DEFAULT_ADDRESS, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 **kwargs):
+        super().__init__(test_paths, **kwargs)
+        self.listen = listen
+        self.family, self.address = parse_address(listen)
+        self.heartbeat_timeout = heartbeat_timeout
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._tests = {}
+        self._queue = deque()
+        self._owner = {}
+        self._started = set()
+        self._done = set()
+        self._workers = {}
+        self._joined = 0
+
+    def _execute_tests(self):
+        """Parse the suite, then serve it until every test has a result"""
+        with ThreadPoolExecutor(PARSE_WORKERS, thread_name_prefix='lumen-parse') as pool:
+            tests = list(self._select_tests(self._parse_tests(pool)))
+        if self.history and tests:
+            tests, _, known = longest_first(tests, self.history)
+            self._note(f"[dim]Scheduled longest-first: {known}/{len(tests)} tests from history[/dim]")
+        if not tests:
+            return
+
+        self._tests = dict(enumerate(tests))
+        self._queue = deque(self._tests)
+
+        server_class = _UnixServer if self.family == socket.AF_UNIX else _TCPServer
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+        server = server_class(self.address, _Handler)
+        server.coordinator = self
+        threading.Thread(target=server.serve_forever, name='lumen-serve', daemon=True).start()
+        threading.Thread(target=self._reap, name='lumen-reaper', daemon=True).start()
+        self._note(
+            f"[dim]Serving {len(tests)} tests on {self.listen}; "
+            f"start workers with: lumen worker --connect {self.listen}[/dim]\n"
+        )
+
+        try:
+            # Wait in short slices so Ctrl+C still gets through
+            while not self._finished.wait(0.5):
+                pass
+            self._drain()
+        finally:
+            server.shutdown()
+            server.server_close()
+            if self.family == socket.AF_UNIX and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def _drain(self):
+        """Give connected workers a moment to be told `done` and disconnect"""
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while self._workers and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL / 4)
+
+    def _join(self, message, connection):
+        with self._lock:
+            self._joined += 1
+            name = f"{message.get('name') or 'worker'}#{self._joined}"
+            state = _WorkerState(name, int(message.get('threads') or 1), connection)
+            self._workers[name] = state
+        self._note(f"[dim]Worker {escape(name)} joined ({state.threads} threads)[/dim]")
+        return state
+
+    def _welcome(self, state):
+        return {
+            'type': 'welcome',
+            'worker': state.name,
+            'heartbeat': HEARTBEAT_INTERVAL,
+            'retries': self.retries,
+        }
+
+    def _dispatch(self, state, message):
+        """Answer one request from a worker"""
+        state.last_seen = time.monotonic()
+        kind = message.get('type')
+        if kind == 'lease':
+            return self._lease(state, max(1, int(message.get('max') or 1)))
+        if kind == 'start':
+            return self._start(state, message['id'])
+        if kind == 'result':
+            self._finish(state, message['id'], message['result'])
+        return {'type': 'ok'}
+
+    def _lease(self, state, wanted):
+        with self._lock:
+            if len(self._done) == len(self._tests):
+                return {'type': 'done'}
+            if not self._queue:
+                self._steal(state)
+            if not self._queue:
+                return {'type': 'wait'}
+
+            # Guided batches: a fair share of what's left, never more than asked for
+            share = math.ceil(len(self._queue) / (2 * max(1, len(self._workers))))
+            batch = []
+            for _ in range(min(wanted, share)):
+                test_id = self._queue.popleft()
+                self._owner[test_id] = state.name
+                state.leased[test_id] = None
+                batch.append({'id': test_id, 'test': self._wire(self._tests[test_id])})
+        return {'type': 'tests', 'tests': batch}
+
+    def _steal(self, thief):
+        """Move half of the fullest worker's unstarted tests back onto the queue"""
+        best, unstarted = None, []
+        for state in self._workers.values():
+            if state is thief:
+                continue
+            waiting = [test_id for test_id in state.leased if test_id not in self._started]
+            if len(waiting) > len(unstarted):
+                best, unstarted = state, waiting
+        if best is None:
+            return
+        # Take from the end of the batch; the victim works from the front
+        for test_id in unstarted[len(unstarted) // 2:]:
+            del best.leased[test_id]
+            del self._owner[test_id]
+            self._queue.append(test_id)
+
+    def _start(self, state, test_id):
+        with self._lock:
+            if self._owner.get(test_id) != state.name:
+                return {'type': 'revoked'}
+            self._started.add(test_id)
+        return {'type': 'ok'}
+
+    def _finish(self, state, test_id, result):
+        with self._lock:
+            if test_id in self._done or test_id not in self._tests:
+                return
+            self._done.add(test_id)
+            owner = self._owner.pop(test_id, None)
+            if owner is not None and owner in self._workers:
+                self._workers[owner].leased.pop(test_id, None)
+            self._started.discard(test_id)
+            if test_id in self._queue:
+                self._queue.remove(test_id)
+
+            test = self._tests[test_id]
+            result['fingerprint'] = test.fingerprint
+            end = time.perf_counter_ns()
+            self.timeline.record(
+                'test', result['name'], end - int(result['duration'] * 1_000_000), end,
+                track=state.name,
+            )
+            self._record_result(result)
+            if len(self._done) == len(self._tests):
+                self._finished.set()
+
+    def _leave(self, state):
+        """Requeue whatever a departed worker hadn't finished"""
+        with self._lock:
+            self._workers.pop(state.name, None)
+            requeued = [test_id for test_id in state.leased if test_id not in self._done]
+            for test_id in reversed(requeued):
+                self._owner.pop(test_id, None)
+                self._started.discard(test_id)
+                self._queue.appendleft(test_id)
+            state.leased.clear()
+        if requeued:
+            self._note(
+                f"[yellow]Worker {escape(state.name)} left; requeued {len(requeued)} "
+                f"test{'s' if len(requeued) != 1 else ''}[/yellow]"
+            )
+
+    def _reap(self):
+        """Disconnect workers that stopped sending heartbeats"""
+        while not self._finished.wait(HEARTBEAT_INTERVAL):
+            now = time.monotonic()
+            with self._lock:
+                silent = [
+                    state for state in self._workers.values()
+                    if now - state.last_seen > self.heartbeat_timeout
+                ]
+            for state in silent:
+                # The handler sees the connection close and requeues its tests
+                try:
+                    state.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _wire(test):
+        """A test as sent to workers (fingerprints stay with the coordinator)"""
+        data = test.to_dict()
+        data.pop('fingerprint', None)
+        return data
+
+
+class Worker(TestRunner):
+    """Pulls tests from a coordinator and runs them on a local thread pool"""
+
+    def __init__(self, connect, parallel=None, batch=None, name=None, **kwargs):
+        super().__init__([], parallel=parallel, cache=False, history=False, **kwargs)
+        self.connect = connect
+        self.family, self.address = parse_address(connect)
+        self.batch = batch
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.lost = False
+        self._local = deque()
+        self._local_lock = threading.Lock()
+        self._call_lock = threading.Lock()
+        self._sock = None
+        self._rfile = None
+
+    def run(self):
+        """Work until the coordinator has nothing left; False if the connection was lost"""
+        if not self._load_driver():
+            return False
+        try:
+            self._connect()
+        except OSError as e:
+            console.print(f"[red]Can't reach a coordinator at {self.connect}: {e}[/red]")
+            return False
+
+        workers = resolve_workers(self.parallel)
+        batch = self.batch or workers * 2
+        welcome = self._call({'type': 'hello', 'name': self.name, 'threads': workers})
+        self.retries = welcome['retries']
+        if self.output != 'quiet':
+            console.print(
+                f"[cyan]Connected to {self.connect} as {escape(welcome['worker'])} "
+                f"({workers} worker{'s' if workers != 1 else ''})[/cyan]"
+            )
+
+        self.renderer = Renderer(console, 'quiet' if self.output == 'quiet' else 'compact')
+        stop = threading.Event()
+        beat = threading.Thread(
+            target=self._heartbeat, args=(stop, welcome['heartbeat']), name='lumen-heartbeat',
+            daemon=True,
+        )
+        beat.start()
+        start = time.perf_counter_ns()
+        try:
+            with self._execution(workers):
+                self._run_threads(workers, batch)
+        finally:
+            stop.set()
+            self.renderer.close()
+            # The reader shares the socket; both must close for the coordinator to see EOF
+            self._rfile.close()
+            self._sock.close()
+            self.healer.close()
+        self.wall_ns = time.perf_counter_ns() - start
+
+        ran = self.results['passed'] + self.results['failed']
+        if self.lost:
+            console.print(f"[red]Lost the connection to {self.connect} after {ran} tests[/red]")
+        elif self.output != 'quiet':
+            console.print(
+                f"[dim]Ran {ran} tests ({self.results['passed']} passed, "
+                f"{self.results['failed']} failed) in {self.wall_ns / 1e9:.1f}s[/dim]"
+            )
+        return not self.lost
+
+    def _run_threads(self, workers, batch):
+        threads = [
+            threading.Thread(target=self._work, args=(batch,), name=f'lumen-worker_{i}')
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _connect(self):
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.address)
+                break
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(POLL_INTERVAL)
+        self._sock = sock
+        self._rfile = sock.makefile('rb')
+
+    def _call(self, message):
+        """Send one request and wait for its reply"""
+        with self._call_lock:
+            self._sock.sendall(_encode(message))
+            line = self._rfile.readline()
+        if not line:
+            raise ConnectionError("the coordinator closed the connection")
+        reply = json.loads(line)
+        if reply.get('type') == 'error':
+            raise ValueError(f"the coordinator rejected {message['type']}: {reply.get('error')}")
+        return reply
+
+    def _heartbeat(self, stop, interval):
+        while not stop.wait(interval):
+            try:
+                self._call({'type': 'heartbeat'})
+            except OSError:
+                return
+
+    def _next(self, batch):
+        """The next (id, test) to run, leasing or stealing more as needed; None when done"""
+        while True:
+            with self._local_lock:
+                if self._local:
+                    return self._local.popleft()
+            reply = self._call({'type': 'lease', 'max': batch})
+            if reply['type'] == 'done':
+                return None
+            if reply['type'] == 'wait':
+                time.sleep(POLL_INTERVAL)
+                continue
+            with self._local_lock:
+                self._local.extend((item['id'], Test.from_dict(item['test'])) for item in reply['tests'])
+
+    def _work(self, batch):
+        try:
+            while True:
+                leased = self._next(batch)
+                if leased is None:
+                    return
+                test_id, test = leased
+                if self._call({'type': 'start', 'id': test_id})['type'] != 'ok':
+                    # Stolen by another worker
+                    continue
+                result = self._run_single_test(test)
+                self._call({'type': 'result', 'id': test_id, 'result': result})
+                self._count(result)
+        except (OSError, ValueError):
+            self.lost = True
+
+    def _count(self, result):
+        with self._local_lock:
+            self.results['passed' if result['passed'] else 'failed'] += 1
+        if not result['passed'] or self.output != 'quiet':
+            self.renderer.submit(self._show_test_line, result)
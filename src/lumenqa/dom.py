@@ -0,0 +1,566 @@
+"""
+LumenQA DOM Snapshots - An indexed copy of a page that queries don't rescan
+
+A snapshot parses HTML once into a node table: parallel arrays for the tree
+(parent, first/last child, siblings), an interned tag code per node, and
+per-node attribute dicts and own text. Alongside it live inverted indexes
+from id, class, tag, attribute name, ``data-testid`` and text to the set of
+nodes carrying them.
+
+Queries take the CSS subset PyLux steps use:
+
+    tag  #id  .class  [attr]  [attr='v']  [attr^='v']  [attr$='v']  [attr*='v']
+    a b  a > b  a, b  :first-child  :last-child  :first  :last
+
+plus text selectors (``click "Sign In"``). The rightmost part of a selector
+starts from the smallest index set that covers it; only those candidates are
+matched, walking up the parent arrays for combinators. Cost depends on how
+many nodes could match, not on the size of the page.
+
+Pages change, so a snapshot takes mutation batches, as a MutationObserver
+would report them:
+
+    ('append', parent, html)          new subtree as the parent's last child
+    ('remove', node)                  drop a subtree
+    ('attr', node, name, value)       set an attribute (None removes it)
+    ('text', node, text)              replace a node's own text
+
+Only the touched nodes are re-indexed. The snapshot's fingerprint, an XOR of
+per-node hashes, is updated the same way, so "has the page changed?" is a
+single comparison.
+"""
+
+import hashlib
+import math
+import re
+from array import array
+from functools import lru_cache
+from html.parser import HTMLParser
+
+DOCUMENT = 0
+
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+    'source', 'track', 'wbr',
+))
+
+# Bare words read as tag selectors rather than text
+HTML_TAGS = VOID_ELEMENTS | frozenset((
+    'a', 'article', 'aside', 'body', 'button', 'canvas', 'dialog', 'div', 'footer', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'html', 'iframe', 'label', 'li', 'main',
+    'nav', 'ol', 'option', 'p', 'section', 'select', 'span', 'table', 'tbody', 'td',
+    'textarea', 'th', 'thead', 'tr', 'ul', 'video',
+))
+
+# A chain is searched under its most selective ancestor part instead of from the
+# rightmost part's index when that index has more than SCOPE_MIN_CANDIDATES
+# nodes and the ancestor part has at most SCOPE_MAX_ANCHORS
+SCOPE_MIN_CANDIDATES = 64
+SCOPE_MAX_ANCHORS = 8
+
+WHITESPACE = re.compile(r'\s+')
+CSS_CHARS = re.compile(r'[#.\[\]>:=*,]')
+
+TOKEN = re.compile(r"""
+    \s*(?P<comb>[>,])\s*
+  | (?P<space>\s+)
+  | (?P<tag>\*|[A-Za-z][A-Za-z0-9-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[\^$*]?=)\s*(?:'(?P<sq>[^']*)'|"(?P<dq>[^"]*)"|(?P<bare>[^\]\s]+))\s*)?\]
+  | :(?P<pseudo>first-child|last-child|first|last)
+""", re.VERBOSE)
+
+
+def _normalize(text):
+    return WHITESPACE.sub(' ', text).strip()
+
+
+class Compound:
+    """One compound selector, e.g. ``button.primary[type='submit']``"""
+
+    __slots__ = ('tag', 'id', 'classes', 'attrs', 'pseudos')
+
+    def __init__(self):
+        self.tag = None
+        self.id = None
+        self.classes = ()
+        self.attrs = ()
+        self.pseudos = ()
+
+
+@lru_cache(maxsize=1024)
+def parse_selector(selector):
+    """Parse a CSS-subset selector into a list of (compounds, combinators) chains
+
+    Raises ValueError for anything outside the subset.
+    """
+    chains = []
+    compounds, combinators = [Compound()], []
+    pos, text = 0, selector.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unsupported selector {selector!r} at {text[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup if match.lastgroup not in ('op', 'sq', 'dq', 'bare') else 'attr'
+        current = compounds[-1]
+
+        if kind == 'comb' and match.group('comb') == ',':
+            chains.append(_finish(selector, compounds, combinators))
+            compounds, combinators = [Compound()], []
+        elif kind in ('comb', 'space'):
+            combinators.append('>' if kind == 'comb' else ' ')
+            compounds.append(Compound())
+        elif kind == 'tag':
+            current.tag = match.group('tag').lower()
+        elif kind == 'id':
+            current.id = match.group('id')
+        elif kind == 'cls':
+            current.classes += (match.group('cls'),)
+        elif kind == 'attr':
+            value = next((v for v in match.group('sq', 'dq', 'bare') if v is not None), None)
+            current.attrs += ((match.group('attr').lower(), match.group('op'), value),)
+        else:
+            current.pseudos += (match.group('pseudo'),)
+    chains.append(_finish(selector, compounds, combinators))
+    return chains
+
+
+def _finish(selector, compounds, combinators):
+    for compound in compounds:
+        if not (compound.tag or compound.id or compound.classes or compound.attrs or compound.pseudos):
+            raise ValueError(f"Incomplete selector {selector!r}")
+    for compound in compounds[:-1]:
+        if {'first', 'last'} & set(compound.pseudos):
+            raise ValueError(f"{selector!r}: :first/:last only apply to the last part of a selector")
+    return compounds, combinators
+
+
+def is_css(selector):
+    """Whether a step's selector is CSS (else it's matched against element text)"""
+    text = selector.strip()
+    if CSS_CHARS.search(text):
+        return True
+    # Tag names alone, like `form button`, are a descendant selector too. Only
+    # lowercase ones: a visible label such as "Select" or "Header" is text
+    words = text.split()
+    return bool(words) and all(word in HTML_TAGS for word in words)
+
+
+class _Builder(HTMLParser):
+    """Feeds parsed HTML into a snapshot under a given parent"""
+
+    def __init__(self, snapshot, parent):
+        super().__init__(convert_charrefs=True)
+        self.snapshot = snapshot
+        self.stack = [parent]
+        self.tags = [None]
+        self.added = []
+
+    def handle_starttag(self, tag, attrs):
+        node = self.snapshot._add_node(self.stack[-1], tag, attrs)
+        self.added.append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+            self.tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.added.append(self.snapshot._add_node(self.stack[-1], tag, attrs))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag; a stray end tag is ignored
+        if tag in self.tags[1:]:
+            while self.tags.pop() != tag:
+                self.stack.pop()
+            self.stack.pop()
+
+    def handle_data(self, data):
+        if len(self.stack) > 1 and not data.isspace():
+            self.snapshot._append_text(self.stack[-1], data)
+
+
+class DomSnapshot:
+    """Array-backed, indexed DOM with incremental updates"""
+
+    def __init__(self):
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.last_child = array('i')
+        self.next_sibling = array('i')
+        self.prev_sibling = array('i')
+        self.depth = array('H')
+        self.tag_code = array('H')
+        # Document order; appended subtrees get keys between their neighbours
+        self.order = array('d')
+        self.alive = bytearray()
+        self.hashes = array('Q')
+        self.attrs = []
+        self.texts = []
+        self.tag_names = []
+        self._tag_codes = {}
+
+        self.by_id = {}
+        self.by_class = {}
+        self.by_tag = {}
+        self.by_attr = {}
+        self.by_testid = {}
+        self.by_text = {}
+
+        self.fingerprint = 0
+        self._count = 0
+        self._add_node(-1, '#document', ())
+
+    @classmethod
+    def from_html(cls, html):
+        snapshot = cls()
+        snapshot._feed(html, DOCUMENT)
+        return snapshot
+
+    def __len__(self):
+        """Number of live elements"""
+        return self._count
+
+    # Reading nodes
+
+    def tag(self, node):
+        return self.tag_names[self.tag_code[node]]
+
+    def attr(self, node, name, default=None):
+        attrs = self.attrs[node]
+        return attrs.get(name, default) if attrs else default
+
+    def text(self, node):
+        return self.texts[node]
+
+    def classes(self, node):
+        value = self.attr(node, 'class')
+        return value.split() if value else []
+
+    def children(self, node):
+        child = self.first_child[node]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def full_text(self, node):
+        """Own text plus all descendants' text, in document order"""
+        parts = [self.texts[node]] if self.texts[node] else []
+        for child in self.children(node):
+            text = self.full_text(child)
+            if text:
+                parts.append(text)
+        return ' '.join(parts)
+
+    # Queries
+
+    def query(self, selector):
+        """Live elements matching a CSS-subset selector, in document order"""
+        found = set()
+        first_last = []
+        for compounds, combinators in parse_selector(selector):
+            matches = [node for node in self._chain_candidates(compounds)
+                       if self._matches(node, compounds, combinators, len(compounds) - 1)]
+            pseudos = compounds[-1].pseudos
+            if matches and ('first' in pseudos or 'last' in pseudos):
+                matches.sort(key=self.order.__getitem__)
+                first_last.extend(m for m, wanted in ((matches[0], 'first'), (matches[-1], 'last'))
+                                  if wanted in pseudos)
+                continue
+            found.update(matches)
+        found.update(first_last)
+        return sorted(found, key=self.order.__getitem__)
+
+    def query_one(self, selector):
+        """The first element matching a selector, or None"""
+        found = self.query(selector)
+        return found[0] if found else None
+
+    def find_text(self, text, exact=True):
+        """Elements whose own text equals (or, with exact=False, contains) `text`, case-insensitively"""
+        wanted = _normalize(text).casefold()
+        if exact:
+            found = self.by_text.get(wanted, ())
+        else:
+            found = set()
+            for key, nodes in self.by_text.items():
+                if wanted in key:
+                    found |= nodes
+        return sorted(found, key=self.order.__getitem__)
+
+    def resolve(self, selector):
+        """Elements for a step's selector: CSS, or text (exact first, then contains)"""
+        if is_css(selector):
+            return self.query(selector)
+        return self.find_text(selector) or self.find_text(selector, exact=False)
+
+    # Mutations
+
+    def apply(self, mutations):
+        """Apply a batch of mutation records; returns the nodes added"""
+        added = []
+        for mutation in mutations:
+            kind = mutation[0]
+            if kind == 'append':
+                added.extend(self.append_html(mutation[1], mutation[2]))
+            elif kind == 'remove':
+                self.remove(mutation[1])
+            elif kind == 'attr':
+                self.set_attribute(mutation[1], mutation[2], mutation[3])
+            elif kind == 'text':
+                self.set_text(mutation[1], mutation[2])
+            else:
+                raise ValueError(f"Unknown mutation {kind!r}")
+        return added
+
+    def append_html(self, parent, html):
+        """Parse `html` into new last children of `parent`; returns the new nodes"""
+        self._check(parent, allow_document=True)
+        lo = self._subtree_end_key(parent)
+        hi = self._next_key(parent)
+        added = self._feed(html, parent)
+        if added:
+            step = (hi - lo) / (len(added) + 1) if hi != math.inf else 1.0
+            if lo + step == lo or lo + step * len(added) >= hi:
+                self._renumber()
+            else:
+                for i, node in enumerate(added, 1):
+                    self.order[node] = lo + step * i
+        return added
+
+    def remove(self, node):
+        """Remove a node and its subtree"""
+        self._check(node)
+        parent, prev, nxt = self.parent[node], self.prev_sibling[node], self.next_sibling[node]
+        if prev == -1:
+            self.first_child[parent] = nxt
+        else:
+            self.next_sibling[prev] = nxt
+        if nxt == -1:
+            self.last_child[parent] = prev
+        else:
+            self.prev_sibling[nxt] = prev
+
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._unindex(current)
+            self.alive[current] = 0
+            self._count -= 1
+            stack.extend(self.children(current))
+
+    def set_attribute(self, node, name, value):
+        """Set (or with None, remove) an attribute"""
+        self._check(node)
+        self._unindex(node)
+        attrs = self.attrs[node] or {}
+        if value is None:
+            attrs.pop(name, None)
+        else:
+            attrs[name] = str(value)
+        self.attrs[node] = attrs or None
+        self._index(node)
+
+    def set_text(self, node, text):
+        """Replace a node's own text"""
+        self._check(node)
+        self._unindex(node)
+        self.texts[node] = _normalize(text or '')
+        self._index(node)
+
+    # Internals
+
+    def _feed(self, html, parent):
+        builder = _Builder(self, parent)
+        builder.feed(html)
+        builder.close()
+        for node in builder.added:
+            self._index(node)
+        return builder.added
+
+    def _add_node(self, parent, tag, attrs):
+        node = len(self.parent)
+        code = self._tag_codes.get(tag)
+        if code is None:
+            code = self._tag_codes[tag] = len(self.tag_names)
+            self.tag_names.append(tag)
+
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.last_child.append(-1)
+        self.next_sibling.append(-1)
+        self.depth.append(0 if parent == -1 else self.depth[parent] + 1)
+        self.tag_code.append(code)
+        self.order.append(float(node))
+        self.alive.append(1)
+        self.hashes.append(0)
+        self.attrs.append({name: value or '' for name, value in attrs} if attrs else None)
+        self.texts.append('')
+
+        if parent == -1:
+            self.prev_sibling.append(-1)
+        else:
+            last = self.last_child[parent]
+            self.prev_sibling.append(last)
+            if last == -1:
+                self.first_child[parent] = node
+            else:
+                self.next_sibling[last] = node
+            self.last_child[parent] = node
+            self._count += 1
+        return node
+
+    def _append_text(self, node, data):
+        text = _normalize(data)
+        self.texts[node] = f"{self.texts[node]} {text}" if self.texts[node] else text
+
+    def _keys(self, node):
+        """(index, key) pairs for a node"""
+        attrs = self.attrs[node] or {}
+        keys = [(self.by_tag, self.tag_code[node])]
+        keys.extend((self.by_attr, name) for name in attrs)
+        if attrs.get('id'):
+            keys.append((self.by_id, attrs['id']))
+        if attrs.get('data-testid'):
+            keys.append((self.by_testid, attrs['data-testid']))
+        keys.extend((self.by_class, name) for name in set(attrs.get('class', '').split()))
+        if self.texts[node]:
+            keys.append((self.by_text, self.texts[node].casefold()))
+        return keys
+
+    def _index(self, node):
+        for index, key in self._keys(node):
+            index.setdefault(key, set()).add(node)
+        self.hashes[node] = self._hash(node)
+        self.fingerprint ^= self.hashes[node]
+
+    def _unindex(self, node):
+        for index, key in self._keys(node):
+            nodes = index.get(key)
+            if nodes is not None:
+                nodes.discard(node)
+                if not nodes:
+                    del index[key]
+        self.fingerprint ^= self.hashes[node]
+        self.hashes[node] = 0
+
+    def _hash(self, node):
+        attrs = self.attrs[node]
+        attr_text = '\0'.join(f"{k}={v}" for k, v in sorted(attrs.items())) if attrs else ''
+        data = f"{self.depth[node]}\0{self.tag(node)}\0{attr_text}\0{self.texts[node]}"
+        return int.from_bytes(hashlib.blake2b(data.encode(), digest_size=8).digest(), 'little')
+
+    def _check(self, node, allow_document=False):
+        if not 0 <= node < len(self.alive) or not self.alive[node] or (node == DOCUMENT and not allow_document):
+            raise ValueError(f"No live element {node}")
+
+    def _candidates(self, compound):
+        """Smallest index set covering a compound (all live elements if none applies)"""
+        sets = []
+        if compound.id is not None:
+            sets.append(self.by_id.get(compound.id, ()))
+        for name, op, value in compound.attrs:
+            if name == 'data-testid' and op == '=':
+                sets.append(self.by_testid.get(value, ()))
+            else:
+                sets.append(self.by_attr.get(name, ()))
+        for name in compound.classes:
+            sets.append(self.by_class.get(name, ()))
+        if compound.tag not in (None, '*'):
+            sets.append(self.by_tag.get(self._tag_codes.get(compound.tag), ()))
+        if sets:
+            return min(sets, key=len)
+        return (node for node in range(1, len(self.alive)) if self.alive[node])
+
+    def _chain_candidates(self, compounds):
+        """Candidates for a whole chain
+
+        Usually the rightmost compound's index set. When that's large and an
+        earlier compound is very selective (``#section-3 .add-to-cart``),
+        only the subtrees under that compound's few matches are searched.
+        """
+        last = self._candidates(compounds[-1])
+        if len(compounds) == 1 or (isinstance(last, set) and len(last) <= SCOPE_MIN_CANDIDATES):
+            return last
+        anchors = min((self._candidates(c) for c in compounds[:-1]),
+                      key=lambda found: len(found) if isinstance(found, set) else math.inf)
+        if not isinstance(anchors, set) or len(anchors) > SCOPE_MAX_ANCHORS:
+            return last
+
+        wanted = last if isinstance(last, set) else None
+        found = set()
+        for anchor in anchors:
+            stack = list(self.children(anchor))
+            while stack:
+                node = stack.pop()
+                if node in found:
+                    continue
+                if wanted is None or node in wanted:
+                    found.add(node)
+                stack.extend(self.children(node))
+        return found
+
+    def _matches(self, node, compounds, combinators, i):
+        if not self._matches_compound(node, compounds[i]):
+            return False
+        if i == 0:
+            return True
+        parent = self.parent[node]
+        if combinators[i - 1] == '>':
+            return parent > DOCUMENT and self._matches(parent, compounds, combinators, i - 1)
+        while parent > DOCUMENT:
+            if self._matches(parent, compounds, combinators, i - 1):
+                return True
+            parent = self.parent[parent]
+        return False
+
+    def _matches_compound(self, node, compound):
+        if compound.tag not in (None, '*') and self.tag_names[self.tag_code[node]] != compound.tag:
+            return False
+        attrs = self.attrs[node] or {}
+        if compound.id is not None and attrs.get('id') != compound.id:
+            return False
+        if compound.classes:
+            have = attrs.get('class', '').split()
+            if not all(name in have for name in compound.classes):
+                return False
+        for name, op, value in compound.attrs:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if op == '=' and actual != value:
+                return False
+            if op == '^=' and not actual.startswith(value):
+                return False
+            if op == '$=' and not actual.endswith(value):
+                return False
+            if op == '*=' and value not in actual:
+                return False
+        for pseudo in compound.pseudos:
+            if pseudo == 'first-child' and self.prev_sibling[node] != -1:
+                return False
+            if pseudo == 'last-child' and self.next_sibling[node] != -1:
+                return False
+        return True
+
+    def _subtree_end_key(self, node):
+        """Order key of the last node in `node`'s subtree"""
+        while self.last_child[node] != -1:
+            node = self.last_child[node]
+        return self.order[node]
+
+    def _next_key(self, node):
+        """Order key of the first node after `node`'s subtree, or infinity"""
+        while node != -1 and self.next_sibling[node] == -1:
+            node = self.parent[node]
+        return math.inf if node == -1 else self.order[self.next_sibling[node]]
+
+    def _renumber(self):
+        """Reassign order keys by walking the tree (when keys run out of room)"""
+        key = 0.0
+        stack = [DOCUMENT]
+        while stack:
+            node = stack.pop()
+            self.order[node] = key
+            key += 1.0
+            stack.extend(reversed(list(self.children(node))))
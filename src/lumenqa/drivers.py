@@ -0,0 +1,222 @@
+"""
+LumenQA Drivers - What actually performs test steps
+
+A driver launches one browser per runner and hands out isolated browser
+contexts from it; tests run their steps in a context. Launching is the
+expensive part, so contexts are pooled and reused (see lumenqa.session).
+
+A driver is a Driver subclass, named in lumen.yml:
+
+    sessions:
+      driver: fake                    # built in
+      driver: mypackage.drivers:Pw    # or module:Class
+
+Subclasses implement start(), new_context() and close(); their contexts
+implement perform() (a coroutine, run on the step executor's event loop),
+reset(), memory() and close(). Contexts are told which test they run with
+begin(), and should find elements through the driver's SelectorHealer
+(lumenqa.healing) when one is set.
+
+The built-in ``fake`` driver runs in-process: steps take a simulated
+latency, a navigate to an origin the context has already loaded is cheaper,
+each context's memory grows as it is used, and a selector matches an
+element on a page for a fixed share of (page, selector) pairs, so pooling,
+recycling and selector healing behave as they would against a real browser.
+"""
+
+import asyncio
+import functools
+import hashlib
+import importlib
+import random
+import time
+from typing import Optional
+
+from .healing import needs_element
+
+# Simulated per-step latency (ms) and failure rate for the fake driver
+STEP_LATENCY = {
+    'navigate': (35, 65),
+    'click': (12, 40),
+    'screenshot': (15, 30),
+}
+DEFAULT_LATENCY = (8, 25)
+STEP_FAILURE_RATE = 0.005
+# A navigate to an origin already in the context's cache
+WARM_NAVIGATE_LATENCY = (10, 20)
+
+# Time (ms) to try one selector, and the share (%) of selectors that match on a page
+FIND_LATENCY = (2, 6)
+FIND_MATCH_PERCENT = 70
+
+# Simulated fake-driver setup costs (ms) and memory (bytes)
+LAUNCH_LATENCY = (300, 450)
+CONTEXT_LATENCY = (40, 70)
+CONTEXT_MEMORY = 24 * 1024 * 1024
+STEP_MEMORY = {
+    'navigate': 2 * 1024 * 1024,
+    'screenshot': 512 * 1024,
+}
+DEFAULT_STEP_MEMORY = 16 * 1024
+
+
+class Context:
+    """One isolated browser context (cookies, storage, pages)"""
+
+    test = None
+
+    def begin(self, test):
+        """Note the test about to run (the key for learned selectors)"""
+        self.test = test
+
+    async def perform(self, step):
+        """Execute a leaf step; returns an error message or None"""
+        raise NotImplementedError
+
+    def reset(self):
+        """Clear cookies, storage and open pages so the next test starts clean"""
+        raise NotImplementedError
+
+    def memory(self):
+        """Bytes used by this context, or None if the driver can't tell"""
+        return None
+
+    def close(self):
+        pass
+
+
+class Driver:
+    """A browser to create contexts in"""
+
+    name: Optional[str] = None
+
+    def __init__(self, browser='chrome', headless=True):
+        self.browser = browser
+        self.headless = headless
+        self.healer = None
+
+    def start(self):
+        """Launch the browser"""
+
+    def new_context(self):
+        """A fresh Context; called from worker threads"""
+        raise NotImplementedError
+
+    def close(self):
+        """Shut the browser down"""
+
+
+class FakeContext(Context):
+    """In-process stand-in for a browser context"""
+
+    def __init__(self, healer=None):
+        self.healer = healer
+        self.cookies = {}
+        self.storage = {}
+        self.url = None
+        # Origins in the HTTP cache; unlike cookies and storage, kept across resets
+        self.origins = set()
+        self.heap = CONTEXT_MEMORY
+        self.closed = False
+
+    async def perform(self, step):
+        verb = step.verb
+        if needs_element(step):
+            page = self.url or 'about:blank'
+            find = functools.partial(fake_find, _origin(page))
+            if self.healer is not None:
+                found = await self.healer.locate(self.test, step.text, page, verb, step.target, find)
+            else:
+                found = await find(step.target)
+            if not found:
+                return f"Element not found: {step.target}"
+
+        latency = STEP_LATENCY.get(verb, DEFAULT_LATENCY)
+        if verb == 'navigate':
+            origin = _origin(step.target)
+            if origin in self.origins:
+                latency = WARM_NAVIGATE_LATENCY
+            self.origins.add(origin)
+            self.url = step.target
+        elif verb == 'login_as':
+            self.cookies['session'] = step.target
+            self.storage['user'] = step.target
+
+        low, high = latency
+        await asyncio.sleep(random.randint(low, high) / 1000)
+        self.heap += STEP_MEMORY.get(verb, DEFAULT_STEP_MEMORY)
+        if random.random() < STEP_FAILURE_RATE:
+            return f"Element not found: {step.target or step.text}"
+        return None
+
+    def reset(self):
+        self.cookies.clear()
+        self.storage.clear()
+        self.url = None
+        # Closing pages gives back most, but not all, of what they used
+        self.heap = CONTEXT_MEMORY + (self.heap - CONTEXT_MEMORY) // 4
+
+    def memory(self):
+        return self.heap
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDriver(Driver):
+    """In-process driver with simulated costs, for development and pool tests"""
+
+    name = 'fake'
+
+    def __init__(self, browser='chrome', headless=True, launch_latency=LAUNCH_LATENCY,
+                 context_latency=CONTEXT_LATENCY):
+        super().__init__(browser, headless)
+        self.launch_latency = launch_latency
+        self.context_latency = context_latency
+        self.launched = False
+        self.contexts = 0
+
+    def start(self):
+        time.sleep(random.randint(*self.launch_latency) / 1000)
+        self.launched = True
+
+    def new_context(self):
+        time.sleep(random.randint(*self.context_latency) / 1000)
+        self.contexts += 1
+        return FakeContext(self.healer)
+
+    def close(self):
+        self.launched = False
+
+
+async def fake_find(page, selector):
+    """Try a selector on a fake page; the same pair always gives the same answer"""
+    await asyncio.sleep(random.randint(*FIND_LATENCY) / 1000)
+    digest = hashlib.blake2b(f"{page}\0{selector}".encode(), digest_size=2).digest()
+    return int.from_bytes(digest, 'little') % 100 < FIND_MATCH_PERCENT
+
+
+def _origin(url):
+    scheme, _, rest = (url or '').partition('://')
+    return f"{scheme}://{rest.split('/', 1)[0]}" if rest else url
+
+
+DRIVERS = {
+    'fake': FakeDriver,
+}
+
+
+def load_driver(spec, browser='chrome', headless=True):
+    """Instantiate a driver by name or 'module:Class'
+
+    Raises ValueError for an unknown name and ImportError/AttributeError
+    when a module:Class spec can't be imported.
+    """
+    if spec in DRIVERS:
+        cls = DRIVERS[spec]
+    elif ':' in spec:
+        module_name, attr = spec.split(':', 1)
+        cls = getattr(importlib.import_module(module_name), attr)
+    else:
+        raise ValueError(f"Unknown driver {spec!r} (built in: {', '.join(DRIVERS)})")
+    return cls(browser=browser, headless=headless)
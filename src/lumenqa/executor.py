@@ -0,0 +1,173 @@
+"""
+LumenQA Step Executor - Runs PyLux step trees on asyncio
+
+One event loop runs on a background thread and is shared by every runner
+worker, which submits whole tests to it with run(). Within a test:
+
+- plain blocks run their steps in order and stop at the first failure
+- ``await all:`` runs its children concurrently
+- ``await parallel:`` runs each named branch (``- user1:``) as its own task;
+  a failing branch doesn't stop its siblings
+
+Leaf steps acquire a per-test and a global semaphore, so a test can't fan
+out past ``per_test`` steps and the whole run never has more than
+``global_limit`` steps in flight. Results come back as a tree in source
+order, whatever order the concurrent steps finished in.
+
+Steps are performed by the browser context the test was given (see
+lumenqa.drivers); concurrent children share it. With an ApiClient (see
+lumenqa.api), api/gql steps and checks on their responses go to it instead,
+against bindings kept per test, and consecutive independent API steps in a
+block run concurrently. A step whose driver raises fails with the exception
+as its error, like any other failed step.
+
+When given a Timeline, every step is recorded on the calling worker's track;
+children of concurrent blocks get a lane of their own beneath it so spans
+on one track always nest.
+"""
+
+import asyncio
+import threading
+import time
+
+from .api import independent_steps
+
+CONCURRENT_BLOCKS = ('all', 'parallel')
+
+
+class StepExecutor:
+    """Shared asyncio executor for test step trees"""
+
+    def __init__(self, per_test=8, global_limit=64, timeline=None, api=None, profiler=None):
+        self.per_test = max(1, per_test)
+        self.global_limit = max(1, global_limit)
+        self.timeline = timeline
+        self.api = api
+        self._loop = asyncio.new_event_loop()
+        self._global = None
+        target = self._loop.run_forever
+        if profiler is not None:
+            # Steps run on this thread, so it is one section for the loop's whole life
+            target = profiler.wrap('steps', target)
+        self._thread = threading.Thread(target=target, name='lumen-steps', daemon=True)
+        self._thread.start()
+
+    def run(self, test, context, track=None):
+        """Run a test's steps in a browser context from any thread and return its result tree"""
+        if track is None:
+            track = threading.current_thread().name
+        future = asyncio.run_coroutine_threadsafe(self._run_test(test, context, track), self._loop)
+        return future.result()
+
+    def close(self):
+        """Stop the event loop thread"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _run_test(self, test, context, track):
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.global_limit)
+        limit = asyncio.Semaphore(self.per_test)
+        # Responses bound by api/gql steps (`=> name`), visible to the rest of the test
+        scope = {}
+        if test.error:
+            return [{
+                'text': test.name, 'line': test.line, 'status': 'failed', 'duration': 0,
+                'error': test.error, 'children': [],
+            }]
+        return await self._run_sequence(test.steps, context, scope, limit, track)
+
+    async def _run_sequence(self, steps, context, scope, limit, track):
+        """Run steps in order; once one fails, the rest are reported as skipped"""
+        results = []
+        failed = False
+        i = 0
+        while i < len(steps):
+            if failed:
+                results.extend(_skipped(step) for step in steps[i:])
+                break
+            end = independent_steps(steps, i) if self.api is not None else i
+            if end - i > 1:
+                # Independent API calls go out together; all of them report, pass or fail
+                group = await self._gather(steps[i:end], context, scope, limit, track)
+            else:
+                end = i + 1
+                group = [await self._run_step(steps[i], context, scope, limit, track)]
+            failed = any(result['status'] == 'failed' for result in group)
+            results.extend(group)
+            i = end
+        return results
+
+    async def _gather(self, steps, context, scope, limit, track):
+        """Run steps as concurrent tasks, each on its own lane of the track"""
+        tasks = [
+            asyncio.ensure_future(self._run_step(step, context, scope, limit, f"{track} / {i + 1}"))
+            for i, step in enumerate(steps)
+        ]
+        return await asyncio.gather(*tasks)
+
+    async def _run_step(self, step, context, scope, limit, track):
+        start = time.perf_counter_ns()
+        children = step.children
+
+        if not children:
+            async with self._global, limit:
+                start = time.perf_counter_ns()
+                try:
+                    if self.api is not None and self.api.handles(step, scope):
+                        error = await self.api.perform(step, scope)
+                    else:
+                        error = await context.perform(step)
+                except Exception as e:
+                    # A driver that raises fails its step, not the run
+                    error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            return self._finish(step, start, 'failed' if error else 'passed', error, track)
+
+        if step.verb in CONCURRENT_BLOCKS:
+            # Each child (a step for all:, a named branch for parallel:) gets its own task
+            child_results = await self._gather(children, context, scope, limit, track)
+        else:
+            child_results = await self._run_sequence(children, context, scope, limit, track)
+
+        failed = any(child['status'] == 'failed' for child in child_results)
+        result = self._finish(step, start, 'failed' if failed else 'passed', None, track)
+        result['children'] = child_results
+        return result
+
+    def _finish(self, step, start, status, error, track):
+        end = time.perf_counter_ns()
+        if self.timeline is not None:
+            self.timeline.record('step', step.text, start, end, track)
+        return {
+            'text': step.text,
+            'line': step.line,
+            'status': status,
+            'duration': (end - start) / 1_000_000,
+            'error': error,
+            'children': [],
+        }
+
+
+def _skipped(step):
+    return {
+        'text': step.text,
+        'line': step.line,
+        'status': 'skipped',
+        'duration': 0,
+        'error': None,
+        'children': [],
+    }
+
+
+def first_failure(results):
+    """Depth-first search for the first failed leaf step"""
+    for result in results:
+        if result['status'] != 'failed':
+            continue
+        if result['children']:
+            found = first_failure(result['children'])
+            if found:
+                return found
+        return result
+    return None
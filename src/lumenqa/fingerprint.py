@@ -0,0 +1,147 @@
+"""
+LumenQA Fingerprints - Skips tests that haven't changed since they passed
+
+A test's fingerprint hashes its name, its step tree (verb, target, value
+and nesting; not line numbers or whitespace) and the config it depends on:
+the run environment (browser, headless mode, base URL, LumenQA version)
+plus the values of any ``env`` entries its steps reference as ``{NAME}``.
+Moving a test within its file or reformatting it keeps the fingerprint;
+changing what it does doesn't.
+
+The last outcome per fingerprint is kept in ``.lumen-cache/results.db``.
+An incremental run reports a test as "cached" instead of running it when
+its fingerprint last passed.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from .cache import CACHE_DIR
+from .version import __version__
+
+# Fingerprints not seen for this long are dropped
+MAX_AGE_NS = 30 * 24 * 3600 * 1_000_000_000
+
+REFERENCE = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+WHITESPACE = re.compile(r'\s+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS last_results (
+    fingerprint BLOB PRIMARY KEY,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    finished INTEGER NOT NULL
+);
+"""
+
+
+def environment(config, browser, headless):
+    """The settings every test's outcome depends on"""
+    project = config.get('project') or {}
+    return {
+        'lumenqa': __version__,
+        'browser': browser,
+        'headless': bool(headless),
+        'base_url': project.get('base_url') if isinstance(project, dict) else None,
+        'env': config.get('env') or {},
+    }
+
+
+def _normalize(text):
+    return WHITESPACE.sub(' ', text or '').strip()
+
+
+def _feed(digest, steps, env, refs):
+    for step in steps:
+        text = _normalize(step.text)
+        digest.update(b'(')
+        for part in (step.verb, step.target, step.value, text):
+            digest.update(_normalize(part).encode())
+            digest.update(b'\0')
+        refs.update(name for name in REFERENCE.findall(text) if name in env)
+        _feed(digest, step.children, env, refs)
+        digest.update(b')')
+
+
+def fingerprint_test(test, env):
+    """blake2b fingerprint of a parsed test under environment `env`"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_normalize(test.name).encode())
+    digest.update(b'\0async' if test.is_async else b'\0')
+
+    refs = set()
+    _feed(digest, test.steps, env['env'], refs)
+
+    for key in ('lumenqa', 'browser', 'headless', 'base_url'):
+        digest.update(f"\0{key}={env[key]}".encode())
+    for name in sorted(refs):
+        value = env['env'][name]
+        value = os.path.expandvars(value) if isinstance(value, str) else value
+        digest.update(f"\0env.{name}={value}".encode())
+    return digest.digest()
+
+
+class ResultStore:
+    """Last outcome per test fingerprint"""
+
+    def __init__(self, root=CACHE_DIR):
+        self.path = Path(root) / 'results.db'
+        self._pending = []
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10)
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def last(self, fingerprint):
+        """(status, duration) of the last run with this fingerprint, or None"""
+        try:
+            return self._connect().execute(
+                "SELECT status, duration FROM last_results WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def record(self, fingerprint, status, duration):
+        """Queue an outcome; nothing is written until commit()"""
+        self._pending.append((fingerprint, status, duration, time.time_ns()))
+
+    def touch(self, fingerprint):
+        """Keep a cached fingerprint from ageing out"""
+        self._pending.append((fingerprint, None, None, time.time_ns()))
+
+    def commit(self):
+        """Write queued outcomes in one transaction and drop stale fingerprints"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO last_results VALUES (?, ?, ?, ?)",
+                    [row for row in pending if row[1] is not None],
+                )
+                db.executemany(
+                    "UPDATE last_results SET finished = ? WHERE fingerprint = ?",
+                    [(finished, fp) for fp, status, _, finished in pending if status is None],
+                )
+                db.execute(
+                    "DELETE FROM last_results WHERE finished < ?", (time.time_ns() - MAX_AGE_NS,)
+                )
+        except sqlite3.Error:
+            # Losing this only means rerunning tests next time
+            pass
+
+    def close(self):
+        self.commit()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,232 @@
+"""
+LumenQA Selector Healing - Remembers which fallback strategy found an element
+
+A step like ``click "Submit"`` can be located several ways; when the
+selector as written stops matching, the intent tree walks a chain of
+fallbacks until one does. Walking it is slow, and the answer rarely changes,
+so the winner is stored in ``.lumen-cache/healing.db``, keyed by test, step
+text and page:
+
+    strategy, resolved selector, confidence, last update
+
+The next lookup tries the stored selector first. A hit raises its
+confidence; a miss halves it and falls back to the chain, which records the
+new winner. Confidence also fades with age (half-life HALF_LIFE_DAYS), and
+an entry below MIN_CONFIDENCE is evicted.
+
+Lookups go through an async ``find(selector)`` callable supplied by the
+driver, so the same healer serves real browsers, DomSnapshots
+(``snapshot_finder``) and the fake driver.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .cache import CACHE_DIR
+
+HALF_LIFE_DAYS = 30
+MIN_CONFIDENCE = 0.25
+HIT_BOOST = 0.5    # a hit closes this fraction of the gap to 1.0
+MISS_FACTOR = 0.5
+
+NS_PER_DAY = 24 * 3600 * 1_000_000_000
+
+# Verbs whose target is an element to find
+ELEMENT_VERBS = frozenset((
+    'click', 'double_click', 'right_click', 'input', 'clear', 'hover', 'drag', 'select', 'check',
+    'uncheck',
+))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS strategies (
+    test TEXT NOT NULL,
+    step TEXT NOT NULL,
+    page TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    updated INTEGER NOT NULL,
+    PRIMARY KEY (test, step, page)
+);
+"""
+
+SLUG = re.compile(r'[^a-z0-9]+')
+
+
+def _slug(text):
+    return SLUG.sub('-', text.lower()).strip('-')
+
+
+def _quoted(text):
+    return text.replace("'", '').replace('"', '')
+
+
+# The fallback chain, in the order it is walked: (name, selector for verb and target)
+STRATEGIES = (
+    ('as-written', lambda verb, target: target),
+    ('data-testid', lambda verb, target: f"[data-testid='{_slug(target)}']"),
+    ('aria-label', lambda verb, target: f"[aria-label='{_quoted(target)}']"),
+    ('id', lambda verb, target: f"#{_slug(target)}"),
+    ('name', lambda verb, target: f"[name='{_slug(target)}']"),
+    ('submit-button', lambda verb, target: "button[type='submit']" if verb == 'click' else None),
+)
+
+
+def needs_element(step):
+    """Whether a step acts on (or asserts about) an element"""
+    if not step.target:
+        return False
+    if step.verb == 'expect':
+        return step.text.split(None, 2)[1:2] == ['element']
+    return step.verb in ELEMENT_VERBS
+
+
+def snapshot_finder(snapshot):
+    """find() for a lumenqa.dom.DomSnapshot"""
+    async def find(selector):
+        try:
+            return bool(snapshot.resolve(selector))
+        except ValueError:
+            return False
+    return find
+
+
+class HealingStore:
+    """Learned strategy per (test, step, page), with confidence"""
+
+    def __init__(self, root=CACHE_DIR):
+        self.path = Path(root) / 'healing.db'
+        self._db = None
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._dirty = {}
+
+    def _connect(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def get(self, key):
+        """(strategy, selector, confidence) with age decay applied, or None"""
+        with self._lock:
+            if key not in self._cache:
+                try:
+                    row = self._connect().execute(
+                        "SELECT strategy, selector, confidence, updated FROM strategies "
+                        "WHERE test = ? AND step = ? AND page = ?", key
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                self._cache[key] = row
+            row = self._cache[key]
+        if row is None:
+            return None
+        strategy, selector, confidence, updated = row
+        age_days = max(0, time.time_ns() - updated) / NS_PER_DAY
+        return strategy, selector, confidence * 0.5 ** (age_days / HALF_LIFE_DAYS)
+
+    def put(self, key, strategy, selector, confidence):
+        """Queue an entry; nothing is written until commit()"""
+        row = (strategy, selector, confidence, time.time_ns())
+        with self._lock:
+            self._cache[key] = row
+            self._dirty[key] = row
+
+    def evict(self, key):
+        with self._lock:
+            self._cache[key] = None
+            self._dirty[key] = None
+
+    def commit(self):
+        """Write queued changes in one transaction"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+        try:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO strategies VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [key + row for key, row in dirty.items() if row is not None],
+                )
+                db.executemany(
+                    "DELETE FROM strategies WHERE test = ? AND step = ? AND page = ?",
+                    [key for key, row in dirty.items() if row is None],
+                )
+        except sqlite3.Error:
+            # Losing this only means walking the fallback chain again next time
+            pass
+
+    def close(self):
+        self.commit()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class SelectorHealer:
+    """Finds elements learned-strategy-first, counting what the cache saved
+
+    Without a store every lookup walks the chain.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.healed = 0
+        self.evicted = 0
+        self.lookups = 0
+        self._lock = threading.Lock()
+
+    async def locate(self, test, step, page, verb, target, find):
+        """The selector that finds `target` on this page, or None if nothing does"""
+        key = (test, step, page)
+        learned = self.store.get(key) if self.store else None
+        if learned is not None:
+            strategy, selector, confidence = learned
+            if confidence >= MIN_CONFIDENCE:
+                self._count('lookups')
+                if await find(selector):
+                    self._count('hits')
+                    self.store.put(key, strategy, selector, confidence + (1 - confidence) * HIT_BOOST)
+                    return selector
+                confidence *= MISS_FACTOR
+            if confidence < MIN_CONFIDENCE:
+                self.store.evict(key)
+                self._count('evicted')
+            else:
+                self.store.put(key, strategy, selector, confidence)
+        self._count('misses')
+
+        for rank, (strategy, build) in enumerate(STRATEGIES):
+            selector = build(verb, target)
+            if not selector or (learned and selector == learned[1]):
+                continue
+            self._count('lookups')
+            if await find(selector):
+                if rank > 0:
+                    self._count('healed')
+                if self.store:
+                    self.store.put(key, strategy, selector, 1.0)
+                return selector
+        return None
+
+    def hit_rate(self):
+        """Share of element lookups answered by a learned selector, or None before any"""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def close(self):
+        if self.store:
+            self.store.close()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
@@ -0,0 +1,159 @@
+"""
+LumenQA Duration History - Remembers how long tests took between runs
+
+Per-test durations and outcomes live in a small SQLite database under
+``.lumen-cache/history.db``, keyed by source file and test name, keeping the
+last ``keep`` runs of each test. The runner uses it to schedule tests
+longest-first: with workers pulling from one ordered queue, that is the
+classic LPT heuristic, so a slow test no longer starts last and sets the
+finish time for the whole suite. Tests without history get an estimate from
+their steps.
+"""
+
+import heapq
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from .cache import CACHE_DIR
+from .drivers import DEFAULT_LATENCY, STEP_LATENCY
+from .executor import CONCURRENT_BLOCKS
+
+DEFAULT_KEEP = 20
+# Outcomes whose duration says something about the next run
+TIMED_STATUSES = ('passed', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    file TEXT NOT NULL,
+    test TEXT NOT NULL,
+    duration REAL NOT NULL,
+    status TEXT NOT NULL,
+    finished INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_test ON runs (file, test, finished);
+"""
+
+
+def history_key(file_path, test_name):
+    """Key a test the same way regardless of how its path was spelled"""
+    return (os.path.normpath(file_path) if file_path else '', test_name)
+
+
+class DurationHistory:
+    """SQLite-backed store of recent per-test durations"""
+
+    def __init__(self, root=CACHE_DIR, keep=DEFAULT_KEEP):
+        self.path = Path(root) / 'history.db'
+        self.keep = max(1, keep)
+        self._pending = []
+        self._estimates = None
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10)
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def estimates(self):
+        """Mean recent duration (ms) per (file, test), loaded once per run"""
+        if self._estimates is None:
+            try:
+                rows = self._connect().execute(
+                    "SELECT file, test, AVG(duration) FROM runs "
+                    f"WHERE status IN ({', '.join('?' * len(TIMED_STATUSES))}) "
+                    "GROUP BY file, test",
+                    TIMED_STATUSES,
+                ).fetchall()
+            except sqlite3.Error:
+                rows = []
+            self._estimates = {(file, test): duration for file, test, duration in rows}
+        return self._estimates
+
+    def predict(self, test):
+        """Predicted duration (ms) of a parsed test; None if it has never run"""
+        return self.estimates().get(history_key(test.file, test.name))
+
+    def record(self, file_path, test_name, duration, status):
+        """Queue one result; nothing is written until commit()"""
+        file_path, test_name = history_key(file_path, test_name)
+        self._pending.append((file_path, test_name, duration, status, time.time_ns()))
+
+    def commit(self):
+        """Write queued results in one transaction and trim each test to `keep` runs"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            db = self._connect()
+            with db:
+                db.executemany("INSERT INTO runs VALUES (?, ?, ?, ?, ?)", pending)
+                db.execute(
+                    "DELETE FROM runs WHERE rowid IN ("
+                    " SELECT rowid FROM ("
+                    "  SELECT rowid, ROW_NUMBER() OVER ("
+                    "   PARTITION BY file, test ORDER BY finished DESC, rowid DESC"
+                    "  ) AS age FROM runs"
+                    " ) WHERE age > ?)",
+                    (self.keep,),
+                )
+        except sqlite3.Error:
+            # History only affects ordering; never fail a run over it
+            pass
+
+    def close(self):
+        self.commit()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def estimate_steps(steps):
+    """Heuristic duration (ms) for a step tree, for tests with no history
+
+    Leaf steps cost the midpoint of their expected latency; concurrent blocks
+    cost as much as their slowest child, everything else runs in sequence.
+    """
+    total = 0
+    for step in steps:
+        children = step.children
+        if not children:
+            low, high = STEP_LATENCY.get(step.verb, DEFAULT_LATENCY)
+            total += (low + high) / 2
+        elif step.verb in CONCURRENT_BLOCKS:
+            total += max(estimate_steps([child]) for child in children)
+        else:
+            total += estimate_steps(children)
+    return total
+
+
+def longest_first(tests, history):
+    """
+    Order tests by predicted duration, longest first
+
+    Returns (ordered tests, their predicted durations in ms, number of tests
+    that had history). Without a history every test is estimated. Ties are
+    broken by file and line, since files are discovered in no fixed order.
+    """
+    known = 0
+    keyed = []
+    for test in tests:
+        predicted = history.predict(test) if history else None
+        if predicted is None:
+            predicted = estimate_steps(test.steps)
+        else:
+            known += 1
+        keyed.append(((-predicted, test.file or '', test.line or 0), test))
+    keyed.sort(key=lambda item: item[0])
+    return [test for _, test in keyed], [-key[0] for key, _ in keyed], known
+
+
+def predicted_makespan(durations, workers):
+    """Finish time (ms) if `durations` are handed in order to the first free worker"""
+    finish = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heapreplace(finish, finish[0] + duration)
+    return max(finish)
@@ -0,0 +1,169 @@
+"""
+LumenQA HTML Report - Paginated HTML output for large result sets
+
+Results are streamed into fixed-size pages (``results-0001.html``, ...) so
+neither generation nor the browser ever has to deal with the whole run at
+once. Within a page, results are grouped by source file or test class (in
+the order groups first appeared), one heading each, and ``results.html`` is
+an index with the summary, per-group counts and links to every page a group
+appears on. All user content goes through html.escape.
+"""
+
+from datetime import datetime
+from html import escape
+
+PAGE_SIZE = 1000
+WRITE_CHUNK = 256
+NO_GROUP = '(ungrouped)'
+
+STYLESHEET = """body { font-family: Arial, sans-serif; margin: 20px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { text-align: left; padding: 4px 8px; border-bottom: 1px solid #eee; }
+h2 { margin-top: 24px; font-size: 1.1em; }
+.passed { color: green; }
+.failed { color: red; }
+.skipped, .cached { color: #888; }
+.error { color: #a00; font-family: monospace; white-space: pre-wrap; }
+nav a { margin-right: 6px; }
+"""
+
+
+def page_name(number):
+    return f"results-{number:04d}.html"
+
+
+def _head(title):
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{escape(title)}</title>\n"
+        "<link rel=\"stylesheet\" href=\"report.css\">\n</head>\n<body>\n"
+    )
+
+
+def _nav(current, pages):
+    links = ['<nav><a href="results.html">Index</a>']
+    if current > 1:
+        links.append(f'<a href="{page_name(current - 1)}">&larr; Previous</a>')
+    if current < pages:
+        links.append(f'<a href="{page_name(current + 1)}">Next &rarr;</a>')
+    links.append(f'<span>Page {current} of {pages}</span></nav>\n')
+    return ' '.join(links)
+
+
+class _PageWriter:
+    """Writes pages of result rows, one group heading per group on each page"""
+
+    def __init__(self, output_dir, total_pages):
+        self.output_dir = output_dir
+        self.total_pages = total_pages
+        self.number = 0
+
+    def write(self, rows):
+        """Write one page of (group stats, group, result) rows
+
+        Rows are stably sorted by when their group was first seen, so groups
+        that interleave in the run (longest-first scheduling mixes files)
+        still get one heading and one anchor per page.
+        """
+        rows.sort(key=lambda row: row[0]['order'])
+        self.number += 1
+        buffer = [_head(f"LumenQA Test Results - page {self.number}"), _nav(self.number, self.total_pages)]
+        with open(self.output_dir / page_name(self.number), 'w', encoding='utf-8') as handle:
+            current = None
+            for stats, group, result in rows:
+                if group != current:
+                    if current is not None:
+                        buffer.append('</table>\n')
+                    current = group
+                    stats['pages'].append(self.number)
+                    buffer.append(
+                        f'<h2 id="{stats["anchor"]}">{escape(group)}</h2>\n'
+                        '<table><tr><th>Status</th><th>Test</th><th>Duration</th><th>Error</th></tr>\n'
+                    )
+                buffer.append(_row(result))
+                if len(buffer) >= WRITE_CHUNK:
+                    handle.write(''.join(buffer))
+                    buffer = []
+            if current is not None:
+                buffer.append('</table>\n')
+            buffer.append(_nav(self.number, self.total_pages))
+            buffer.append('</body>\n</html>\n')
+            handle.write(''.join(buffer))
+
+
+def _row(result):
+    status = escape(str(result.get('status', '')))
+    row = (
+        f'<tr class="{status}"><td>{status}</td>'
+        f'<td>{escape(str(result.get("test", "")))}</td>'
+        f'<td>{escape(str(result.get("duration", "")))}ms</td>'
+    )
+    error = result.get('error')
+    return row + (f'<td class="error">{escape(str(error))}</td></tr>\n' if error else '<td></td></tr>\n')
+
+
+def write_html_report(results, summary, output_dir):
+    """
+    Write the paginated report for an iterable of result dicts
+
+    `summary` must include 'total' so the page count is known up front.
+    Returns the path of the index page.
+    """
+    total_pages = max(1, -(-summary.get('total', 0) // PAGE_SIZE))
+    for stale in output_dir.glob('results-*.html'):
+        stale.unlink()
+    (output_dir / 'report.css').write_text(STYLESHEET)
+
+    groups = {}
+    pages = _PageWriter(output_dir, total_pages)
+    page = []
+    for result in results:
+        group = result.get('group') or NO_GROUP
+        stats = groups.get(group)
+        if stats is None:
+            stats = groups[group] = {
+                'order': len(groups), 'anchor': f"g{len(groups)}", 'pages': [], 'total': 0, 'failed': 0,
+            }
+        page.append((stats, group, result))
+        stats['total'] += 1
+        if result.get('status') == 'failed':
+            stats['failed'] += 1
+        if len(page) >= PAGE_SIZE:
+            pages.write(page)
+            page = []
+    if page:
+        pages.write(page)
+
+    index = output_dir / 'results.html'
+    with open(index, 'w', encoding='utf-8') as out:
+        out.write(_head("LumenQA Test Report"))
+        out.write("<h1>LumenQA Test Results</h1>\n")
+        out.write(f"<p>Generated: {escape(datetime.now().isoformat())}</p>\n<p>")
+        out.write(' &middot; '.join(
+            f'<span class="{escape(str(key))}">{escape(str(key))}: {count}</span>'
+            for key, count in summary.items()
+        ))
+        out.write('</p>\n<nav>Pages: ')
+        out.write(' '.join(
+            f'<a href="{page_name(n)}">{n}</a>' for n in range(1, pages.number + 1)
+        ))
+        out.write('</nav>\n<table><tr><th>Group</th><th>Tests</th><th>Failed</th></tr>\n')
+
+        buffer = []
+        for group, stats in groups.items():
+            css = ' class="failed"' if stats['failed'] else ''
+            first, *rest = stats['pages']
+            more = ''.join(
+                f' <a href="{page_name(number)}#{stats["anchor"]}">p{number}</a>' for number in rest
+            )
+            buffer.append(
+                f'<tr{css}><td><a href="{page_name(first)}#{stats["anchor"]}">{escape(group)}</a>'
+                f'{more}</td><td>{stats["total"]}</td><td>{stats["failed"]}</td></tr>\n'
+            )
+            if len(buffer) >= WRITE_CHUNK:
+                out.write(''.join(buffer))
+                buffer = []
+        out.write(''.join(buffer))
+        out.write('</table>\n</body>\n</html>\n')
+
+    return index
@@ -4,18 +4,20 @@ Live test runner with real-time animated output
 
 import time
 import random
-import sys
-import importlib.util
+from array import array
 from pathlib import Path
 from rich.console import Console
-from rich.live import Live
 from rich.table import Table
-from rich.panel import Panel
-from rich.layout import Layout
-from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
-from rich.tree import Tree
-from rich.text import Text
 from .version import __version__
+from .reporter import TestReporter, failed_tests
+from .timing import Timeline, format_ns
+from .history import DurationHistory
+from .config import load_config, resolve_retries
+from .render import Renderer, output_mode
+from .classify import OperationClassifier, build_rules
+from .suite import Suite, load_suite
+from .shard import shard_of
+from .profiling import Profiler
 
 console = Console()
 
@@ -29,22 +31,27 @@ LOGO = """
 """
 
 
-def load_test_data_from_file(file_path):
-    """Load TEST_CLASSES and TEST_OPERATIONS from a Python file"""
-    try:
-        spec = importlib.util.spec_from_file_location("custom_tests", file_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        return getattr(module, 'TEST_CLASSES', {}), getattr(module, 'TEST_OPERATIONS', {})
-    except Exception as e:
-        console.print(f"[red]Error loading test file: {e}[/red]")
-        return {}, {}
-
-
 class LiveTestRunner:
-    def __init__(self, suite="default", tests_file=None):
+    def __init__(self, suite="default", tests_file=None, output_dir='lumen-results', html=False,
+                 trace=None, retries=None, rerun_failed=False, quiet=False, shard=None,
+                 profile=False):
         self.suite = suite
+        self.output_dir = output_dir
+        self.html = html
+        self.trace = trace
+        self.timeline = Timeline()
+        self.history = DurationHistory()
+        self.config = load_config()
+        self.retries = resolve_retries(self.config if retries is None else retries)
+        self.rerun_failed = rerun_failed
+        self.shard = shard
+        self.output = output_mode(console, quiet)
+        self.renderer = None
+        self.reporter = None
+        self.profiler = Profiler(output_dir) if profile else None
+        if self.profiler:
+            self.profiler.instrument(self, 'test', 'run_test')
+            self.profiler.instrument(self, 'animate', 'animate_test_execution')
         self.results = {
             'passed': 0,
             'failed': 0,
@@ -54,40 +61,27 @@ class LiveTestRunner:
         self.start_time = None
         self.current_test = None
 
-        # Load test data
+        # Load test data; suite files only have their operations read up front
         if tests_file:
-            # Load from custom file
-            self.test_classes, self.test_operations = load_test_data_from_file(tests_file)
+            self.test_suite = load_suite(tests_file)
         else:
-            # Load default test data
             from .test_data import TEST_CLASSES, TEST_OPERATIONS
-            self.test_classes = TEST_CLASSES
-            self.test_operations = TEST_OPERATIONS
+            self.test_suite = Suite.from_dicts(TEST_CLASSES, TEST_OPERATIONS)
+        self.test_operations = self.test_suite.operations
+
+        # lumen.yml's operation_keywords take precedence over the test data's
+        keywords = dict(self.test_suite.keywords)
+        configured = self.config.get('operation_keywords')
+        if isinstance(configured, dict):
+            keywords.update(configured)
+        self.classifier = OperationClassifier(build_rules(self.test_operations, keywords))
 
     def get_operations_for_test(self, test_name):
         """Get realistic operations based on test name"""
-        test_lower = test_name.lower()
-
-        if 'pagination' in test_lower:
-            return self.test_operations.get('pagination', self._default_operations())
-        elif 'create' in test_lower or 'new' in test_lower:
-            return self.test_operations.get('create', self._default_operations())
-        elif 'edit' in test_lower or 'change' in test_lower:
-            return self.test_operations.get('edit', self._default_operations())
-        elif 'delete' in test_lower:
-            return self.test_operations.get('delete', self._default_operations())
-        elif 'search' in test_lower:
-            return self.test_operations.get('search', self._default_operations())
-        elif 'login' in test_lower:
-            return self.test_operations.get('login', self._default_operations())
-        elif 'assign' in test_lower or 'unassign' in test_lower:
-            return self.test_operations.get('assign', self._default_operations())
-        elif 'toggle' in test_lower:
-            return self.test_operations.get('toggle', self._default_operations())
-        elif 'upload' in test_lower:
-            return self.test_operations.get('upload', self._default_operations())
-        else:
+        category = self.classifier.classify(test_name)
+        if category is None:
             return self._default_operations()
+        return self.test_operations[category]
 
     def _default_operations(self):
         """Default test operations"""
@@ -99,19 +93,28 @@ class LiveTestRunner:
             "Cleanup"
         ]
 
-    def run_test(self, class_name, test_name):
-        """Simulate running a single test with operations"""
-        operations = self.get_operations_for_test(test_name)
+    def run_test(self, class_name, test_name, on_operation=None):
+        """Run a single test's operations, timing each one
 
-        # Calculate timing
-        base_time = random.uniform(0.8, 2.5)
-        operation_times = []
+        `on_operation(op)` is called as each operation starts and
+        `on_operation(op, ms)` once it has finished, so output can follow along.
+        """
+        operations = self.get_operations_for_test(test_name)
+        operation_times = array('d')
 
+        test_start = time.perf_counter_ns()
         for op in operations:
-            op_time = random.uniform(0.1, 0.6)
-            operation_times.append(op_time)
-
-        total_time = sum(operation_times) * 1000  # Convert to ms
+            if on_operation:
+                on_operation(op)
+            start = time.perf_counter_ns()
+            time.sleep(random.uniform(0.1, 0.6) * 0.3)  # Simulated work, sped up for demo
+            end = time.perf_counter_ns()
+            self.timeline.record('step', op, start, end, track='main')
+            operation_times.append((end - start) / 1_000_000)
+            if on_operation:
+                on_operation(op, operation_times[-1])
+        test_end = time.perf_counter_ns()
+        self.timeline.record('test', f"{class_name}::{test_name}", test_start, test_end, track='main')
 
         # 95% pass rate (occasional failures for realism)
         will_pass = random.random() > 0.05
@@ -121,79 +124,159 @@ class LiveTestRunner:
             'name': test_name,
             'operations': operations,
             'operation_times': operation_times,
-            'total_time': total_time,
+            'total_time': (test_end - test_start) / 1_000_000,
             'passed': will_pass
         }
 
-    def animate_test_execution(self, test_info):
-        """Show animated test execution"""
-        console.print(f"\n[cyan]▶ {test_info['class']}::{test_info['name']}[/cyan]")
-
-        # Show operations with progress
-        for i, (op, op_time) in enumerate(zip(test_info['operations'], test_info['operation_times'])):
-            prefix = "├─" if i < len(test_info['operations']) - 1 else "└─"
-
-            # Show operation starting
-            console.print(f"  [dim]{prefix} {op}...[/dim]", end="")
-            sys.stdout.flush()
-
-            # Simulate work
-            time.sleep(op_time * 0.3)  # Speed up for demo
-
-            # Show completion time
-            ms_time = int(op_time * 1000)
-            console.print(f" [green]✓[/green] [dim]{ms_time}ms[/dim]")
-
-        # Show result
+    def show_operation(self, op, ms=None):
+        """Print an operation as it starts, then its measured time once done"""
+        if ms is None:
+            console.print(f"  [dim]├─ {op}...[/dim]", end="")
+        else:
+            console.print(f" [green]✓[/green] [dim]{ms:.0f}ms[/dim]")
+
+    def _queue_operation(self, op, ms=None):
+        self.renderer.submit(self.show_operation, op, ms)
+
+    def animate_test_execution(self, class_name, test_name):
+        """Run a test, streaming its progress to the renderer, and record its result"""
+        live = self.output == 'tree'
+        on_operation = self._queue_operation if live else None
+        if live:
+            self.renderer.print(f"\n[cyan]▶ {class_name}::{test_name}[/cyan]")
+        test_info = self.run_test(class_name, test_name, on_operation=on_operation)
+        attempts = 1
+        while not test_info['passed'] and attempts <= self.retries:
+            if live:
+                self.renderer.print(f"  [yellow]↻ Retry {attempts}/{self.retries}[/yellow]")
+            attempts += 1
+            test_info = self.run_test(class_name, test_name, on_operation=on_operation)
+
+        error = None
         if test_info['passed']:
-            console.print(f"  [green]✓ PASSED[/green] [dim]({int(test_info['total_time'])}ms)[/dim]")
             self.results['passed'] += 1
         else:
-            console.print(f"  [red]✗ FAILED[/red] [dim]({int(test_info['total_time'])}ms)[/dim]")
-            console.print(f"     [red]AssertionError: Expected element '.submit-btn' to be visible[/red]")
+            error = "AssertionError: Expected element '.submit-btn' to be visible"
             self.results['failed'] += 1
+        if not (test_info['passed'] and self.output == 'quiet'):
+            self.renderer.submit(self.show_test_result, test_info, error, attempts)
 
         self.results['total'] += 1
+        status = 'passed' if test_info['passed'] else 'failed'
+        self.history.record(class_name, test_name, test_info['total_time'], status)
+        if self.reporter:
+            self.reporter.add_result(
+                test_info['name'],
+                status,
+                round(test_info['total_time'], 1),
+                error,
+                group=test_info['class'],
+                attempts=attempts,
+            )
+        return test_info
+
+    def show_test_result(self, test_info, error, attempts=1):
+        """Print a finished test: under its live progress, or as one line for logs"""
+        duration = f"{test_info['total_time']:.0f}ms"
+        if attempts > 1:
+            duration += f", {attempts} attempts"
+        if self.output != 'tree':
+            status = 'PASS' if test_info['passed'] else 'FAIL'
+            console.print(
+                f"{status} {test_info['class']}::{test_info['name']} ({duration})", highlight=False
+            )
+            if error:
+                console.print(f"  {error}", highlight=False)
+        elif test_info['passed']:
+            console.print(f"  [green]✓ PASSED[/green] [dim]({duration})[/dim]")
+        else:
+            console.print(f"  [red]✗ FAILED[/red] [dim]({duration})[/dim]")
+            console.print(f"     [red]{error}[/red]")
 
     def run_suite(self):
         """Run the entire test suite"""
         # Show header
-        console.clear()
-        console.print(LOGO, style="cyan bold")
-        console.print(f"\n[cyan bold]LumenQA Test Runner v{__version__}[/cyan bold]")
-        console.print(f"[dim]Running Enterprise SAAS Test Suite[/dim]")
-        console.print("━" * 70)
+        if self.output == 'tree':
+            console.clear()
+            console.print(LOGO, style="cyan bold")
+        if self.output != 'quiet':
+            console.print(f"\n[cyan bold]LumenQA Test Runner v{__version__}[/cyan bold]")
+            console.print(f"[dim]Running Enterprise SAAS Test Suite[/dim]")
+            console.print("━" * 70)
+
+        if self.profiler:
+            self.profiler.start()
+        tests = self.test_suite.iter_tests()
+        if self.profiler:
+            tests = self.profiler.iterate('parse', tests)
+        if self.shard:
+            index, total = self.shard
+            tests = (test for test in tests if shard_of(*test, total) == index)
+        if self.rerun_failed:
+            failed = failed_tests(self.output_dir)
+            if not failed:
+                console.print(f"\n[green]No failed tests in the last run ({self.output_dir})[/green]\n")
+                return
+            tests = (test for test in tests if test in failed)
 
         # Initialize
-        console.print("\n[cyan]🚀 Initializing LumenVM Runtime...[/cyan]")
-        time.sleep(0.5)
-        console.print("[green]✓[/green] Loading intent trees")
-        time.sleep(0.3)
-        console.print("[green]✓[/green] Compiling PyLux → bytecode")
-        time.sleep(0.4)
-        console.print("[green]✓[/green] Initializing GPU-accelerated DOM engine")
-        time.sleep(0.3)
-        console.print("[green]✓[/green] Connecting to test environment")
+        if self.output != 'quiet':
+            console.print("\n[cyan]🚀 Initializing LumenVM Runtime...[/cyan]")
+        init_steps = [
+            ("Loading intent trees", 0.5),
+            ("Compiling PyLux → bytecode", 0.3),
+            ("Initializing GPU-accelerated DOM engine", 0.4),
+            ("Connecting to test environment", 0.3),
+        ]
+        for step, duration in init_steps:
+            with self.timeline.span('setup', step, track='main'):
+                time.sleep(duration)
+            if self.output != 'quiet':
+                console.print(f"[green]✓[/green] {step}")
         time.sleep(0.4)
 
-        console.print("\n" + "━" * 70)
-
-        self.start_time = time.time()
-
-        # Run all test classes
-        for class_name, tests in self.test_classes.items():
-            console.print(f"\n[bold yellow]Class: {class_name}[/bold yellow]")
-
-            for test_name in tests:
-                test_info = self.run_test(class_name, test_name)
-                self.animate_test_execution(test_info)
+        if self.output != 'quiet':
+            console.print("\n" + "━" * 70)
+
+        self.start_time = time.perf_counter_ns()
+        self.reporter = TestReporter(self.output_dir, stream=True)
+        self.renderer = Renderer(console, self.output)
+        if self.profiler:
+            self.profiler.attach(self.reporter, self.renderer)
+
+        # Run tests as they are read from the suite
+        try:
+            current_class = None
+            for class_name, test_name in tests:
+                if class_name != current_class and self.output == 'tree':
+                    self.renderer.print(f"\n[bold yellow]Class: {class_name}[/bold yellow]")
+                current_class = class_name
+                self.animate_test_execution(class_name, test_name)
+        finally:
+            # Keep whatever ran so far, even on Ctrl+C
+            self.test_suite.close()
+            self.renderer.close()
+            self.reporter.close()
+            self.history.close()
 
         # Show summary
         self.show_summary()
+        with self.timeline.span('teardown', 'Writing reports', track='main'):
+            report = self.reporter.generate_json()
+            html_report = self.reporter.generate_html() if self.html else None
+        console.print(f"[dim]Report: {report}[/dim]")
+        if html_report:
+            console.print(f"[dim]HTML report: {html_report}[/dim]")
+        if self.trace:
+            console.print(f"[dim]Trace: {self.timeline.export_chrome_trace(self.trace)}[/dim]")
+        if self.profiler:
+            self.profiler.show(console, self.profiler.finish())
+        console.print()
 
     def show_summary(self):
         """Show test execution summary"""
-        elapsed_time = time.time() - self.start_time
+        elapsed_ns = time.perf_counter_ns() - self.start_time
+        elapsed_time = elapsed_ns / 1_000_000_000
 
         console.print("\n" + "━" * 70)
         console.print("\n[bold]Test Execution Summary[/bold]\n")
@@ -211,20 +294,12 @@ class LiveTestRunner:
 
         console.print(table)
 
-        # Performance comparison
-        playwright_time = elapsed_time * random.uniform(8.5, 10.2)
-        speedup = playwright_time / elapsed_time
-
-        console.print(f"\n[cyan]📊 Performance Analysis:[/cyan]")
-        console.print(f"   • LumenQA: [bold]{elapsed_time:.2f}s[/bold]")
-        console.print(f"   • Playwright (estimated): [dim]{playwright_time:.2f}s[/dim]")
-        console.print(f"   • Speedup: [bold green]{speedup:.1f}x faster![/bold green]")
-
-        # GPU stats
-        console.print(f"\n[cyan]⚡ LumenVM Statistics:[/cyan]")
-        console.print(f"   • GPU acceleration: [green]{random.randint(38, 48)}% of operations[/green]")
-        console.print(f"   • Intent tree cache hits: [green]{random.randint(82, 94)}%[/green]")
-        console.print(f"   • DOM cache efficiency: [green]{random.randint(76, 89)}%[/green]")
+        # Where the time went, measured per span
+        totals = self.timeline.totals()
+        console.print(f"\n[cyan]📊 Timing:[/cyan]")
+        console.print(f"   • Setup: [bold]{format_ns(totals['setup'])}[/bold]")
+        console.print(f"   • Test operations: [bold]{format_ns(totals['step'])}[/bold]")
+        console.print(f"   • Wall time: [bold]{format_ns(elapsed_ns)}[/bold]")
 
         # Result
         if self.results['failed'] == 0:
@@ -235,9 +310,13 @@ class LiveTestRunner:
         console.print("\n" + "━" * 70 + "\n")
 
 
-def run_live_tests(tests_file=None):
+def run_live_tests(tests_file=None, output_dir='lumen-results', html=False, trace=None,
+                   retries=None, rerun_failed=False, quiet=False, shard=None, profile=False):
     """Entry point for live test execution"""
-    runner = LiveTestRunner(tests_file=tests_file)
+    runner = LiveTestRunner(
+        tests_file=tests_file, output_dir=output_dir, html=html, trace=trace,
+        retries=retries, rerun_failed=rerun_failed, quiet=quiet, shard=shard, profile=profile,
+    )
     try:
         runner.run_suite()
         return runner.results['failed'] == 0
@@ -1,44 +1,327 @@
 """
 PyLux Parser - Parses .lux test files
+
+The parser is a single pass over the file's lines. Tests are yielded one at a
+time as soon as their body ends, so memory is bounded by the largest test
+rather than by the size of the file.
+
+Each test is a Test and each step a Step, slotted records rather than dicts
+so that a suite of a million steps stays small in memory, in the parse cache
+and in plan files::
+
+    Test(name='Login', file='tests/auth.lux', line=4, is_async=False, steps=[...])
+    Step(text='input #email => "a@b.c"', verb='input', target='#email',
+         value='"a@b.c"', is_await=False, line=7, children=())
+
+Verbs and targets are interned, so the thousands of ``click`` steps and
+``#email`` selectors in a suite share one string each. Lines ending in ``:``
+(``await all:``, ``- user1:``, ``if ...:``) open a block whose more-indented
+lines become the step's ``children`` list; every other step shares one empty
+tuple. to_dict()/from_dict() convert to and from the JSON-friendly dict form;
+dump_tests()/load_tests() store test lists as compact JSON rows for the parse
+cache and plan files, which are data only and safe to load from elsewhere.
 """
 
+import json
 import re
 from pathlib import Path
+from sys import intern
+
+TEST_HEADER = re.compile(r'(async\s+)?test\s+"([^"]+)"[^:]*:$')
+TOKEN = re.compile(r'f?"[^"]*"|\'[^\']*\'|\S+')
+SELECTOR_START = ('#', '.', '[')
+# A continuation line starting with one of these closes a multi-line step, whatever its indent
+CLOSERS = ('}', ']', ')')
+SPECIAL = re.compile(r'[#{}\[\]()]')
+STRUCTURE = re.compile(
+    r'"[^"]*"|\'[^\']*\'|(?P<comment>(?<!\S)#(?!\S).*)|(?P<open>[{\[(])|(?P<close>[}\])])'
+)
+
+NO_CHILDREN = ()
+
+
+class Step:
+    """One parsed step line"""
+
+    __slots__ = ('text', 'verb', 'target', 'value', 'is_await', 'line', 'children')
+
+    def __init__(self, text, verb, target=None, value=None, is_await=False, line=0, children=NO_CHILDREN):
+        self.text = text
+        self.verb = intern(verb)
+        self.target = target if target is None else intern(target)
+        self.value = value
+        self.is_await = is_await
+        self.line = line
+        self.children = children
+
+    def __repr__(self):
+        return f"Step({self.text!r}, line={self.line})"
+
+    def to_dict(self):
+        return {
+            'text': self.text,
+            'verb': self.verb,
+            'target': self.target,
+            'value': self.value,
+            'await': self.is_await,
+            'line': self.line,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        children = [cls.from_dict(child) for child in data.get('children') or ()]
+        return cls(
+            data['text'], data.get('verb', ''), data.get('target'), data.get('value'),
+            bool(data.get('await')), data.get('line', 0), children or NO_CHILDREN,
+        )
+
+
+class Test:
+    """One parsed test; `fingerprint` and `shard` are filled in by --incremental and plans
+
+    `error` is set when the test's source couldn't be parsed cleanly; such a
+    test fails without running.
+    """
+
+    __slots__ = ('name', 'file', 'line', 'is_async', 'steps', 'fingerprint', 'shard', 'error')
+
+    def __init__(self, name, file, line=0, is_async=False, steps=None, fingerprint=None, shard=None,
+                 error=None):
+        self.name = name
+        self.file = file
+        self.line = line
+        self.is_async = is_async
+        self.steps = [] if steps is None else steps
+        self.fingerprint = fingerprint
+        self.shard = shard
+        self.error = error
+
+    def __repr__(self):
+        return f"Test({self.name!r}, file={self.file!r}, line={self.line})"
+
+    def to_dict(self):
+        data = {
+            'name': self.name,
+            'file': self.file,
+            'line': self.line,
+            'async': self.is_async,
+            'steps': [step.to_dict() for step in self.steps],
+        }
+        if self.fingerprint is not None:
+            data['fingerprint'] = self.fingerprint
+        if self.shard is not None:
+            data['shard'] = self.shard
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get('name', 'Unknown test'), data.get('file'), data.get('line', 0),
+            bool(data.get('async')), [Step.from_dict(step) for step in data.get('steps') or ()],
+            data.get('fingerprint'), data.get('shard'), data.get('error'),
+        )
+
+
+def dump_tests(tests):
+    """Tests as compact JSON bytes (positional rows, not dicts; fingerprints as hex)"""
+    return json.dumps([
+        [test.name, test.file, test.line, test.is_async, [_step_row(step) for step in test.steps],
+         None if test.fingerprint is None else test.fingerprint.hex(), test.shard, test.error]
+        for test in tests
+    ], separators=(',', ':')).encode('utf-8')
+
+
+def load_tests(data):
+    """Tests from dump_tests() bytes; raises ValueError for anything else"""
+    try:
+        return [
+            Test(name, file, line, bool(is_async), [_step_from_row(row) for row in steps],
+                 None if fingerprint is None else bytes.fromhex(fingerprint), shard, error)
+            for name, file, line, is_async, steps, fingerprint, shard, error in json.loads(data)
+        ]
+    except (TypeError, ValueError, RecursionError) as e:
+        raise ValueError(f"Malformed test data: {e}") from None
+
+
+def _step_row(step):
+    return [step.text, step.verb, step.target, step.value, step.is_await, step.line,
+            [_step_row(child) for child in step.children]]
+
+
+def _step_from_row(row):
+    text, verb, target, value, is_await, line, children = row
+    children = [_step_from_row(child) for child in children] if children else NO_CHILDREN
+    return Step(text, verb, target, value, bool(is_await), line, children)
+
+
+def iter_lux_file(file_path):
+    """
+    Parse a .lux file lazily, yielding one Test at a time
+
+    Unreadable files and files without tests yield a single placeholder test,
+    matching what parse_lux_file has always returned for them.
+    """
+    found = False
+    try:
+        with open(file_path, encoding='utf-8') as handle:
+            for test in _iter_tests(handle, str(file_path)):
+                found = True
+                yield test
+    except (OSError, UnicodeDecodeError):
+        if not found:
+            yield _placeholder(f"Failed to read {file_path}", file_path)
+        return
+
+    if not found:
+        yield _placeholder(Path(file_path).stem, file_path)
+
+
+def parse_lux_text(text, file_path):
+    """Parse already-loaded .lux source, with the same fallbacks as parse_lux_file"""
+    tests = list(_iter_tests(text.splitlines(), str(file_path)))
+    return tests if tests else [_placeholder(Path(file_path).stem, file_path)]
 
 
 def parse_lux_file(file_path):
     """
     Parse a .lux file and extract test definitions
 
-    Returns a list of test objects with name and steps
+    Returns a list of Test records
     """
-    try:
-        content = Path(file_path).read_text()
-    except Exception as e:
-        return [{"name": f"Failed to read {file_path}", "steps": []}]
-
-    tests = []
-
-    # Simple regex to find test blocks
-    # Format: test "Test Name":
-    test_pattern = r'test\s+"([^"]+)":\s*\n((?:    .+\n?)*)'
-    matches = re.finditer(test_pattern, content, re.MULTILINE)
-
-    for match in matches:
-        test_name = match.group(1)
-        test_body = match.group(2)
-
-        # Extract steps (lines with indentation)
-        steps = []
-        for line in test_body.split('\n'):
-            line = line.strip()
-            if line and not line.startswith('#'):
-                # Extract the command (first word)
-                steps.append(line)
-
-        tests.append({
-            'name': test_name,
-            'steps': steps
-        })
-
-    return tests if tests else [{"name": Path(file_path).stem, "steps": []}]
+    return list(iter_lux_file(file_path))
+
+
+def _placeholder(name, file_path):
+    return Test(name, str(file_path))
+
+
+def _iter_tests(lines, file_name):
+    """Tokenize lines into tests, yielding each test when its body ends"""
+    test = None
+    stack = []
+    pending = None  # [line_no, indent, text, open_brackets] for multi-line steps
+
+    for line_no, raw in enumerate(lines, 1):
+        stripped = raw.strip()
+        if pending is not None:
+            if (stripped and stripped[0] != '#' and not stripped.startswith(CLOSERS)
+                    and _indent(raw) <= pending[1]):
+                # Dedented before the brackets closed: keep the step as far as it got
+                _add_step(stack, *pending[:3])
+                test.error = test.error or _unclosed(pending)
+                pending = None
+            else:
+                code, depth = _scan(stripped)
+                pending[2] += ' ' + code
+                pending[3] += depth
+                if pending[3] <= 0:
+                    _add_step(stack, *pending[:3])
+                    pending = None
+                continue
+
+        if not stripped or stripped[0] == '#':
+            continue
+
+        indent = _indent(raw)
+
+        if indent == 0:
+            # Anything at column 0 ends the current test
+            if test is not None:
+                yield test
+                test = None
+
+            match = TEST_HEADER.match(_scan(stripped)[0])
+            if match:
+                test = Test(match.group(2), file_name, line_no, bool(match.group(1)))
+                stack = [(0, test.steps)]
+            # Other top-level blocks (command definitions, etc.) are skipped
+            continue
+
+        if test is None:
+            continue
+
+        code, depth = _scan(stripped)
+        if depth > 0:
+            pending = [line_no, indent, code, depth]
+            continue
+        _add_step(stack, line_no, indent, code)
+
+    if pending is not None and test is not None:
+        _add_step(stack, *pending[:3])
+        test.error = test.error or _unclosed(pending)
+    if test is not None:
+        yield test
+
+
+def _unclosed(pending):
+    return f"Unclosed bracket in step at line {pending[0]}: {pending[2]}"
+
+
+def _indent(raw):
+    if '\t' in raw:
+        raw = raw.expandtabs(4)
+    return len(raw) - len(raw.lstrip())
+
+
+def _add_step(stack, line_no, indent, text):
+    """Attach a step to the innermost block that encloses its indentation"""
+    while stack[-1][0] >= indent:
+        stack.pop()
+
+    if text.startswith('- '):
+        text = text[2:].lstrip()
+
+    step = parse_step(text, line_no)
+    stack[-1][1].append(step)
+    if text.endswith(':'):
+        step.children = []
+        stack.append((indent, step.children))
+
+
+def parse_step(text, line_no=0):
+    """Split a single step line into verb, target and value"""
+    tokens = TOKEN.findall(text.rstrip(':'))
+    is_await = bool(tokens) and tokens[0] == 'await'
+    if is_await:
+        tokens = tokens[1:]
+
+    verb = tokens[0] if tokens else ''
+    target = None
+    for token in tokens[1:]:
+        if token[0] == '"' or token[:2] == 'f"' or token[0] == "'":
+            target = token[2:-1] if token[0] == 'f' else token[1:-1]
+            break
+        if token[0] in SELECTOR_START:
+            target = token
+            break
+        if token == '=>' or token == '{':
+            break
+    if target is None and len(tokens) > 1 and tokens[1] not in ('=>', '{'):
+        target = tokens[1]
+
+    value = None
+    if '=>' in text:
+        value = text.rsplit('=>', 1)[1].strip() or None
+
+    return Step(text, verb, target, value, is_await, line_no)
+
+
+def _scan(text):
+    """Strip a trailing comment and count unclosed brackets, ignoring quotes"""
+    if not SPECIAL.search(text):
+        return text, 0
+
+    depth = 0
+    for match in STRUCTURE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            depth -= 1
+        elif kind == 'comment':
+            # '#' only starts a comment on its own, never in a selector like #email
+            return text[:match.start()].rstrip(), depth
+    return text, depth
@@ -0,0 +1,120 @@
+"""
+LumenQA Run Plans - Discovery, parsing and sharding done once for many nodes
+
+``lumen plan`` writes every test of a suite, already parsed, fingerprinted
+and assigned to a shard, into one binary file:
+
+    header   magic, schema tag, shard count, test count
+    table    one (offset, length, tests, predicted ms) entry per shard
+    payload  one JSON test list per shard, longest-first (see parser.dump_tests)
+
+``lumen run --plan plan.bin --shard K`` memory-maps the file and decodes
+only its own shard's slice, so a node's startup cost depends on the size of
+its shard rather than the suite, and the source tree isn't read at all.
+Plans are shipped between machines, so they hold data only; loading one
+never runs code from it, unlike pickle. Shards are balanced by predicted
+duration (recorded history, or an estimate from the steps), each test going
+to the least loaded shard in turn.
+"""
+
+import gc
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+from .history import longest_first
+from .parser import dump_tests, load_tests
+from .version import __version__
+
+FORMAT_VERSION = 3
+MAGIC = b'LXPL'
+# magic, schema tag, shard count, test count
+HEADER = struct.Struct('<4s8sIQ')
+# payload offset, payload length, test count, predicted duration (ms)
+SHARD_ENTRY = struct.Struct('<QQId')
+SCHEMA = hashlib.blake2b(
+    f"{FORMAT_VERSION}:{__version__}".encode(), digest_size=8
+).digest()
+
+
+def assign_shards(tests, shards, history):
+    """Split tests into `shards` lists balanced by predicted duration
+
+    Returns (shard test lists, predicted ms per shard).
+    """
+    ordered, predicted, _ = longest_first(tests, history)
+    loads = [(0.0, index) for index in range(shards)]
+    assigned = [[] for _ in range(shards)]
+    for test, duration in zip(ordered, predicted):
+        load, index = heapq.heappop(loads)
+        test.shard = index + 1
+        assigned[index].append(test)
+        heapq.heappush(loads, (load + duration, index))
+    totals = [0.0] * shards
+    for load, index in loads:
+        totals[index] = load
+    return assigned, totals
+
+
+def write_plan(path, shard_tests, predicted):
+    """Write a plan file atomically; returns its path"""
+    path = Path(path)
+    payloads = [dump_tests(tests) for tests in shard_tests]
+    offset = HEADER.size + SHARD_ENTRY.size * len(payloads)
+
+    table = []
+    for tests, payload, duration in zip(shard_tests, payloads, predicted):
+        table.append(SHARD_ENTRY.pack(offset, len(payload), len(tests), duration))
+        offset += len(payload)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, SCHEMA, len(payloads), sum(map(len, shard_tests))))
+            handle.writelines(table)
+            handle.writelines(payloads)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def load_shard(path, shard):
+    """Tests of shard `shard` (1-based) from a plan file
+
+    Raises ValueError for a file that isn't a plan from this LumenQA version,
+    is truncated, or doesn't have the shard.
+    """
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if len(mm) < HEADER.size:
+            raise ValueError(f"{path} is not a LumenQA plan")
+        magic, schema, shards, _ = HEADER.unpack_from(mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a LumenQA plan")
+        if schema != SCHEMA:
+            raise ValueError(
+                f"{path} was written by another LumenQA version; run `lumen plan` again"
+            )
+        if not 1 <= shard <= shards:
+            raise ValueError(f"Shard {shard} is out of range; {path} has {shards} shard(s)")
+
+        table_end = HEADER.size + SHARD_ENTRY.size * shards
+        if len(mm) < table_end:
+            raise ValueError(f"{path} is truncated; run `lumen plan` again")
+        entry = HEADER.size + SHARD_ENTRY.size * (shard - 1)
+        offset, length, _, _ = SHARD_ENTRY.unpack_from(mm, entry)
+        if offset < table_end or offset + length > len(mm):
+            raise ValueError(f"{path} is truncated; run `lumen plan` again")
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return load_tests(mm[offset:offset + length])
+        finally:
+            if was_enabled:
+                gc.enable()
@@ -0,0 +1,295 @@
+"""
+LumenQA Profiling - Where a run's time and memory go (--profile)
+
+A Profiler wraps a runner's hot methods in place: parsing, running a test,
+rendering output and reporting each become a *phase*. Within a phase the
+calling thread's own cProfile profiler is enabled, so worker threads are
+profiled independently and merged at the end; nested phases on one thread
+share the outer phase's profiler. Phase times are wall time and inclusive.
+
+tracemalloc runs for the whole run. Whenever the traced peak has grown by
+PEAK_STEP since the last snapshot, the phase that raised it takes a new one
+on its way out; the last one is reported by allocation site.
+
+finish() writes to the output directory:
+
+    profile.pstats     merged cProfile data (python -m pstats, snakeviz, ...)
+    profile.txt        phase times and the top hotspots by own and cumulative time
+    allocations.txt    allocation sites at the peak snapshot
+
+Without --profile nothing is wrapped, so the only cost is one check per run.
+On Python 3.12+ cProfile is built on sys.monitoring, which is
+interpreter-wide: a single profiler sees every thread and no second one can
+be enabled. There one profiler runs from start() to finish(), and sections
+only time their phase.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+TOP = 25
+TRACE_FRAMES = 8
+# Re-snapshot once the peak is this much above the last snapshot's
+PEAK_STEP = 1.05
+# One interpreter-wide profiler (3.12+) instead of one per thread
+SHARED_PROFILE = sys.version_info >= (3, 12)
+# Builtins that only wait (on I/O, a lock or a timer); listed apart from the hotspots
+WAITS = (
+    "of 'select.", "'acquire' of '_thread.", "method 'wait' of", 'time.sleep', "'get' of '_queue.",
+)
+
+
+class Profiler:
+    """Per-thread cProfile and tracemalloc sampling for one run"""
+
+    def __init__(self, output_dir='lumen-results', top=TOP):
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.phases = {}
+        self.calls = {}
+        self.unprofiled = 0
+        self._profiles = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._peak = 0
+        self._peak_snapshot = None
+        self.peak = 0
+        self._started_tracing = False
+        self._shared = None
+        self._stats = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._started_tracing = True
+        if SHARED_PROFILE and self._shared is None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Something else in the process is already profiling
+                return
+            self._shared = profile
+            self._profiles.append(profile)
+
+    @contextmanager
+    def section(self, phase):
+        """Time, profile and memory-sample a block as part of `phase`"""
+        local = self._local
+        active = getattr(local, 'active', None)
+        if active is None:
+            active = local.active = []
+        profile = None
+        if not active and not SHARED_PROFILE:
+            profile = getattr(local, 'profile', None)
+            if profile is None:
+                profile = local.profile = cProfile.Profile()
+                with self._lock:
+                    self._profiles.append(profile)
+            try:
+                profile.enable()
+            except ValueError:
+                # Something else in the process is profiling
+                profile = None
+                with self._lock:
+                    self.unprofiled += 1
+        outer = phase not in active
+        active.append(phase)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            active.pop()
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                if outer:
+                    self.phases[phase] = self.phases.get(phase, 0) + elapsed
+                self.calls[phase] = self.calls.get(phase, 0) + 1
+            if not active:
+                self._sample_memory()
+
+    def wrap(self, phase, fn):
+        """fn, run as a section of `phase`"""
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            with self.section(phase):
+                return fn(*args, **kwargs)
+        return profiled
+
+    def instrument(self, obj, phase, *names):
+        """Replace methods on one object (not its class) with profiled versions"""
+        for name in names:
+            setattr(obj, name, self.wrap(phase, getattr(obj, name)))
+
+    def instrument_renderer(self, renderer):
+        """Profile render calls where they run: on the renderer's own thread"""
+        submit = renderer.submit
+
+        def submit_profiled(fn, *args, **kwargs):
+            submit(self.wrap('render', fn), *args, **kwargs)
+        renderer.submit = submit_profiled
+
+    def attach(self, reporter, renderer):
+        """Profile a run's reporter and renderer"""
+        self.instrument(
+            reporter, 'report', 'add_result', 'add_record', 'close', 'generate_json', 'generate_html'
+        )
+        self.instrument_renderer(renderer)
+
+    def iterate(self, phase, items):
+        """Yield from items, profiling the work of producing each one"""
+        items = iter(items)
+        while True:
+            with self.section(phase):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            yield item
+
+    def finish(self):
+        """Stop sampling and write the reports; returns their paths"""
+        if self._shared is not None:
+            self._shared.disable()
+        if tracemalloc.is_tracing():
+            self.peak = tracemalloc.get_traced_memory()[1]
+        if self._started_tracing:
+            tracemalloc.stop()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {}
+
+        stats = self._stats = self.stats()
+        if stats is not None:
+            paths['pstats'] = self.output_dir / 'profile.pstats'
+            stats.dump_stats(paths['pstats'])
+        paths['report'] = self.output_dir / 'profile.txt'
+        paths['report'].write_text(self.format_report(stats), encoding='utf-8')
+        paths['allocations'] = self.output_dir / 'allocations.txt'
+        paths['allocations'].write_text(self.format_allocations(), encoding='utf-8')
+        return paths
+
+    def show(self, console, paths, limit=10):
+        """Print phase times, the top hotspots and where the reports went"""
+        console.print("[cyan]🔬 Profile[/cyan] [dim](wall, inclusive; threads overlap)[/dim]")
+        phases = sorted(self.phases.items(), key=lambda item: -item[1])
+        console.print("   " + " · ".join(f"{phase} {ns / 1e9:.2f}s" for phase, ns in phases))
+        for calls, own, cumulative, func in self.hotspots(self._stats, limit=limit):
+            console.print(
+                f"   [dim]{own:>7.3f}s own {cumulative:>7.3f}s cum {calls:>7}×[/dim] {_short(func)}",
+                no_wrap=True, overflow='ellipsis',
+            )
+        console.print(
+            f"   [dim]Blocked waiting {self.waiting(self._stats):.2f}s · "
+            f"peak traced memory {self.peak / 1024 / 1024:.1f} MB[/dim]"
+        )
+        for path in paths.values():
+            console.print(f"[dim]Profile: {path}[/dim]")
+
+    def stats(self):
+        """Every thread's profile merged, or None if nothing was profiled"""
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile, stream=io.StringIO())
+            else:
+                stats.add(profile)
+        return stats
+
+    def hotspots(self, stats, key='tottime', limit=None):
+        """[(calls, own seconds, cumulative seconds, function)], costliest first, waits left out
+
+        `function` is pstats' (file, line, name) key.
+        """
+        if stats is None:
+            return []
+        column = 2 if key == 'tottime' else 3
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)
+        return [
+            (calls, own, cumulative, func)
+            for func, (_, calls, own, cumulative, _) in rows
+            if not _is_wait(func)
+        ][:limit or self.top]
+
+    def waiting(self, stats):
+        """Seconds spent blocked in WAITS builtins, summed over threads"""
+        if stats is None:
+            return 0.0
+        return sum(row[2] for func, row in stats.stats.items() if _is_wait(func))
+
+    def format_report(self, stats):
+        lines = ['Phase times (wall, inclusive; threads overlap)', '']
+        for phase, ns in sorted(self.phases.items(), key=lambda item: -item[1]):
+            lines.append(f"  {phase:<10} {ns / 1e9:>10.3f}s  {self.calls[phase]:>8} calls")
+        lines.append(f"\n  Blocked waiting (I/O, locks, sleeps; not listed below): "
+                     f"{self.waiting(stats):.3f}s")
+        if self.unprofiled:
+            lines.append(f"  {self.unprofiled} sections ran while something else held cProfile")
+        for key, title in (('tottime', 'own time'), ('cumtime', 'cumulative time')):
+            lines += ['', f"Top {self.top} by {title}", '',
+                      f"  {'calls':>9} {'own s':>9} {'cum s':>9}  function"]
+            lines += [
+                f"  {calls:>9} {own:>9.4f} {cumulative:>9.4f}  {pstats.func_std_string(func)}"
+                for calls, own, cumulative, func in self.hotspots(stats, key)
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def format_allocations(self):
+        if self._peak_snapshot is None:
+            return 'No allocations sampled\n'
+        lines = [f"Peak traced memory: {self.peak / 1024 / 1024:.1f} MB", '',
+                 f"Top {self.top} allocation sites when the last peak snapshot was taken "
+                 f"({self._peak / 1024 / 1024:.1f} MB)", '',
+                 f"  {'size KB':>10} {'blocks':>8}  site"]
+        for stat in self._peak_snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:>10.1f} {stat.count:>8}  {frame.filename}:{frame.lineno}")
+        return '\n'.join(lines) + '\n'
+
+    def _sample_memory(self):
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        if peak <= self._peak * PEAK_STEP:
+            return
+        with self._lock:
+            if peak <= self._peak * PEAK_STEP:
+                return
+            self._peak = peak
+            if self._shared is not None:
+                # Keep the snapshot's own cost out of the hotspots
+                self._shared.disable()
+            self._peak_snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ))
+            if self._shared is not None:
+                self._shared.enable()
+
+
+def _is_wait(func):
+    return func[0] == '~' and any(wait in func[2] for wait in WAITS)
+
+
+def _short(func):
+    """'file.py:12(name)' without the directory, for the console"""
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
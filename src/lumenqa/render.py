@@ -0,0 +1,92 @@
+"""
+LumenQA Rendering - Console output off the test-execution path
+
+Runners hand output to a Renderer instead of printing: each call is queued
+and a dedicated thread drains the queue, rendering everything that's waiting
+inside one ``with console:`` block so rich writes it in a single batch. A
+slow terminal or log collector then only ever holds up the renderer thread.
+
+The renderer also picks the output style:
+
+- ``tree``: full step trees and live operation progress (interactive terminals)
+- ``compact``: one line per test, plus the error for failures (piped output, CI)
+- ``quiet``: failures and the summary only
+"""
+
+import queue
+import threading
+
+MODES = ('tree', 'compact', 'quiet')
+BATCH_SIZE = 256
+
+_STOP = object()
+
+
+def output_mode(console, quiet=False):
+    """Pick the output style for a console"""
+    if quiet:
+        return 'quiet'
+    return 'tree' if console.is_terminal else 'compact'
+
+
+class Renderer:
+    """Runs render calls in order on a background thread, batching console writes"""
+
+    def __init__(self, console, mode='tree', batch_size=BATCH_SIZE):
+        self.console = console
+        self.mode = mode
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._drain, name='lumen-render', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) to run on the renderer thread"""
+        with self._idle:
+            self._pending += 1
+        self._queue.put((fn, args, kwargs))
+
+    def print(self, *args, **kwargs):
+        """Queue a console.print call"""
+        self.submit(self.console.print, *args, **kwargs)
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._pending == 0)
+
+    def close(self):
+        """Write what's left and stop the renderer thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            with self.console:
+                for item in batch:
+                    if item is _STOP:
+                        stop = True
+                        continue
+                    fn, args, kwargs = item
+                    try:
+                        fn(*args, **kwargs)
+                    except Exception:
+                        # A rendering bug must never take the run down with it
+                        self.console.print_exception()
+            self.console.file.flush()
+
+            with self._idle:
+                self._pending -= len(batch) - stop
+                self._idle.notify_all()
+            if stop:
+                return
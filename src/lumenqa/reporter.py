@@ -1,81 +1,322 @@
 """
 LumenQA Test Reporter - Generates test reports
+
+In streaming mode every result is appended to ``results.jsonl`` as it
+arrives (buffered, flushed every few results and fsynced periodically), so a
+crashed run still leaves a usable report behind. Summary counters are kept
+as results come in, and ``results.json`` is produced by streaming the JSONL
+file rather than holding every result in memory.
+
+Timestamps are taken as integer nanoseconds and only formatted as ISO 8601
+when a result is written out. Without streaming, results are held
+column-wise (see ResultTable): durations, timestamps and attempts in typed
+arrays, statuses and groups interned, so a large in-memory run costs a few
+dozen bytes per result rather than a dict each.
 """
 
 import json
+import os
+import time
+from array import array
 from datetime import datetime
 from pathlib import Path
 
+from .html_report import write_html_report
+
+# Shared encoder; skips json.dumps' per-call argument handling on the hot path
+encode = json.JSONEncoder().encode
+
+# Fields ResultTable keeps in columns; anything else a record carries is kept beside them
+COLUMNS = ('test', 'status', 'duration', 'error', 'timestamp', 'group', 'attempts')
+
+# (second, its ISO text): results arrive many per second, so the date and time are formatted once
+_last_second = (None, None)
+
+
+def format_timestamp(ns):
+    """ISO 8601 local time, to the microsecond, for a time.time_ns() value"""
+    global _last_second
+    seconds, rest = divmod(ns, 1_000_000_000)
+    cached, text = _last_second
+    if cached != seconds:
+        text = datetime.fromtimestamp(seconds).isoformat()
+        _last_second = (seconds, text)
+    return f"{text}.{rest // 1000:06d}"
+
+
+class ResultTable:
+    """Column-oriented store of result records, in the order they were added"""
+
+    def __init__(self):
+        self.tests = []
+        self.status = array('B')
+        self.group = array('L')
+        self.duration = array('d')
+        self.timestamp = array('q')
+        self.attempts = array('H')
+        self.errors = {}
+        self.extra = {}
+        self._values = {}
+        self._value_list = []
+
+    def __len__(self):
+        return len(self.tests)
+
+    def append(self, test, status, duration, error, timestamp, group, attempts):
+        """Add one result; `timestamp` is time.time_ns()"""
+        if error is not None:
+            self.errors[len(self.tests)] = error
+        self.tests.append(test)
+        self.status.append(self._intern(status))
+        self.group.append(self._intern(group))
+        self.duration.append(duration)
+        self.timestamp.append(timestamp)
+        self.attempts.append(min(attempts, 0xFFFF))
+
+    def append_record(self, result):
+        """Add a finished result dict, keeping fields that don't fit a column as they are"""
+        extra = {key: value for key, value in result.items() if key not in COLUMNS}
+        columns = {'timestamp': 0, 'duration': 0.0, 'attempts': 1}
+        for key, kind in (('timestamp', int), ('duration', (int, float)), ('attempts', int)):
+            value = result.get(key, columns[key])
+            if isinstance(value, kind) and not isinstance(value, bool):
+                columns[key] = value
+            else:
+                # e.g. a timestamp a stored report already formatted; kept as it was
+                extra[key] = value
+        if extra:
+            self.extra[len(self.tests)] = extra
+        self.append(
+            result.get('test'), result.get('status'), columns['duration'], result.get('error'),
+            columns['timestamp'], result.get('group'), columns['attempts'],
+        )
+
+    def __iter__(self):
+        """Yield each result as the dict that goes into the report"""
+        values = self._value_list
+        for i, test in enumerate(self.tests):
+            result = {
+                'test': test,
+                'status': values[self.status[i]],
+                'duration': self.duration[i],
+                'error': self.errors.get(i),
+                'timestamp': format_timestamp(self.timestamp[i]),
+            }
+            group = values[self.group[i]]
+            if group is not None:
+                result['group'] = group
+            if self.attempts[i] > 1:
+                result['attempts'] = self.attempts[i]
+            if i in self.extra:
+                result.update(self.extra[i])
+            yield result
+
+    def _intern(self, value):
+        found = self._values.get(value)
+        if found is None:
+            found = self._values[value] = len(self._value_list)
+            self._value_list.append(value)
+        return found
+
 
 class TestReporter:
     """Handles test result reporting in various formats"""
 
-    def __init__(self, output_dir='lumen-results'):
+    def __init__(self, output_dir='lumen-results', stream=False, flush_every=100, fsync_interval=5.0):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
-        self.results = []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.results = ResultTable()
+        self.stream = stream
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+        self.total = 0
+        self.counts = {}
 
-    def add_result(self, test_name, status, duration, error=None):
-        """Add a test result"""
-        self.results.append({
+        self._jsonl = None
+        self._unflushed = 0
+        self._last_fsync = time.monotonic()
+        if stream:
+            self.jsonl_path = self.output_dir / 'results.jsonl'
+            self._jsonl = open(self.jsonl_path, 'w', encoding='utf-8', buffering=1 << 16)
+
+    def add_result(self, test_name, status, duration, error=None, group=None, attempts=1):
+        """Add a test result; `attempts` above 1 means it was retried"""
+        timestamp = time.time_ns()
+        self.total += 1
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if self._jsonl is None:
+            self.results.append(test_name, status, duration, error, timestamp, group, attempts)
+            return
+        result = {
             'test': test_name,
             'status': status,
             'duration': duration,
             'error': error,
-            'timestamp': datetime.now().isoformat()
-        })
+            'timestamp': format_timestamp(timestamp),
+        }
+        if group is not None:
+            result['group'] = group
+        if attempts > 1:
+            result['attempts'] = attempts
+        self._write(result)
 
-    def generate_json(self):
-        """Generate JSON report"""
-        report = {
-            'framework': 'LumenQA',
-            'timestamp': datetime.now().isoformat(),
-            'summary': {
-                'total': len(self.results),
-                'passed': sum(1 for r in self.results if r['status'] == 'passed'),
-                'failed': sum(1 for r in self.results if r['status'] == 'failed'),
-            },
-            'tests': self.results
+    def add_record(self, result):
+        """Add a finished result dict as is (merging reuses stored ones)"""
+        status = result.get('status')
+        self.total += 1
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if self._jsonl is None:
+            self.results.append_record(result)
+            return
+        self._write(result)
+
+    def _write(self, result):
+        self._jsonl.write(encode(result) + '\n')
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self, sync=False):
+        """Push buffered results to disk, fsyncing at most every fsync_interval"""
+        if self._jsonl is None:
+            return
+        self._jsonl.flush()
+        self._unflushed = 0
+        now = time.monotonic()
+        if sync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._jsonl.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        """Flush and close the JSONL stream"""
+        if self._jsonl is not None:
+            self.flush(sync=True)
+            self._jsonl.close()
+            self._jsonl = None
+
+    def summary(self):
+        """Running totals; no pass over the results is needed"""
+        summary = {
+            'total': self.total,
+            'passed': self.counts.get('passed', 0),
+            'failed': self.counts.get('failed', 0),
         }
+        for status, count in self.counts.items():
+            summary.setdefault(status, count)
+        return summary
+
+    def iter_results(self):
+        """Yield every result added so far, streaming them from disk if needed"""
+        if not self.stream:
+            yield from self.results
+            return
+
+        self.flush()
+        with open(self.jsonl_path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    def generate_json(self):
+        """Generate JSON report
 
+        Tests are written one per line, straight from the JSONL stream when
+        streaming, so memory use doesn't grow with the number of results.
+        """
         output_file = self.output_dir / 'results.json'
-        output_file.write_text(json.dumps(report, indent=2))
+        tmp_file = output_file.with_suffix('.json.tmp')
+
+        with open(tmp_file, 'w', encoding='utf-8') as out:
+            out.write('{\n')
+            out.write('  "framework": "LumenQA",\n')
+            out.write(f'  "timestamp": {json.dumps(datetime.now().isoformat())},\n')
+            out.write(f'  "summary": {json.dumps(self.summary())},\n')
+            out.write('  "tests": [')
+            for i, line in enumerate(self._iter_result_lines()):
+                out.write(',\n    ' if i else '\n    ')
+                out.write(line)
+            out.write('\n  ]\n}\n')
+
+        os.replace(tmp_file, output_file)
         return output_file
 
+    def _iter_result_lines(self):
+        """Yield each result as a compact JSON string"""
+        if not self.stream:
+            for result in self.results:
+                yield encode(result)
+            return
+
+        self.flush()
+        with open(self.jsonl_path, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield line
+
     def generate_html(self):
-        """Generate HTML report"""
-        # Simplified HTML report
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>LumenQA Test Report</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                .passed { color: green; }
-                .failed { color: red; }
-            </style>
-        </head>
-        <body>
-            <h1>LumenQA Test Results</h1>
-            <p>Generated: {timestamp}</p>
-            <ul>
-        """
+        """Generate the paginated HTML report (see lumenqa.html_report)"""
+        return write_html_report(self.iter_results(), self.summary(), self.output_dir)
 
-        for result in self.results:
-            status_class = result['status']
-            html += f"""
-                <li class="{status_class}">
-                    {result['test']} - {result['status']} ({result['duration']}ms)
-                </li>
-            """
-
-        html += """
-            </ul>
-        </body>
-        </html>
-        """
 
-        output_file = self.output_dir / 'results.html'
-        output_file.write_text(html.format(timestamp=datetime.now().isoformat()))
-        return output_file
+def iter_report_results(path='lumen-results'):
+    """
+    Stream the results of a run
+
+    `path` is an output directory or a results.json / results.jsonl file.
+    For a directory, results.jsonl is read when present, otherwise the tests
+    of results.json, which generate_json writes one per line. Yields nothing
+    if there is no report.
+    """
+    path = Path(path)
+    if path.is_dir():
+        jsonl, report = path / 'results.jsonl', path / 'results.json'
+    elif path.suffix == '.jsonl':
+        jsonl, report = path, None
+    else:
+        jsonl, report = None, path
+
+    if jsonl and jsonl.exists():
+        with open(jsonl, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A run killed mid-write can leave a torn last line
+                        continue
+        return
+
+    if not report or not report.exists():
+        return
+    seen = 0
+    with open(report, encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip() == '"tests": [':
+                break
+        for line in handle:
+            line = line.strip()
+            if line.startswith(']'):
+                return
+            try:
+                result = json.loads(line.rstrip(','))
+            except ValueError:
+                break
+            seen += 1
+            yield result
+        else:
+            return
+
+    # Not in the one-test-per-line layout (an older or hand-edited report)
+    with open(report, encoding='utf-8') as handle:
+        yield from json.load(handle).get('tests', [])[seen:]
+
+
+def failed_tests(output_dir='lumen-results'):
+    """(group, test) pairs that failed in the last run in output_dir"""
+    return {
+        (result.get('group'), result.get('test'))
+        for result in iter_report_results(output_dir)
+        if result.get('status') == 'failed'
+    }
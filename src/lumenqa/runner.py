@@ -2,49 +2,190 @@
 LumenQA Test Runner - Executes PyLux tests with LumenVM
 """
 
+import os
 import time
-import random
+from collections import deque
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn
+from rich.markup import escape
+from rich.padding import Padding
 from rich.tree import Tree
-from rich.panel import Panel
-from rich.table import Table
 from .version import __version__
 from .parser import parse_lux_file
+from .cache import ParseCache
+from .discovery import discover
+from .reporter import TestReporter, failed_tests
+from .executor import StepExecutor, first_failure
+from .history import DurationHistory, history_key, longest_first, predicted_makespan
+from .config import load_config, resolve_api, resolve_retries, resolve_sessions
+from .drivers import load_driver
+from .api import ApiClient
+from .session import SessionPool
+from .healing import HealingStore, SelectorHealer
+from .fingerprint import ResultStore, environment, fingerprint_test
+from .plan import assign_shards, load_shard
+from .shard import shard_of
+from .render import Renderer, output_mode
+from .timing import Timeline, format_ns
+from .profiling import Profiler
 
 console = Console()
 
+# Parsing is mostly file I/O on large trees, so it gets its own small pool
+PARSE_WORKERS = 8
+# Tests ordered longest-first at a time; later ones keep streaming in behind them
+SCHEDULE_WINDOW = 1000
+
+
+def resolve_workers(parallel):
+    """Turn a --parallel value into a worker count ('auto' means one per CPU)"""
+    if parallel in (None, 'auto'):
+        return os.cpu_count() or 1
+    return max(1, int(parallel))
+
+
+def imap_ordered(pool, fn, items, window):
+    """
+    Like pool.map, but pulls from items lazily
+
+    At most `window` calls are in flight, so a streaming source keeps
+    feeding the pool without being drained up front. Results come back in
+    input order.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
 
 class TestRunner:
-    def __init__(self, test_file, parallel=None, browser='chrome', headless=True):
-        self.test_file = Path(test_file)
+    def __init__(self, test_paths, parallel=None, browser='chrome', headless=True, cache=True,
+                 output_dir='lumen-results', html=False, step_concurrency=8,
+                 max_concurrent_steps=64, trace=None, history=True, incremental=False,
+                 force=False, retries=None, rerun_failed=False, plan=None, shard=None,
+                 shard_by='hash', quiet=False, sessions=None, healing=True, profile=False):
+        if isinstance(test_paths, (str, Path)):
+            test_paths = [test_paths]
+        self.test_paths = [str(path) for path in test_paths]
         self.parallel = parallel or 'auto'
         self.browser = browser
         self.headless = headless
-        self.tests = []
+        self.parse_cache = ParseCache() if cache else None
+        self.files = 0
+        self.output_dir = output_dir
+        self.html = html
+        self.step_concurrency = step_concurrency
+        self.max_concurrent_steps = max_concurrent_steps
+        self.trace = trace
+        self.history = DurationHistory() if history else None
+        self.config = load_config()
+        self.result_store = ResultStore() if incremental else None
+        self.force = force
+        self.retries = resolve_retries(self.config if retries is None else retries)
+        self.rerun_failed = rerun_failed
+        self.failed_last_run = None
+        self.flaky = 0
+        self.plan = plan
+        # (K, N), 1-based; N is None when K just picks a shard of the plan
+        self.shard = shard or ((1, None) if plan else None)
+        self.shard_by = shard_by
+        self.plan_tests = None
+        self.output = output_mode(console, quiet)
+        self.renderer = None
+        self.session_settings = resolve_sessions(self.config, sessions)
+        self.driver = None
+        self.sessions = None
+        self.healer = SelectorHealer(HealingStore() if healing else None)
+        self.api_settings = resolve_api(self.config)
+        self.api = None
+        self.timeline = Timeline()
+        self.wall_ns = 0
+        self.executor = None
+        self.reporter = None
+        self.profiler = Profiler(output_dir) if profile else None
+        if self.profiler:
+            self.profiler.instrument(self, 'parse', '_parse_file')
+            self.profiler.instrument(self, 'test', '_run_single_test')
         self.results = {
             'passed': 0,
             'failed': 0,
             'skipped': 0,
+            'cached': 0,
         }
 
     def run(self):
         """Execute the test suite"""
-        console.print(f"\n[cyan bold]🚀 LumenQA v{__version__} - LumenVM Runtime[/cyan bold]")
-        console.print("━" * 60)
+        if self.output != 'quiet':
+            console.print(f"\n[cyan bold]🚀 LumenQA v{__version__} - LumenVM Runtime[/cyan bold]")
+            console.print("━" * 60)
+        if self.profiler:
+            self.profiler.start()
+
+        if self.rerun_failed:
+            self.failed_last_run = {
+                history_key(group, name) for group, name in failed_tests(self.output_dir)
+            }
+            if not self.failed_last_run:
+                console.print(f"[green]No failed tests in the last run ({self.output_dir})[/green]\n")
+                return True
+
+        if self.plan:
+            try:
+                with self.timeline.span('parse', f"{self.plan} (shard {self.shard[0]})", track='main'):
+                    self.plan_tests = load_shard(self.plan, self.shard[0])
+            except (OSError, ValueError) as e:
+                console.print(f"[red]Can't load plan: {e}[/red]\n")
+                return False
+
+        if not self._load_driver():
+            return False
 
         # Initialize
         self._initialize()
 
-        # Parse test file
-        self._parse_tests()
-
-        # Run tests
-        self._execute_tests()
+        # Discover, parse and run tests as one stream
+        self.reporter = TestReporter(self.output_dir, stream=True)
+        self.renderer = Renderer(console, self.output)
+        if self.profiler:
+            self.profiler.attach(self.reporter, self.renderer)
+        start = time.perf_counter_ns()
+        try:
+            self._execute_tests()
+        finally:
+            self.renderer.close()
+            self.reporter.close()
+            if self.history:
+                self.history.close()
+            if self.result_store:
+                self.result_store.close()
+            self.healer.close()
+        self.wall_ns = time.perf_counter_ns() - start
+        if self.files == 0:
+            if self.plan:
+                console.print(f"[yellow]Shard {self.shard[0]} of {self.plan} has no tests[/yellow]\n")
+            else:
+                console.print(f"[yellow]No .lux files found in: {' '.join(self.test_paths)}[/yellow]\n")
+            return False
 
         # Show results
         self._show_results()
+        with self.timeline.span('teardown', 'Writing reports', track='main'):
+            report = self.reporter.generate_json()
+            html_report = self.reporter.generate_html() if self.html else None
+        console.print(f"[dim]Report: {report}[/dim]")
+        if html_report:
+            console.print(f"[dim]HTML report: {html_report}[/dim]")
+        if self.trace:
+            console.print(f"[dim]Trace: {self.timeline.export_chrome_trace(self.trace)}[/dim]")
+        if self.profiler:
+            self.profiler.show(console, self.profiler.finish())
+        console.print()
 
         return self.results['failed'] == 0
 
@@ -57,115 +198,359 @@ class TestRunner:
         ]
 
         for step, duration in init_steps:
-            with console.status(f"[cyan]{step}...[/cyan]") as status:
-                time.sleep(duration)
-            console.print(f"[green]✓[/green] {step}")
+            with self.timeline.span('setup', step, track='main'):
+                if self.output == 'tree':
+                    with console.status(f"[cyan]{step}...[/cyan]"):
+                        time.sleep(duration)
+                else:
+                    time.sleep(duration)
+            if self.output != 'quiet':
+                console.print(f"[green]✓[/green] {step}")
+
+        if self.output != 'quiet':
+            console.print()
+
+    def _load_driver(self):
+        """Create the configured browser driver; False (after saying why) if it can't be"""
+        try:
+            self.driver = load_driver(self.session_settings['driver'], self.browser, self.headless)
+        except (ImportError, AttributeError, ValueError) as e:
+            console.print(f"[red]Can't load driver: {e}[/red]\n")
+            return False
+        self.driver.healer = self.healer
+        return True
+
+    @contextmanager
+    def _execution(self, workers):
+        """Launch the browser, pre-warm contexts and start the step executor for a run"""
+        settings = self.session_settings
+        if self.api_settings['base_url']:
+            api_settings = dict(self.api_settings)
+            if api_settings['pool_size'] is None:
+                # A connection for every API call that can be in flight at once
+                api_settings['pool_size'] = min(self.max_concurrent_steps, workers * self.step_concurrency)
+            self.api = ApiClient(**api_settings)
+        self.executor = StepExecutor(
+            self.step_concurrency, self.max_concurrent_steps, timeline=self.timeline, api=self.api,
+            profiler=self.profiler,
+        )
+        try:
+            with self.timeline.span('setup', f"Launching {self.browser}", track='main'):
+                self.driver.start()
+            try:
+                self.sessions = SessionPool(
+                    self.driver, settings['max_uses'], settings['max_memory_growth'] or None
+                )
+                with self.timeline.span('setup', 'Pre-warming browser contexts', track='main'):
+                    self.sessions.prewarm(workers * settings['prewarm'])
+                yield
+            finally:
+                if self.sessions:
+                    self.sessions.close()
+                self.driver.close()
+        finally:
+            self.executor.close()
+            if self.api:
+                self.api.close()
+
+    def _parse_tests(self, pool):
+        """Discover and parse PyLux test files, yielding tests as they become ready"""
+        files = discover(self.test_paths)
+        for tests in imap_ordered(pool, self._parse_file, files, PARSE_WORKERS * 2):
+            self.files += 1
+            yield from tests
+
+        if self.parse_cache:
+            self.parse_cache.prune()
+
+    def collect_tests(self):
+        """Discover and parse every test up front (for `lumen plan`)"""
+        with ThreadPoolExecutor(PARSE_WORKERS, thread_name_prefix='lumen-parse') as pool:
+            return list(self._parse_tests(pool))
+
+    def _parse_file(self, path):
+        """Parse one file, reusing the cached parse when it is unchanged"""
+        with self.timeline.span('parse', str(path)):
+            if self.parse_cache:
+                return self.parse_cache.load(path)
+            return parse_lux_file(path)
 
-        console.print()
+    def _execute_tests(self):
+        """Execute all tests on the worker pool
+
+        Discovery, parsing and execution overlap: tests are submitted as soon
+        as their file is parsed. With duration history they're ordered
+        longest-first a window at a time on the way (see _schedule). A plan
+        shard arrives parsed and ordered, so it's run as is. The browser is
+        only launched once a test needs it, so a run where every test is
+        cached (or filtered out) never starts one.
+        Workers only run tests and hand back result dicts; the parent thread
+        collects them in submission order, so counters and console output are
+        only ever touched from one place.
+        """
+        workers = resolve_workers(self.parallel)
+        if self.plan:
+            source = f"shard {self.shard[0]} of {self.plan}"
+        elif self.shard:
+            source = f"{' '.join(self.test_paths)} (shard {self.shard[0]}/{self.shard[1]})"
+        else:
+            source = ' '.join(self.test_paths)
+        self._note(f"[dim]Running: {source} ({workers} worker{'s' if workers != 1 else ''})[/dim]\n")
+
+        with ThreadPoolExecutor(PARSE_WORKERS, thread_name_prefix='lumen-parse') as parse_pool, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lumen-worker') as pool:
+            if self.plan_tests is not None:
+                tests = self.plan_tests
+                self.files = len({test.file for test in tests})
+            else:
+                tests = self._parse_tests(parse_pool)
+                if self.shard:
+                    tests = self._take_shard(tests)
+            tests = iter(self._select_tests(tests))
+            if self.history and self.plan_tests is None:
+                tests = self._schedule(tests, workers)
+            first = next(tests, None)
+            if first is None:
+                return
+            with self._execution(workers):
+                for result in imap_ordered(pool, self._run_single_test, chain([first], tests),
+                                           workers * 4):
+                    self._record_result(result)
+
+    def _select_tests(self, tests):
+        """Apply --rerun-failed and --incremental to a stream of tests"""
+        if self.failed_last_run:
+            tests = (
+                test for test in tests
+                if history_key(test.file, test.name) in self.failed_last_run
+            )
+        if self.result_store:
+            tests = self._skip_cached(tests)
+        return tests
+
+    def _take_shard(self, tests):
+        """Keep only this machine's slice of the suite (see lumenqa.shard)"""
+        index, total = self.shard
+        if self.shard_by == 'duration':
+            return assign_shards(list(tests), total, self.history)[0][index - 1]
+        return (
+            test for test in tests
+            if shard_of(*history_key(test.file, test.name), total) == index
+        )
 
-    def _parse_tests(self):
-        """Parse PyLux test file"""
-        console.print(f"[dim]Running: {self.test_file}[/dim]\n")
+    def _skip_cached(self, tests):
+        """Fingerprint tests, reporting those that passed unchanged last time as cached"""
+        env = environment(self.config, self.browser, self.headless)
+        for test in tests:
+            test.fingerprint = fingerprint = fingerprint_test(test, env)
+            last = None if self.force else self.result_store.last(fingerprint)
+            if last and last[0] == 'passed':
+                self.result_store.touch(fingerprint)
+                self._record_cached(test)
+                continue
+            yield test
+
+    def _record_cached(self, test):
+        """Count a test skipped by an incremental run"""
+        name = test.name
+        self.results['cached'] += 1
+        self.reporter.add_result(name, 'cached', 0, group=test.file)
+        self._note(f"[dim]○ {escape(name)} (cached)[/dim]")
+
+    def _schedule(self, tests, workers):
+        """
+        Order tests longest-first by recorded (or estimated) duration
+
+        Only SCHEDULE_WINDOW tests are held back and ordered at a time, so a
+        large suite starts after its first window is parsed instead of after
+        all of it. Until the history has recorded anything there's nothing
+        to order by, and tests stream through in discovery order.
+        """
+        if not self.history.estimates():
+            yield from tests
+            return
+        tests = iter(tests)
+        first = True
+        while True:
+            window = list(islice(tests, SCHEDULE_WINDOW))
+            if not window:
+                return
+            window, predicted, known = longest_first(window, self.history)
+            if first:
+                if len(window) < SCHEDULE_WINDOW:
+                    makespan = predicted_makespan(predicted, workers) * 1_000_000
+                    detail = f", predicted {format_ns(makespan)}"
+                else:
+                    detail = f" in the first {SCHEDULE_WINDOW}"
+                self._note(
+                    f"[dim]Scheduled longest-first: {known}/{len(window)} tests from history"
+                    f"{detail}[/dim]\n"
+                )
+                first = False
+            yield from window
+
+    def _run_single_test(self, test):
+        """Run a single test and return its result (runs on a worker thread)
+
+        Each attempt runs in a browser context leased from the session pool.
+        A failed test is retried in place, up to `retries` more times; only
+        the last attempt's steps are reported.
+        """
+        test_name = test.name
+        duration = 0
+        attempts = 0
+        while True:
+            attempts += 1
+            with self.sessions.lease() as context:
+                context.begin('::'.join(history_key(test.file, test_name)))
+                start = time.perf_counter_ns()
+                steps = self.executor.run(test, context)
+                end = time.perf_counter_ns()
+            label = test_name if attempts == 1 else f"{test_name} (retry {attempts - 1})"
+            self.timeline.record('test', label, start, end)
+            duration += end - start
+
+            failure = first_failure(steps)
+            if failure is None or attempts > self.retries:
+                break
+
+        return {
+            'name': test_name,
+            'file': test.file,
+            'passed': failure is None,
+            'steps': steps,
+            'duration': duration / 1_000_000,
+            'attempts': attempts,
+            'error': failure['error'] if failure else None,
+            'error_step': f"at line {failure['line']}: {failure['text']}" if failure else None,
+            'fingerprint': test.fingerprint,
+        }
 
-        # Read and parse the test file
-        tests = parse_lux_file(self.test_file)
-        self.tests = tests if tests else [{"name": "Example test", "steps": []}]
+    def _record_result(self, result):
+        """Count a finished test and print its output as one block"""
+        status = 'passed' if result['passed'] else 'failed'
+        self.results[status] += 1
+        if result['passed'] and result['attempts'] > 1:
+            self.flaky += 1
+        if self.history:
+            self.history.record(result['file'], result['name'], result['duration'], status)
+        if self.result_store and result['fingerprint']:
+            self.result_store.record(result['fingerprint'], status, result['duration'])
+        self.reporter.add_result(
+            result['name'], status, round(result['duration'], 1), result['error'],
+            group=result['file'], attempts=result['attempts'],
+        )
+        if result['passed'] and self.output == 'quiet':
+            return
+        self.renderer.submit(self._show_test_result, result)
 
-    def _execute_tests(self):
-        """Execute all tests"""
-        for test in self.tests:
-            self._run_single_test(test)
+    def _note(self, text):
+        """Queue a progress line; dropped in quiet mode"""
+        if self.output != 'quiet':
+            self.renderer.print(text)
 
-    def _run_single_test(self, test):
-        """Run a single test and show detailed output"""
-        test_name = test.get('name', 'Unknown test')
-        steps = test.get('steps', [])
+    def _show_test_result(self, result):
+        """Show the output for a single test (runs on the renderer thread)"""
+        if self.output != 'tree':
+            self._show_test_line(result)
+            return
 
-        # Simulate test execution with timing
-        start_time = time.time()
+        test_name = escape(result['name'])
+        duration = result['duration']
 
         # Create a tree for test steps
         tree = Tree(f"[cyan]{test_name}[/cyan]")
+        self._add_step_nodes(tree, result['steps'])
 
-        # Add initialization
-        init_time = random.randint(35, 65)
-        tree.add(f"[dim]navigate → {init_time}ms[/dim]")
-
-        # Execute steps with fake timing
-        total_step_time = init_time
-
-        if steps:
-            for step in steps:
-                step_time = random.randint(8, 25)
-                total_step_time += step_time
-                tree.add(f"[dim]{step} → {step_time}ms[/dim]")
-        else:
-            # Default fake steps
-            fake_steps = [
-                ("input#email", random.randint(10, 15)),
-                ("input#password", random.randint(9, 14)),
-                ("click \"Login\"", random.randint(120, 180)),
-                ("assertions", random.randint(18, 28)),
-            ]
-
-            for step, step_time in fake_steps:
-                total_step_time += step_time
-                tree.add(f"[dim]{step} → {step_time}ms[/dim]")
-
-        # Simulate execution time
-        time.sleep(0.3)
-
-        # Determine if test passes (95% success rate for realism)
-        passed = random.random() > 0.05
-
-        if passed:
-            console.print(f"[green]✓[/green] {test_name} [dim]({total_step_time}ms)[/dim]")
-            self.results['passed'] += 1
+        attempts = result['attempts']
+        retried = f", {attempts} attempts" if attempts > 1 else ""
+        if result['passed']:
+            mark = "[yellow]✓[/yellow]" if attempts > 1 else "[green]✓[/green]"
+            console.print(f"{mark} {test_name} [dim]({duration:.0f}ms{retried})[/dim]")
         else:
-            console.print(f"[red]✗[/red] {test_name} [dim]({total_step_time}ms)[/dim]")
-            console.print("  [red]Error:[/red] Element not found: .submit-button")
-            console.print("  [dim]at line 8: click \".submit-button\"[/dim]")
-            self.results['failed'] += 1
+            console.print(f"[red]✗[/red] {test_name} [dim]({duration:.0f}ms{retried})[/dim]")
+            console.print(f"  [red]Error:[/red] {escape(result['error'])}")
+            console.print(f"  [dim]{escape(result['error_step'])}[/dim]")
 
         # Show tree with indent
-        for line in tree.__rich_console__(console, console.options):
-            console.print("  ", end="")
-            console.print(line)
+        console.print(Padding(tree, (0, 0, 1, 2), expand=False))
 
-        console.print()
+    def _show_test_line(self, result):
+        """One line per test, plus where it failed, for logs"""
+        attempts = result['attempts']
+        retried = f", {attempts} attempts" if attempts > 1 else ""
+        status = 'PASS' if result['passed'] else 'FAIL'
+        console.print(
+            f"{status} {escape(result['name'])} ({result['duration']:.0f}ms{retried})", highlight=False
+        )
+        if not result['passed']:
+            console.print(f"  Error: {escape(result['error'])}", highlight=False)
+            console.print(f"  {escape(result['error_step'])}", highlight=False)
+
+    def _add_step_nodes(self, tree, steps):
+        """Add step results (and nested blocks) to a rich Tree"""
+        for step in steps:
+            text = escape(step['text'])
+            if step['status'] == 'failed' and not step['children']:
+                label = f"[red]{text} ✗ {step['duration']:.0f}ms[/red]"
+            elif step['status'] == 'skipped':
+                label = f"[dim strike]{text}[/dim strike] [dim]skipped[/dim]"
+            else:
+                label = f"[dim]{text} → {step['duration']:.0f}ms[/dim]"
+            node = tree.add(label)
+            if step['children']:
+                self._add_step_nodes(node, step['children'])
 
     def _show_results(self):
         """Display test execution summary"""
         console.print("━" * 60)
 
-        total_tests = self.results['passed'] + self.results['failed'] + self.results['skipped']
-        total_time = random.randint(180, 350)
+        total_time = format_ns(self.wall_ns)
+        extra = f", {self.results['cached']} cached" if self.results['cached'] else ""
+        if self.flaky:
+            extra += f", {self.flaky} flaky"
 
         if self.results['failed'] == 0:
             console.print(
                 f"[green]✅ {self.results['passed']} passed[/green], "
-                f"{self.results['failed']} failed "
-                f"[dim]({total_time}ms total)[/dim]"
+                f"{self.results['failed']} failed{extra} "
+                f"[dim]({total_time} total)[/dim]"
             )
         else:
             console.print(
                 f"{self.results['passed']} passed, "
-                f"[red]❌ {self.results['failed']} failed[/red] "
-                f"[dim]({total_time}ms total)[/dim]"
+                f"[red]❌ {self.results['failed']} failed[/red]{extra} "
+                f"[dim]({total_time} total)[/dim]"
             )
 
-        # Performance comparison
-        playwright_time = total_time * random.uniform(5.8, 7.2)
-        improvement = playwright_time / total_time
-
+        # Where the time went; test time is summed across workers
+        totals = self.timeline.totals()
         console.print(
-            f"[cyan]📊 Performance: {improvement:.1f}x faster than Playwright[/cyan]"
+            f"[cyan]📊 Timing: parse {format_ns(totals['parse'])} · "
+            f"tests {format_ns(totals['test'])} across workers · "
+            f"wall {total_time}[/cyan]"
         )
 
-        # GPU stats
-        if random.random() > 0.3:
+        if self.sessions and self.sessions.created:
+            pool = self.sessions
+            console.print(
+                f"[dim]🧭 Browser contexts: {pool.created} created, {pool.reused} reused, "
+                f"{pool.recycled} recycled[/dim]"
+            )
+
+        if self.api and self.api.requests + self.api.failures:
+            failures = f", {self.api.failures} failed" if self.api.failures else ""
+            console.print(
+                f"[dim]🔌 API: {self.api.requests} requests over "
+                f"{self.api.connections()} connections{failures}[/dim]"
+            )
+
+        healer = self.healer
+        if healer.hits + healer.misses:
             console.print(
-                f"[dim]⚡ GPU acceleration: {random.randint(35, 48)}% of DOM operations[/dim]"
+                f"[dim]🩹 Selector cache: {healer.hits} hits, {healer.misses} misses "
+                f"({healer.hit_rate():.0%} hit rate), {healer.healed} healed, "
+                f"{healer.evicted} evicted[/dim]"
             )
 
         console.print()
@@ -0,0 +1,120 @@
+"""
+LumenQA Sessions - Browser contexts reused across tests
+
+Creating a browser context costs far more than most short tests, so the
+runner keeps a pool of them. The pool is pre-warmed with ``prewarm``
+contexts per worker before the first test; each test leases one and hands
+it back when it's done, and the pool resets it (cookies, storage, pages)
+instead of creating a new one.
+
+A context is recycled (closed, and replaced the next time one is needed)
+after ``max_uses`` tests, or once its memory has grown by more than
+``max_memory_growth`` MB since it was created, so a leaky page can't slow
+down every test after it. Drivers that can't measure memory are only
+recycled by use count.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Contexts created at once while pre-warming
+PREWARM_WORKERS = 8
+
+
+class _Session:
+    __slots__ = ('context', 'uses', 'baseline')
+
+    def __init__(self, context):
+        self.context = context
+        self.uses = 0
+        self.baseline = context.memory()
+
+
+class SessionPool:
+    """Thread-safe pool of browser contexts from one driver"""
+
+    def __init__(self, driver, max_uses=50, max_memory_growth=256):
+        self.driver = driver
+        self.max_uses = max_uses
+        self.max_growth = None if max_memory_growth is None else max_memory_growth * 1024 * 1024
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+
+    def prewarm(self, count):
+        """Create `count` contexts up front, several at a time"""
+        if count <= 0:
+            return
+        with ThreadPoolExecutor(min(count, PREWARM_WORKERS), thread_name_prefix='lumen-prewarm') as pool:
+            sessions = list(pool.map(lambda _: self._create(), range(count)))
+        with self._lock:
+            self._idle.extend(sessions)
+
+    @contextmanager
+    def lease(self):
+        """Borrow a context for one test"""
+        session = self._acquire()
+        try:
+            yield session.context
+        finally:
+            self._release(session)
+
+    def close(self):
+        """Close every idle context (leased ones are closed when they come back)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+        for session in idle:
+            session.context.close()
+
+    def _create(self):
+        session = _Session(self.driver.new_context())
+        with self._lock:
+            self.created += 1
+        return session
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                # Most recently used first; it's the likeliest to be warm
+                session = self._idle.pop()
+                # A pre-warmed context's first lease isn't a reuse
+                if session.uses:
+                    self.reused += 1
+                return session
+        return self._create()
+
+    def _release(self, session):
+        session.uses += 1
+        if not self._closed and not self._worn_out(session) and self._reset(session):
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(session)
+                    return
+
+        session.context.close()
+        with self._lock:
+            if not self._closed:
+                self.recycled += 1
+
+    @staticmethod
+    def _reset(session):
+        try:
+            session.context.reset()
+        except Exception:
+            # A context that can't be cleaned can't be trusted with another test
+            return False
+        return True
+
+    def _worn_out(self, session):
+        if self.max_uses and session.uses >= self.max_uses:
+            return True
+        if self.max_growth is None or session.baseline is None:
+            return False
+        memory = session.context.memory()
+        return memory is not None and memory - session.baseline > self.max_growth
@@ -0,0 +1,34 @@
+"""
+LumenQA Sharding - Splitting one suite across CI machines
+
+``--shard K/N`` runs the K-th of N disjoint slices of the suite. By default
+a test's slice comes from a hash of its file (or class) and name, so every
+machine agrees without coordinating and a test only moves when it's
+renamed. With duration balancing, every machine computes the same
+longest-first packing from the recorded history instead; that needs the
+same ``.lumen-cache/history.db`` on every machine (restore it from a CI
+cache), otherwise shards may overlap or miss tests.
+"""
+
+import hashlib
+
+SHARD_MODES = ('hash', 'duration')
+
+
+def parse_shard(value):
+    """Parse 'K/N' (or plain 'K', for plans) into (K, N or None), 1-based"""
+    index, _, total = str(value).partition('/')
+    try:
+        index = int(index)
+        total = int(total) if total else None
+    except ValueError:
+        raise ValueError(f"expected K/N, got {value!r}") from None
+    if index < 1 or (total is not None and not index <= total):
+        raise ValueError(f"shard {value} is out of range")
+    return index, total
+
+
+def shard_of(group, name, total):
+    """1-based shard for a test, stable across machines and runs"""
+    digest = hashlib.blake2b(f"{group}\0{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % total + 1
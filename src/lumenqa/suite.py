@@ -0,0 +1,172 @@
+"""
+LumenQA Suites - Declarative test data for `lumen test`, read as a stream
+
+A suite file is a sequence of records, one per line in JSON Lines
+(``.jsonl``) or one per document in YAML (``.yml``/``.yaml``, documents
+separated by ``---``; a document may also be a list of records):
+
+    {"operation": "login", "steps": ["Open login page", "Submit"], "keywords": ["login", "sign in"]}
+    {"operations": {"search": ["Type query", "Check results"]}}
+    {"class": "TestAuth", "test": "test_01_login"}
+    {"class": "TestAuth", "tests": ["test_02_logout", "test_03_reset"]}
+
+Operation records come first; tests are then read lazily while the suite
+runs, so a suite of any size never has to be held in memory. Python test
+data modules (TEST_CLASSES / TEST_OPERATIONS) still work through
+load_suite as well.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import yaml
+from rich.console import Console
+
+console = Console()
+
+# libyaml's loader when it's available; several times faster on large suites
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_test_data_from_file(file_path):
+    """Load TEST_CLASSES, TEST_OPERATIONS and TEST_OPERATION_KEYWORDS from a Python file"""
+    try:
+        spec = importlib.util.spec_from_file_location("custom_tests", file_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        return (
+            getattr(module, 'TEST_CLASSES', {}),
+            getattr(module, 'TEST_OPERATIONS', {}),
+            getattr(module, 'TEST_OPERATION_KEYWORDS', {}),
+        )
+    except Exception as e:
+        console.print(f"[red]Error loading test file: {e}[/red]")
+        return {}, {}, {}
+
+
+class Suite:
+    """Operations up front, tests as a lazy stream of (class, test) pairs"""
+
+    def __init__(self, records, source='suite'):
+        self.source = source
+        self.operations = {}
+        self.keywords = {}
+        self._records = records
+        self._pending = None
+
+        for where, record in records:
+            if self._is_tests(record):
+                self._pending = (where, record)
+                break
+            self._add_operations(where, record)
+
+    @classmethod
+    def from_dicts(cls, test_classes, operations, keywords=None, source='suite'):
+        """A suite over already-built TEST_CLASSES / TEST_OPERATIONS dicts"""
+        suite = cls(iter(()), source)
+        suite.operations = dict(operations)
+        suite.keywords = dict(keywords or {})
+        suite._records = (
+            (class_name, {'class': class_name, 'tests': tests})
+            for class_name, tests in test_classes.items()
+        )
+        return suite
+
+    def iter_tests(self):
+        """Yield (class name, test name) pairs in file order"""
+        if self._pending:
+            yield from self._expand(*self._pending)
+            self._pending = None
+        for where, record in self._records:
+            if self._is_tests(record):
+                yield from self._expand(where, record)
+            else:
+                console.print(
+                    f"[red]{self.source}:{where}: operations must come before tests; skipped[/red]"
+                )
+
+    def close(self):
+        close = getattr(self._records, 'close', None)
+        if close:
+            close()
+
+    @staticmethod
+    def _is_tests(record):
+        return isinstance(record, dict) and 'class' in record
+
+    def _expand(self, where, record):
+        class_name = str(record['class'])
+        if 'test' in record:
+            yield class_name, str(record['test'])
+        elif isinstance(record.get('tests'), list):
+            for test_name in record['tests']:
+                yield class_name, str(test_name)
+        else:
+            console.print(f"[red]{self.source}:{where}: class record without tests; skipped[/red]")
+
+    def _add_operations(self, where, record):
+        if isinstance(record, dict) and 'operation' in record:
+            name = str(record['operation'])
+            self.operations[name] = list(record.get('steps') or [])
+            if record.get('keywords'):
+                self.keywords[name] = list(record['keywords'])
+        elif isinstance(record, dict) and isinstance(record.get('operations'), dict):
+            self.operations.update(record['operations'])
+            if isinstance(record.get('keywords'), dict):
+                self.keywords.update(record['keywords'])
+        else:
+            console.print(f"[red]{self.source}:{where}: unrecognised record; skipped[/red]")
+
+
+def _jsonl_records(path):
+    with open(path, encoding='utf-8') as handle:
+        try:
+            for line_no, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    console.print(f"[red]{path}:{line_no}: invalid JSON ({e}); skipped[/red]")
+        except UnicodeDecodeError as e:
+            _not_utf8(path, e)
+
+
+def _yaml_records(path):
+    with open(path, encoding='utf-8') as handle:
+        try:
+            for doc_no, document in enumerate(yaml.load_all(handle, Loader=YAML_LOADER), 1):
+                if isinstance(document, list):
+                    for record in document:
+                        yield f"document {doc_no}", record
+                elif document is not None:
+                    yield f"document {doc_no}", document
+        except yaml.YAMLError as e:
+            # Everything before the broken document has already been used
+            console.print(f"[red]{path}: invalid YAML ({e}); stopped reading[/red]")
+        except UnicodeDecodeError as e:
+            _not_utf8(path, e)
+
+
+def _not_utf8(path, error):
+    # Found part-way through the lazy read, so earlier records may already have run
+    console.print(f"[red]{path}: not valid UTF-8 ({error.reason}); stopped reading[/red]")
+
+
+def load_suite(file_path):
+    """Open a suite file (.jsonl, .yml/.yaml, or a Python test data module)"""
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    try:
+        if suffix == '.jsonl':
+            return Suite(_jsonl_records(path), source=str(path))
+        if suffix in ('.yml', '.yaml'):
+            return Suite(_yaml_records(path), source=str(path))
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        console.print(f"[red]Error loading test file: {e}[/red]")
+        return Suite.from_dicts({}, {}, source=str(path))
+
+    return Suite.from_dicts(*load_test_data_from_file(path), source=str(path))
@@ -0,0 +1,127 @@
+"""
+LumenQA Timing - Monotonic span recording and Chrome trace export
+
+Every timed span (setup, parse, test, step, teardown) is appended to a
+Timeline, which stores spans column-wise in typed arrays with labels and
+track names interned into small tables. A million steps cost a few tens of
+MB rather than a dict each.
+
+Timelines export to the Chrome Trace Event format, which chrome://tracing
+and https://ui.perfetto.dev load directly; each worker gets its own track.
+"""
+
+import json
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+CATEGORIES = ('setup', 'parse', 'test', 'step', 'teardown')
+_CATEGORY_IDS = {name: i for i, name in enumerate(CATEGORIES)}
+
+
+class Timeline:
+    """Thread-safe, column-oriented store of timed spans"""
+
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.category = array('B')
+        self.label = array('L')
+        self.track = array('L')
+        self.start = array('q')
+        self.duration = array('q')
+        self._labels = {}
+        self._label_list = []
+        self._tracks = {}
+        self._track_list = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.start)
+
+    def record(self, category, label, start_ns, end_ns, track=None):
+        """Add a span; start/end come from time.perf_counter_ns()"""
+        if track is None:
+            track = threading.current_thread().name
+        with self._lock:
+            self.category.append(_CATEGORY_IDS[category])
+            self.label.append(self._intern(self._labels, self._label_list, label))
+            self.track.append(self._intern(self._tracks, self._track_list, track))
+            self.start.append(start_ns - self.origin)
+            self.duration.append(end_ns - start_ns)
+
+    @contextmanager
+    def span(self, category, label, track=None):
+        """Time the body of a with-block as one span"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(category, label, start, time.perf_counter_ns(), track)
+
+    def totals(self):
+        """Total nanoseconds per category"""
+        totals = dict.fromkeys(CATEGORIES, 0)
+        with self._lock:
+            for category, duration in zip(self.category, self.duration):
+                totals[CATEGORIES[category]] += duration
+        return totals
+
+    def spans(self, category=None):
+        """Yield (category, label, track, start_ns, duration_ns) tuples"""
+        wanted = None if category is None else _CATEGORY_IDS[category]
+        for i in range(len(self.start)):
+            if wanted is not None and self.category[i] != wanted:
+                continue
+            yield (
+                CATEGORIES[self.category[i]],
+                self._label_list[self.label[i]],
+                self._track_list[self.track[i]],
+                self.start[i],
+                self.duration[i],
+            )
+
+    def export_chrome_trace(self, path, process_name='lumen'):
+        """Write the timeline as Chrome Trace Event JSON, one event per line"""
+        with open(path, 'w', encoding='utf-8') as out:
+            out.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+            out.write(json.dumps({
+                'ph': 'M', 'pid': 1, 'tid': 0, 'name': 'process_name',
+                'args': {'name': process_name},
+            }))
+            for tid, name in enumerate(self._track_list, 1):
+                out.write(',\n' + json.dumps({
+                    'ph': 'M', 'pid': 1, 'tid': tid, 'name': 'thread_name', 'args': {'name': name},
+                }))
+                out.write(',\n' + json.dumps({
+                    'ph': 'M', 'pid': 1, 'tid': tid, 'name': 'thread_sort_index',
+                    'args': {'sort_index': tid},
+                }))
+            for i in range(len(self.start)):
+                out.write(',\n' + json.dumps({
+                    'ph': 'X',
+                    'pid': 1,
+                    'tid': self.track[i] + 1,
+                    'cat': CATEGORIES[self.category[i]],
+                    'name': self._label_list[self.label[i]],
+                    'ts': self.start[i] / 1000,
+                    'dur': self.duration[i] / 1000,
+                }))
+            out.write('\n]}\n')
+        return path
+
+    @staticmethod
+    def _intern(index, values, key):
+        found = index.get(key)
+        if found is None:
+            found = index[key] = len(values)
+            values.append(key)
+        return found
+
+
+def format_ns(nanoseconds):
+    """Human-readable duration for summaries"""
+    ms = nanoseconds / 1_000_000
+    if ms >= 1000:
+        return f"{ms / 1000:.2f}s"
+    return f"{ms:.0f}ms"
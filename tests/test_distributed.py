@@ -0,0 +1,103 @@
+"""A coordinator and workers on one machine, over a Unix socket"""
+
+import json
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from lumenqa.distributed import Coordinator, Worker
+
+TESTS = 12
+
+
+@pytest.fixture
+def suite(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Skip the simulated start-up pauses
+    monkeypatch.setattr(Coordinator, '_initialize', lambda self: None)
+    for n in range(TESTS // 4):
+        (tmp_path / f"suite_{n}.lux").write_text(''.join(
+            f'test "t{n}_{i}":\n    wait 5ms\n    wait 5ms\n\n' for i in range(4)
+        ))
+    # Unix socket paths have to stay short
+    sockets = tempfile.mkdtemp(prefix='lumen-')
+    yield tmp_path, f"unix:{sockets}/c.sock"
+    shutil.rmtree(sockets, ignore_errors=True)
+
+
+def serve(tmp_path, address):
+    coordinator = Coordinator(
+        [str(tmp_path)], listen=address, cache=False, history=False, quiet=True,
+        output_dir=str(tmp_path / 'out'),
+    )
+    thread = threading.Thread(target=coordinator.run, daemon=True)
+    thread.start()
+    return coordinator, thread
+
+
+def work(address, name):
+    worker = Worker(address, parallel=2, name=name, quiet=True, healing=False)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    return worker, thread
+
+
+def ran(runner):
+    return runner.results['passed'] + runner.results['failed']
+
+
+def connect(address):
+    path = address[len('unix:'):]
+    deadline = time.monotonic() + 10
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def test_two_workers_share_the_suite(suite):
+    tmp_path, address = suite
+    coordinator, serving = serve(tmp_path, address)
+    workers = [work(address, f"w{n}") for n in range(2)]
+    for _, thread in workers:
+        thread.join(30)
+    serving.join(30)
+
+    assert not serving.is_alive()
+    assert ran(coordinator) == TESTS
+    assert sum(ran(worker) for worker, _ in workers) == TESTS
+    assert not any(worker.lost for worker, _ in workers)
+    reported = [json.loads(line)['test'] for line in (tmp_path / 'out' / 'results.jsonl').open()]
+    assert sorted(reported) == sorted(f"t{n}_{i}" for n in range(TESTS // 4) for i in range(4))
+
+
+def test_malformed_request_gets_an_error_reply(suite):
+    tmp_path, address = suite
+    coordinator, serving = serve(tmp_path, address)
+    with connect(address) as sock, sock.makefile('rb') as replies:
+        def call(message):
+            sock.sendall(json.dumps(message).encode() + b'\n')
+            return json.loads(replies.readline())
+
+        assert call({'type': 'hello', 'name': 'raw', 'threads': 1})['type'] == 'welcome'
+        assert call({'type': 'start'})['type'] == 'error'
+        assert call({'type': 'result', 'id': 0, 'result': {}})['type'] == 'error'
+        assert call([1, 2])['type'] == 'error'
+        # Still connected, and nothing was reported
+        assert call({'type': 'heartbeat'})['type'] == 'ok'
+        assert ran(coordinator) == 0
+
+    worker, thread = work(address, 'w')
+    thread.join(30)
+    serving.join(30)
+    assert ran(coordinator) == TESTS
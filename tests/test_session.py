@@ -0,0 +1,81 @@
+"""SessionPool against the in-process fake driver"""
+
+import pytest
+
+from lumenqa.drivers import FakeDriver
+from lumenqa.session import SessionPool
+
+
+@pytest.fixture
+def driver():
+    return FakeDriver(launch_latency=(0, 0), context_latency=(0, 0))
+
+
+def test_released_context_is_reset_and_reused(driver):
+    pool = SessionPool(driver)
+    with pool.lease() as first:
+        first.cookies['session'] = 'alice'
+    with pool.lease() as second:
+        assert second is first
+        assert second.cookies == {}
+    assert (pool.created, pool.reused, pool.recycled) == (1, 1, 0)
+
+
+def test_concurrent_leases_get_separate_contexts(driver):
+    pool = SessionPool(driver)
+    with pool.lease() as first, pool.lease() as second:
+        assert first is not second
+    assert pool.created == 2
+
+
+def test_prewarmed_contexts_are_not_counted_as_reused(driver):
+    pool = SessionPool(driver)
+    pool.prewarm(3)
+    with pool.lease():
+        pass
+    assert (pool.created, pool.reused) == (3, 0)
+    with pool.lease():
+        pass
+    assert pool.reused == 1
+
+
+def test_context_is_recycled_after_max_uses(driver):
+    pool = SessionPool(driver, max_uses=2)
+    with pool.lease() as first:
+        pass
+    with pool.lease() as again:
+        assert again is first
+    assert first.closed
+    with pool.lease() as replacement:
+        assert replacement is not first
+    assert (pool.created, pool.recycled) == (2, 1)
+
+
+def test_context_is_recycled_after_memory_growth(driver):
+    pool = SessionPool(driver, max_memory_growth=1)
+    with pool.lease() as context:
+        context.heap += 8 * 1024 * 1024
+    assert context.closed
+    assert pool.recycled == 1
+
+
+def test_context_that_cannot_reset_is_dropped(driver):
+    pool = SessionPool(driver)
+    with pool.lease() as context:
+        context.reset = None
+    assert context.closed
+    with pool.lease() as replacement:
+        assert replacement is not context
+
+
+def test_close_closes_idle_and_later_released_contexts(driver):
+    pool = SessionPool(driver)
+    pool.prewarm(1)
+    with pool.lease() as leased:
+        with pool.lease() as idle:
+            pass
+        pool.close()
+        assert idle.closed
+        assert not leased.closed
+    assert leased.closed
+    assert pool.recycled == 0